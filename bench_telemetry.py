@@ -0,0 +1,457 @@
+"""
+Test Bench Telemetry Ingester for Golden Ratio Motor
+Reads the serial output of test_bench.ino and turns its human-readable
+pulse reports into structured records, with a replay source that plays a
+recorded log through a pseudo-terminal so the pipeline runs without hardware
+
+Pipeline (asyncio):
+  serial port / pty --> reader task --(bounded queue)--> consumer task --> ring buffer
+The reader parses bytes into lines and lines into records incrementally.
+When the consumer falls behind the queue fills, the reader stops reading
+and the port's own buffer absorbs the rest (back-pressure instead of
+unbounded memory); the ring buffer keeps the latest records only.
+
+Serial ports are opened with termios (POSIX), so no extra dependency is
+needed. Logs copied from the Arduino serial monitor may carry its
+"HH:MM:SS.mmm -> " timestamps; the replay then reproduces their timing.
+"""
+
+import array
+import asyncio
+import errno
+import fcntl
+import math
+import os
+import re
+import termios
+import threading
+import time
+import tty
+from collections import deque
+from typing import NamedTuple
+
+BAUD_RATE = 115200
+PULSE_DELAY_MS = 2000  # test_bench.ino waits this long after every pulse
+QUEUE_SIZE = 1024  # records in flight between reader and consumer
+RING_SIZE = 100_000  # latest records kept in memory
+READ_SIZE = 65536  # bytes per read from the port
+REPLAY_CHUNK = 4096  # bytes per write when replaying without pacing
+
+PULSE_START = re.compile(r'Pulse #(\d+) - FIRING')
+TIMESTAMP = re.compile(r'^(\d{2}):(\d{2}):(\d{2}\.\d+) -> ?')
+WARNING_MARK = 'WARNING:'
+RECORD_END = '=' * 10  # the closing rule of every pulse report
+
+# Report label -> (record field, type)
+RESULT_FIELDS = {
+    'Actual Pulse Width': ('pulse_width_ms', float),
+    'Peak Current': ('peak_current', float),
+    'Average Current': ('average_current', float),
+    'Samples Taken': ('samples', int),
+    'Energy per Pulse': ('energy_mj', float),
+    'Total Pulses': ('total_pulses', int),
+    'Max Current Ever': ('max_current', float),
+    'Avg Current (all)': ('session_avg_current', float),
+}
+# Start-up banner label -> (config key, type)
+CONFIG_FIELDS = {
+    'Pulse Width': ('pulse_width_us', int),
+    'Pulse Delay': ('pulse_delay_ms', int),
+    'Shunt Resistance': ('shunt_resistance', float),
+}
+
+BAUDS = {9600: termios.B9600, 19200: termios.B19200, 38400: termios.B38400,
+         57600: termios.B57600, 115200: termios.B115200, 230400: termios.B230400}
+
+
+class PulseRecord(NamedTuple):
+    pulse: int
+    pulse_width_ms: float = math.nan
+    peak_current: float = math.nan  # A
+    average_current: float = math.nan  # A
+    samples: int = 0
+    energy_mj: float = math.nan
+    total_pulses: int = 0
+    max_current: float = math.nan  # A, whole session
+    session_avg_current: float = math.nan  # A, whole session
+    warnings: tuple = ()
+    complete: bool = True  # False if the report was cut off by the next pulse
+    received: float = 0.0  # host time.time() when the report ended
+
+
+class PulseParser:
+    """
+    Incremental parser for test_bench.ino output.
+
+    Feed it text lines with ``feed_line`` (or raw bytes with ``feed``) in
+    any chunking; finished pulse reports come back as ``PulseRecord``s. The
+    start-up banner is collected in ``config``.
+    """
+
+    def __init__(self):
+        self.config = {}
+        self.n_lines = 0
+        self._fields = None
+        self._warnings = []
+        self._partial = b''
+
+    def feed(self, data):
+        """Parse a chunk of raw bytes; returns the records it completed"""
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()
+        records = []
+        for line in lines:
+            record = self.feed_line(line.decode('utf-8', 'replace'))
+            if record is not None:
+                records.append(record)
+        return records
+
+    def feed_line(self, line):
+        """Parse one line; returns a PulseRecord when it ends a report"""
+        self.n_lines += 1
+        line = line.strip()
+        if not line:
+            return None
+
+        start = PULSE_START.search(line)
+        if start:
+            cut_off = self._finish(complete=False) if self._fields is not None else None
+            self._fields = {'pulse': int(start.group(1))}
+            return cut_off
+
+        if line.startswith(RECORD_END):
+            return self._finish() if self._fields is not None else None
+
+        if WARNING_MARK in line:
+            if self._fields is not None:
+                self._warnings.append(line.split(WARNING_MARK, 1)[1].strip())
+            return None
+
+        label, sep, value = line.partition(':')
+        if not sep:
+            return None
+        label = label.strip()
+        fields, target = ((RESULT_FIELDS, self._fields) if self._fields is not None
+                          else (CONFIG_FIELDS, self.config))
+        if label in fields:
+            key, kind = fields[label]
+            try:
+                target[key] = kind(value.split()[0])
+            except (IndexError, ValueError):
+                pass  # garbled line, keep the rest of the report
+        return None
+
+    def _finish(self, complete=True):
+        record = PulseRecord(**self._fields, warnings=tuple(self._warnings),
+                             complete=complete, received=time.time())
+        self._fields = None
+        self._warnings = []
+        return record
+
+
+def parse_log(lines):
+    """Records of a whole log (an iterable of lines), e.g. a saved serial monitor copy"""
+    parser = PulseParser()
+    records = []
+    for line in lines:
+        record = parser.feed_line(TIMESTAMP.sub('', line))
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def configure_port(fd, baud=BAUD_RATE):
+    """Put a serial fd into raw 8N1 mode at ``baud``, keeping bytes already received"""
+    tty.setraw(fd, termios.TCSANOW)
+    attrs = termios.tcgetattr(fd)
+    attrs[4] = attrs[5] = BAUDS[baud]  # ispeed, ospeed
+    attrs[2] |= termios.CLOCAL | termios.CREAD
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+def open_serial(path, baud=BAUD_RATE):
+    """Non-blocking fd of a serial port or pty, configured raw"""
+    fd = os.open(path, os.O_RDONLY | os.O_NOCTTY | os.O_NONBLOCK)
+    configure_port(fd, baud)
+    return fd
+
+
+async def read_chunks(fd):
+    """
+    Async iterator over the bytes arriving on ``fd`` until it closes.
+
+    Nothing is read while the caller is busy with the previous chunk, so
+    a slow consumer leaves the data in the port's buffer.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            data = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            ready = loop.create_future()
+            loop.add_reader(fd, ready.set_result, None)
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+            continue
+        except OSError as exc:
+            if exc.errno == errno.EIO:  # the other end of a pty hung up
+                return
+            raise
+        if not data:
+            return
+        yield data
+
+
+class TelemetryIngester:
+    """
+    Asyncio ingester: port bytes in, latest PulseRecords in ``records``.
+
+    Parameters
+    ----------
+    ring_size : int
+        Records kept in the ring buffer (oldest dropped first)
+    queue_size : int
+        Records allowed in flight before the reader stops reading
+    on_record : callable, optional
+        Called with every record by the consumer task (e.g. a live plot or
+        a writer); a slow callback back-pressures the reader
+    """
+
+    def __init__(self, ring_size=RING_SIZE, queue_size=QUEUE_SIZE, on_record=None):
+        self.records = deque(maxlen=ring_size)
+        self.parser = PulseParser()
+        self.queue_size = queue_size
+        self.on_record = on_record
+        self.n_records = 0
+        self.n_bytes = 0
+
+    async def _produce(self, chunks, queue):
+        async for data in chunks:
+            self.n_bytes += len(data)
+            for record in self.parser.feed(data):
+                await queue.put(record)  # waits while the consumer is behind
+        tail = self.parser.feed(b'\n')  # a last line without its newline
+        for record in tail:
+            await queue.put(record)
+        await queue.put(None)
+
+    async def _consume(self, queue):
+        while (record := await queue.get()) is not None:
+            self.records.append(record)
+            self.n_records += 1
+            if self.on_record is not None:
+                self.on_record(record)
+
+    async def run(self, chunks):
+        """
+        Ingest an async iterable of byte chunks (``read_chunks`` of a port,
+        or any other source) until it ends; returns counts and the achieved
+        rate (``records``, ``lines``, ``bytes``, ``seconds``, ``records_per_s``).
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        start = time.perf_counter()
+        await asyncio.gather(self._produce(chunks, queue), self._consume(queue))
+        elapsed = time.perf_counter() - start
+        return {
+            'records': self.n_records,
+            'lines': self.parser.n_lines,
+            'bytes': self.n_bytes,
+            'seconds': elapsed,
+            'records_per_s': self.n_records / elapsed if elapsed > 0 else math.inf,
+        }
+
+    async def run_port(self, path, baud=BAUD_RATE):
+        """Open ``path`` (e.g. /dev/ttyUSB0 or a ReplaySource port) and ingest it"""
+        fd = open_serial(path, baud)
+        try:
+            return await self.run(read_chunks(fd))
+        finally:
+            os.close(fd)
+
+
+def ingest(path, baud=BAUD_RATE, **kwargs):
+    """Blocking convenience wrapper: ingest a port until it closes, returns (ingester, stats)"""
+    ingester = TelemetryIngester(**kwargs)
+    stats = asyncio.run(ingester.run_port(path, baud))
+    return ingester, stats
+
+
+class ReplaySource:
+    """
+    Play a recorded log into a pseudo-terminal, standing in for the bench.
+
+    ``port`` is the pty path to open like a real serial port. At
+    ``speed`` = 1 lines arrive as they did on the bench: at the serial
+    monitor timestamps when the log has them, otherwise paced at the baud
+    rate with the firmware's pulse delay after every report. Higher speeds
+    compress the timing; ``speed=None`` writes as fast as the reader takes
+    it. The pty is hung up at the end, which ends the ingest.
+    """
+
+    def __init__(self, lines, speed=1.0, baud=BAUD_RATE):
+        self.lines = list(lines)
+        self.speed = speed
+        self.baud = baud
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self._thread = None
+
+    def _schedule(self):
+        """(delay in s, bytes) pairs at real speed"""
+        byte_time = 10 / self.baud  # 8N1: 10 bits per byte
+        previous = None
+        for line in self.lines:
+            stamp = TIMESTAMP.match(line)
+            text = line[stamp.end():] if stamp else line
+            data = (text.rstrip('\r\n') + '\r\n').encode()
+            if stamp:
+                hours, minutes, seconds = stamp.groups()
+                t = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                delay = 0.0 if previous is None else max(t - previous, 0.0)
+                previous = t
+            else:
+                delay = len(data) * byte_time
+            yield delay, data
+            if not stamp and text.strip().startswith(RECORD_END):
+                yield PULSE_DELAY_MS / 1000, b''
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.master, view):]  # blocks while the reader is behind
+
+    def _run(self):
+        try:
+            if self.speed is None:
+                buffer = bytearray()
+                for _, data in self._schedule():
+                    buffer += data
+                    if len(buffer) >= REPLAY_CHUNK:
+                        self._write(buffer)
+                        buffer.clear()
+                self._write(buffer)
+            else:
+                due = time.perf_counter()
+                for delay, data in self._schedule():
+                    due += delay / self.speed
+                    pause = due - time.perf_counter()
+                    if pause > 0:
+                        time.sleep(pause)
+                    self._write(data)
+            # Hanging up discards unread input, so wait for the reader to catch up
+            pending = array.array('i', [1])
+            while pending[0]:
+                fcntl.ioctl(self.slave, termios.FIONREAD, pending)
+                if pending[0]:
+                    time.sleep(0.001)
+        finally:
+            os.close(self.master)  # hang up: the reader sees EIO
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.join()
+        os.close(self.slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def synthetic_log(n_pulses, seed=0, peak_current=5.0):
+    """
+    Lines test_bench.ino would print for ``n_pulses`` pulses, with random
+    peak currents around ``peak_current`` (occasionally out of range, so
+    the warnings appear too). For replay tests and benchmarks.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    peaks = np.abs(rng.normal(peak_current, 0.2 * peak_current, n_pulses))
+    widths = 0.6 + rng.exponential(0.01, n_pulses)
+    widths[rng.random(n_pulses) < 0.01] += 0.2  # a slow switch-off now and then
+    samples = rng.integers(50, 58, n_pulses)
+
+    lines = ["", "===========================================",
+             "RAID Motor - Single Pulse Test Bench v1.0",
+             "===========================================", "",
+             "Press BOOT button to fire pulse", "Place magnet 2-5mm from coil core", "",
+             "Configuration:", "  Pulse Width: 600 µs (0.60 ms)",
+             f"  Pulse Delay: {PULSE_DELAY_MS} ms", "  Shunt Resistance: 0.010 Ω",
+             "===========================================", ""]
+    max_current = avg_current = 0.0
+    for k in range(n_pulses):
+        peak, width = float(peaks[k]), float(widths[k])
+        average = 0.8 * peak
+        max_current = max(max_current, peak)
+        avg_current = (avg_current * k + average) / (k + 1)
+        lines += ["-" * 40, f"Pulse #{k + 1} - FIRING...", "-" * 40, "", "Results:",
+                  f"  Actual Pulse Width: {width:.3f} ms",
+                  f"  Peak Current:       {peak:.2f} A",
+                  f"  Average Current:    {average:.2f} A",
+                  f"  Samples Taken:      {samples[k]}",
+                  f"  Energy per Pulse:   {24.0 * average * width:.2f} mJ",
+                  "", "Session Statistics:",
+                  f"  Total Pulses:       {k + 1}",
+                  f"  Max Current Ever:   {max_current:.2f} A",
+                  f"  Avg Current (all):  {avg_current:.2f} A"]
+        if peak > 8.0:
+            lines += ["", "⚠️  WARNING: Current >8A detected!",
+                      "   Check for short circuit or wrong coil resistance"]
+        if peak < 2.0:
+            lines += ["", "⚠️  WARNING: Current <2A detected!",
+                      "   Check connections or increase voltage"]
+        if width > 0.6 * 1.2:
+            lines += ["", "⚠️  WARNING: Pulse width longer than expected!",
+                      "   Check for slow MOSFET switching"]
+        lines += ["=" * 40, ""]
+    return lines
+
+
+def print_ingest_summary(ingester, stats):
+    """Print what an ingest run received"""
+    records = list(ingester.records)
+    print(f"\n{'BENCH TELEMETRY':^70}")
+    print("-" * 70)
+    print(f"Records:            {stats['records']:10,d}  ({stats['records_per_s']:,.0f} records/s)")
+    print(f"Lines / bytes:      {stats['lines']:10,d} / {stats['bytes']:,d}")
+    if ingester.parser.config:
+        print(f"Bench config:       {ingester.parser.config}")
+    if records:
+        peaks = [r.peak_current for r in records]
+        print(f"Peak current:       {min(peaks):.2f} - {max(peaks):.2f} A "
+              f"(latest {len(records):,} records)")
+        warned = sum(1 for r in records if r.warnings)
+        incomplete = sum(1 for r in records if not r.complete)
+        print(f"With warnings:      {warned:10,d}")
+        print(f"Cut-off reports:    {incomplete:10,d}")
+
+
+if __name__ == "__main__":
+    lines = synthetic_log(20_000)
+
+    start = time.perf_counter()
+    records = parse_log(lines)
+    elapsed = time.perf_counter() - start
+    print(f"Parsed {len(records):,} records from {len(lines):,} lines in {elapsed:.2f} s "
+          f"({len(records) / elapsed:,.0f} records/s)")
+
+    print("\nReplaying through a pseudo-terminal, unpaced...")
+    with ReplaySource(lines, speed=None) as source:
+        ingester, stats = ingest(source.port)
+    print_ingest_summary(ingester, stats)
+
+    print("\nReplaying 3 pulses at 100x real speed...")
+    with ReplaySource(synthetic_log(3), speed=100) as source:
+        ingester, stats = ingest(source.port)
+    print(f"{stats['records']} records in {stats['seconds']:.2f} s "
+          f"(≈ {3 * PULSE_DELAY_MS / 1000:.0f} s on the bench)")
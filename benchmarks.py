@@ -0,0 +1,331 @@
+"""
+Benchmarks for Golden Ratio Motor
+Times the computational paths behind electrical_specs.py, visualize_motor.py
+and generate_rotor_template.py at a small and a production size, and fails
+when any of them has slowed down against the stored baseline
+
+Each benchmark is best-of-``repeat`` wall time, with fast operations looped
+until one sample takes at least MIN_SAMPLE_TIME. The baseline
+(benchmark_baseline.json) keeps the seconds of every benchmark together with
+its regression threshold, a ratio over the baseline time: the default
+thresholds are looser for the small sizes, whose timings are noisier, and
+can be edited per benchmark in the file.
+
+    python benchmarks.py                      # compare, exit status 1 on a regression
+    python benchmarks.py --size small -k coil  # a subset
+    python benchmarks.py --update             # record a new baseline (keeps thresholds)
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')  # before visualize_motor imports pyplot
+import numpy as np
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+SIZES = ('small', 'production')
+DEFAULT_THRESHOLD = {'small': 2.0, 'production': 1.5}  # allowed slowdown over the baseline
+MIN_SAMPLE_TIME = 0.05  # s, fast benchmarks are looped up to this per sample
+REPEAT = 5
+
+
+# Each benchmark takes a size and does its setup, then returns the callable to time
+
+def bench_fibonacci_spiral(size):
+    """Golden spiral points, bypassing the geometry cache"""
+    from rotor_geometry import fibonacci_spiral
+
+    n_points = {'small': 10_000, 'production': 2_000_000}[size]
+    return lambda: fibonacci_spiral.__wrapped__(n_points=n_points, rotations=50)
+
+
+def bench_flux_pattern(size):
+    """Flux waveform at 100 kHz: one block (small) or streamed for 10 s (production)"""
+    from visualize_motor import flux_pattern, stream_flux_pattern
+
+    if size == 'small':
+        t = np.arange(10_000) / 100_000
+        return lambda: flux_pattern(t)
+
+    def run():
+        for _, flux in stream_flux_pattern(10.0, 100_000):
+            pass
+    return run
+
+
+def bench_coil_design(size):
+    """Coil/capacitor numbers: every CoilDesign property (small) or the full sweep grid"""
+    from coil_design import CoilDesign, voltage_table
+    from electrical_specs import sweep_design_space
+
+    if size == 'production':
+        return sweep_design_space
+
+    properties = [name for name, value in vars(CoilDesign).items()
+                  if hasattr(value, 'attrname')]
+
+    def run():
+        design = CoilDesign()
+        for name in properties:
+            getattr(design, name)
+        voltage_table()
+    return run
+
+
+def bench_coil_winding(size):
+    """Gauge/turns solver without its cache: bench design (small) or a V × I grid"""
+    from coil_design import CoilDesign
+    from coil_winding import solve_winding
+
+    grid = [(24, 5)] if size == 'small' else [
+        (v, i) for v in (12, 24, 36, 48, 60, 72, 96) for i in np.linspace(2, 10, 15)]
+    designs = [CoilDesign(voltage=v, current=float(i)) for v, i in grid]
+
+    def run():
+        for d in designs:
+            solve_winding.__wrapped__(d.L_max, d.R, d.current, core_area_cm2=d.core_area_cm2,
+                                      core_length_cm=d.core_length_cm, mu_r=d.mu_r)
+    return run
+
+
+def bench_spec_sheet(size):
+    """Spec sheet update and Agg draw (small) or PNG at the saved 150 dpi"""
+    from coil_design import CoilDesign
+    from electrical_specs import SpecSheetRenderer
+
+    renderer = SpecSheetRenderer(headless=True)
+    design = CoilDesign(voltage=24)
+    if size == 'small':
+        renderer.fig.set_dpi(50)
+
+        def run():
+            renderer.update(design)
+            renderer.fig.canvas.draw()
+        return run
+
+    def run():
+        renderer.update(design)
+        renderer.save(io.BytesIO(), dpi=150, format='png')
+    return run
+
+
+def bench_static_visualization(size):
+    """The 4-panel concept figure, built and drawn at 50 dpi (small) or 100 dpi"""
+    import matplotlib.pyplot as plt
+    from visualize_motor import create_static_visualization
+
+    dpi = {'small': 50, 'production': 100}[size]
+
+    def run():
+        fig = create_static_visualization()
+        fig.set_dpi(dpi)
+        fig.canvas.draw()
+        plt.close(fig)
+    return run
+
+
+def bench_rotor_animation(size):
+    """Blitted rotor frames: 10 (small) or a full 60-frame rotation at 100 dpi"""
+    from visualize_motor import FRAMES_PER_ROTATION, RotorAnimation
+
+    n_frames = {'small': 10, 'production': FRAMES_PER_ROTATION}[size]
+    renderer = RotorAnimation(headless=True)
+    fig, canvas = renderer.fig, renderer.fig.canvas
+    fig.set_dpi(100)
+    for artist in renderer.artists:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    def run():
+        for frame in range(n_frames):
+            canvas.restore_region(background)
+            for artist in renderer.update(frame):
+                fig.draw_artist(artist)
+            canvas.buffer_rgba()
+    return run
+
+
+def bench_rotor_template(size):
+    """Template PDF: the build-guide page (small) or an 8-page batch"""
+    from matplotlib.figure import Figure
+    from generate_rotor_template import PAGE_SIZE, create_template_batch, draw_rotor_template
+
+    if size == 'small':
+        def run():
+            fig = Figure(figsize=PAGE_SIZE)
+            draw_rotor_template(fig)
+            fig.savefig(io.BytesIO(), format='pdf', dpi=300)
+        return run
+
+    configs = [{'magnet_radius_mm': radius} for radius in np.linspace(80, 95, 8)]
+
+    def run():
+        folder = tempfile.mkdtemp(prefix='bench_template_')
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_template_batch(configs, os.path.join(folder, 'batch.pdf'), workers=1)
+        finally:
+            shutil.rmtree(folder)
+    return run
+
+
+BENCHMARKS = {
+    'fibonacci_spiral': bench_fibonacci_spiral,
+    'flux_pattern': bench_flux_pattern,
+    'coil_design': bench_coil_design,
+    'coil_winding': bench_coil_winding,
+    'spec_sheet': bench_spec_sheet,
+    'static_visualization': bench_static_visualization,
+    'rotor_animation': bench_rotor_animation,
+    'rotor_template': bench_rotor_template,
+}
+
+
+def time_callable(func, repeat=REPEAT, min_sample_time=MIN_SAMPLE_TIME):
+    """
+    Best and median seconds per call of ``func``, after one warm-up call.
+
+    Calls are looped (1, 10, 100, ... times) until a sample lasts at least
+    ``min_sample_time``, then ``repeat`` samples are taken.
+    """
+    func()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time:
+            break
+        loops *= 10
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return {'seconds': min(samples), 'median': statistics.median(samples), 'loops': loops}
+
+
+def run_benchmarks(names=None, sizes=SIZES, repeat=REPEAT, progress=True):
+    """Time the named benchmarks (all by default); returns {'name[size]': timing}"""
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        for size in sizes:
+            key = f'{name}[{size}]'
+            results[key] = time_callable(factory(size), repeat)
+            if progress:
+                print(f"  {key:<36} {results[key]['seconds'] * 1000:10.3f} ms", flush=True)
+    return results
+
+
+def environment():
+    """Interpreter, library and machine details stored with a baseline"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def load_baseline(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_FILE, previous=None):
+    """Write ``results`` as the baseline, keeping thresholds already set in ``previous``"""
+    old = (previous or {}).get('benchmarks', {})
+    benchmarks = dict(old)
+    for key, timing in results.items():
+        size = key[key.index('[') + 1:-1]
+        threshold = old.get(key, {}).get('threshold', DEFAULT_THRESHOLD[size])
+        benchmarks[key] = {'seconds': timing['seconds'], 'threshold': threshold}
+    baseline = {'environment': environment(), 'benchmarks': dict(sorted(benchmarks.items()))}
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+    return baseline
+
+
+def compare(results, baseline):
+    """
+    Rows of (name, seconds, baseline seconds, ratio, threshold, status) with
+    status 'ok', 'REGRESSION' (ratio above the threshold) or 'new'.
+    """
+    recorded = (baseline or {}).get('benchmarks', {})
+    rows = []
+    for key, timing in results.items():
+        entry = recorded.get(key)
+        if entry is None:
+            rows.append((key, timing['seconds'], None, None, None, 'new'))
+            continue
+        ratio = timing['seconds'] / entry['seconds']
+        status = 'REGRESSION' if ratio > entry['threshold'] else 'ok'
+        rows.append((key, timing['seconds'], entry['seconds'], ratio, entry['threshold'], status))
+    return rows
+
+
+def print_comparison(rows, baseline=None):
+    """Print the benchmark table against the baseline"""
+    print(f"\n{'BENCHMARKS':^70}")
+    print("-" * 70)
+    if baseline is not None and baseline.get('environment') != environment():
+        print("Note: baseline recorded on a different machine or library versions")
+    print(f"{'Benchmark':<36} {'Time (ms)':>10} {'Base (ms)':>10} {'Ratio':>6}  Status")
+    for key, seconds, base, ratio, threshold, status in rows:
+        if base is None:
+            print(f"{key:<36} {seconds * 1000:10.3f} {'-':>10} {'-':>6}  {status}")
+        else:
+            print(f"{key:<36} {seconds * 1000:10.3f} {base * 1000:10.3f} {ratio:6.2f}  "
+                  f"{status}{f' (limit {threshold:.2f})' if status != 'ok' else ''}")
+    n_slow = sum(row[-1] == 'REGRESSION' for row in rows)
+    print("-" * 70)
+    print(f"{n_slow} regression(s) in {len(rows)} benchmarks" if n_slow
+          else f"All {len(rows)} benchmarks within their thresholds")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-k', dest='names', action='append',
+                        help='run benchmarks whose name contains this (repeatable)')
+    parser.add_argument('--size', choices=SIZES + ('all',), default='all')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update', action='store_true',
+                        help='store these timings as the baseline instead of comparing')
+    args = parser.parse_args(argv)
+
+    sizes = SIZES if args.size == 'all' else (args.size,)
+    results = run_benchmarks(args.names, sizes, args.repeat)
+    baseline = load_baseline(args.baseline)
+    if args.update:
+        save_baseline(results, args.baseline, baseline)
+        print(f"Baseline of {len(results)} benchmarks written to {args.baseline}")
+        return 0
+    rows = compare(results, baseline)
+    print_comparison(rows, baseline)
+    return 1 if any(row[-1] == 'REGRESSION' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+Capture Store for Golden Ratio Motor Bench Data
+Raw per-pulse ADC current samples of many coils and sessions, kept on
+disk in fixed-size memory-mapped chunks and read back as zero-copy views
+
+Layout of a store directory:
+  meta.json             chunk size, sample width and rows filled per chunk
+  index.npy             (key, row) pairs sorted by session / coil / pulse
+  chunk_000000/         one .npy file per column, chunk_pulses rows each
+    counts.npy          (rows, max_samples) uint16 raw ADC counts
+    t_us.npy            (rows, max_samples) uint32 µs since the pulse started
+    pulse.npy, coil.npy, session.npy, start_us.npy, n_samples.npy
+Columns are plain .npy files opened with numpy.memmap, so a scan touches
+only the pages it reads and any tool that reads .npy can open a chunk.
+"""
+
+import json
+import os
+
+import numpy as np
+
+CHUNK_PULSES = 4096  # pulses per chunk file
+MAX_SAMPLES = 128  # samples per pulse (test_bench.ino takes ~55 in 600 µs)
+SAMPLE_INTERVAL_US = 10  # firePulse() sampling period
+STORE_VERSION = 1
+
+# Conversion used by test_bench.ino readCurrent()
+SHUNT_RESISTANCE = 0.01  # Ω
+ADC_VOLTAGE_REF = 3.3  # V
+ADC_RESOLUTION = 4095  # 12-bit
+
+SAMPLE_COLUMNS = {'counts': np.uint16, 't_us': np.uint32}
+PULSE_COLUMNS = {'pulse': np.int64, 'coil': np.int16, 'session': np.int32,
+                 'start_us': np.int64, 'n_samples': np.int16}
+
+# Index key: session | coil | pulse packed into one sortable int64
+COIL_BITS, PULSE_BITS = 16, 32
+
+
+def counts_to_current(counts):
+    """Shunt current (A) of raw ADC counts"""
+    return np.asarray(counts) * (ADC_VOLTAGE_REF / ADC_RESOLUTION / SHUNT_RESISTANCE)
+
+
+def current_to_counts(current):
+    """Raw ADC counts the bench would read for a shunt current (A)"""
+    counts = np.round(np.asarray(current) * (SHUNT_RESISTANCE * ADC_RESOLUTION / ADC_VOLTAGE_REF))
+    return np.clip(counts, 0, ADC_RESOLUTION).astype(np.uint16)
+
+
+def pulse_key(session, coil, pulse):
+    """Index key of (session, coil, pulse)"""
+    session, coil, pulse = (np.asarray(v, dtype=np.int64) for v in (session, coil, pulse))
+    return (session << (COIL_BITS + PULSE_BITS)) | (coil << PULSE_BITS) | pulse
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class CaptureStore:
+    """
+    Chunked, memory-mapped store of raw pulse waveforms.
+
+    Parameters
+    ----------
+    path : str
+        Store directory
+    mode : {'r', 'a'}
+        Read-only, or append (creating the store if needed)
+    chunk_pulses, max_samples : int
+        Chunk geometry of a new store; an existing store keeps its own
+
+    Writing appends pulses in arrival order and fills one chunk at a time;
+    ``flush`` (or closing the store) publishes the rows written so far and
+    rebuilds the index. Reads return views into the mapped files, marked
+    read-only, so nothing is copied until an analysis computes on them.
+    """
+
+    def __init__(self, path, mode='r', chunk_pulses=CHUNK_PULSES, max_samples=MAX_SAMPLES):
+        if mode not in ('r', 'a'):
+            raise ValueError(f"unknown mode {mode!r} (use 'r' or 'a')")
+        self.path = path
+        self.mode = mode
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['version'] != STORE_VERSION:
+                raise ValueError(f"capture store version {meta['version']} is not supported")
+        elif mode == 'a':
+            os.makedirs(path, exist_ok=True)
+            meta = {'version': STORE_VERSION, 'chunk_pulses': chunk_pulses,
+                    'max_samples': max_samples, 'rows': []}
+        else:
+            raise FileNotFoundError(f"no capture store at {path}")
+        self.chunk_pulses = meta['chunk_pulses']
+        self.max_samples = meta['max_samples']
+        self.rows = list(meta['rows'])  # filled rows per chunk
+        self._maps = {}  # chunk -> {column: memmap}
+        self._index = None
+
+    # -- writing -------------------------------------------------------------
+
+    def _chunk_dir(self, chunk):
+        return os.path.join(self.path, f"chunk_{chunk:06d}")
+
+    def _columns(self, chunk):
+        """Memmaps of every column of ``chunk``, created full-size when new"""
+        if chunk not in self._maps:
+            directory = self._chunk_dir(chunk)
+            columns = {}
+            if chunk == len(self.rows):
+                os.makedirs(directory, exist_ok=True)
+                for name, dtype in {**SAMPLE_COLUMNS, **PULSE_COLUMNS}.items():
+                    shape = ((self.chunk_pulses, self.max_samples) if name in SAMPLE_COLUMNS
+                             else (self.chunk_pulses,))
+                    columns[name] = np.lib.format.open_memmap(
+                        os.path.join(directory, f"{name}.npy"), mode='w+', dtype=dtype, shape=shape)
+                self.rows.append(0)
+            else:
+                file_mode = 'r+' if self.mode == 'a' else 'r'
+                for name in (*SAMPLE_COLUMNS, *PULSE_COLUMNS):
+                    columns[name] = np.load(os.path.join(directory, f"{name}.npy"),
+                                            mmap_mode=file_mode)
+            self._maps[chunk] = columns
+        return self._maps[chunk]
+
+    def append(self, counts, pulse, coil=0, session=0, start_us=0, t_us=None, n_samples=None):
+        """
+        Append one pulse (``counts`` 1-D) or a batch (``counts`` 2-D, pulses
+        on the first axis). Per-pulse arguments broadcast over the batch;
+        ``t_us`` defaults to the firmware's 10 µs sampling and ``n_samples``
+        to the width of ``counts``.
+        """
+        if self.mode != 'a':
+            raise ValueError("capture store is open read-only")
+        counts = np.atleast_2d(counts)
+        n, width = counts.shape
+        if width > self.max_samples:
+            raise ValueError(f"{width} samples per pulse, the store holds {self.max_samples}")
+        if t_us is None:
+            t_us = np.arange(width) * SAMPLE_INTERVAL_US
+        t_us = np.broadcast_to(t_us, counts.shape)
+        per_pulse = {
+            'pulse': pulse, 'coil': coil, 'session': session, 'start_us': start_us,
+            'n_samples': width if n_samples is None else n_samples,
+        }
+        per_pulse = {name: np.broadcast_to(value, (n,)) for name, value in per_pulse.items()}
+        self._index = None
+
+        done = 0
+        while done < n:
+            chunk = len(self.rows) - 1
+            if chunk < 0 or self.rows[chunk] == self.chunk_pulses:
+                chunk += 1
+            columns = self._columns(chunk)
+            row = self.rows[chunk]
+            take = min(n - done, self.chunk_pulses - row)
+            rows, source = slice(row, row + take), slice(done, done + take)
+            columns['counts'][rows, :width] = counts[source]
+            columns['t_us'][rows, :width] = t_us[source]
+            for name, value in per_pulse.items():
+                columns[name][rows] = value[source]
+            self.rows[chunk] += take
+            done += take
+
+    def flush(self):
+        """Write pending rows to disk and publish them in meta.json and the index"""
+        if self.mode != 'a':
+            return
+        for columns in self._maps.values():
+            for column in columns.values():
+                column.flush()
+        keys, rows = self._build_index()
+        _write_atomic(os.path.join(self.path, 'index.npy'),
+                      lambda f: np.save(f, np.stack([keys, rows])))
+        meta = {'version': STORE_VERSION, 'chunk_pulses': self.chunk_pulses,
+                'max_samples': self.max_samples, 'rows': self.rows}
+        _write_atomic(os.path.join(self.path, 'meta.json'),
+                      lambda f: f.write(json.dumps(meta).encode()))
+
+    def close(self):
+        self.flush()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- reading -------------------------------------------------------------
+
+    def __len__(self):
+        return sum(self.rows)
+
+    def chunk(self, chunk):
+        """Read-only views of the filled rows of every column of ``chunk``"""
+        views = {}
+        for name, column in self._columns(chunk).items():
+            view = column[:self.rows[chunk]]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def chunks(self):
+        """Iterate over ``chunk`` views of the whole store, for full scans"""
+        for chunk in range(len(self.rows)):
+            yield self.chunk(chunk)
+
+    def _build_index(self):
+        keys, rows = [], []
+        for chunk in range(len(self.rows)):
+            views = self.chunk(chunk)
+            keys.append(pulse_key(views['session'], views['coil'], views['pulse']))
+            rows.append(chunk * self.chunk_pulses + np.arange(self.rows[chunk]))
+        if not keys:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        keys, rows = np.concatenate(keys), np.concatenate(rows)
+        order = np.argsort(keys, kind='stable')
+        return keys[order], rows[order]
+
+    def _lookup(self):
+        """(sorted keys, global rows), from index.npy when it is current"""
+        if self._index is None:
+            path = os.path.join(self.path, 'index.npy')
+            index = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+            if index is not None and index.shape[1] == len(self):
+                self._index = (index[0], index[1])
+            else:
+                self._index = self._build_index()
+        return self._index
+
+    def select(self, session=None, coil=None, first=None, last=None):
+        """
+        Views of the pulses matching ``session``/``coil`` (None: any) with
+        pulse numbers in [first, last] (None: open-ended).
+
+        Returns a list of runs in storage order, each a dict of column
+        views over consecutive rows of one chunk; pulses recorded together
+        come back as a single view with no copying.
+        """
+        keys, rows = self._lookup()
+        if session is not None and coil is not None:
+            lo = pulse_key(session, coil, 0 if first is None else first)
+            hi = pulse_key(session, coil, (1 << PULSE_BITS) - 1 if last is None else last)
+            matched = rows[np.searchsorted(keys, lo, 'left'):np.searchsorted(keys, hi, 'right')]
+        else:
+            pulse = keys & ((1 << PULSE_BITS) - 1)
+            mask = np.ones(len(keys), dtype=bool)
+            if session is not None:
+                mask &= (keys >> (COIL_BITS + PULSE_BITS)) == session
+            if coil is not None:
+                mask &= ((keys >> PULSE_BITS) & ((1 << COIL_BITS) - 1)) == coil
+            if first is not None:
+                mask &= pulse >= first
+            if last is not None:
+                mask &= pulse <= last
+            matched = rows[mask]
+
+        matched = np.sort(matched)
+        if not len(matched):
+            return []
+        chunk = matched // self.chunk_pulses
+        breaks = np.flatnonzero((np.diff(matched) != 1) | (np.diff(chunk) != 0)) + 1
+        runs = []
+        for start, stop in zip(np.r_[0, breaks], np.r_[breaks, len(matched)]):
+            c = int(chunk[start])
+            row = int(matched[start]) - c * self.chunk_pulses
+            views = self.chunk(c)
+            runs.append({name: view[row:row + stop - start] for name, view in views.items()})
+        return runs
+
+    def waveform(self, pulse, coil=0, session=0):
+        """(t_us, counts) views of one pulse, trimmed to its samples"""
+        runs = self.select(session, coil, pulse, pulse)
+        if not runs:
+            raise KeyError(f"no pulse {pulse} of coil {coil} in session {session}")
+        n = int(runs[0]['n_samples'][0])
+        return runs[0]['t_us'][0, :n], runs[0]['counts'][0, :n]
+
+
+def synthetic_pulses(n_pulses, n_samples=60, voltage=24.0, resistance=4.8, tau_us=100.0,
+                     noise_counts=1.5, seed=0):
+    """
+    ADC counts of RL current rises sampled like firePulse(), with small
+    per-pulse resistance scatter and ADC noise; for tests and benchmarks.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) * SAMPLE_INTERVAL_US
+    r = resistance * (1 + 0.02 * rng.standard_normal((n_pulses, 1)))
+    current = voltage / r * (1 - np.exp(-t / tau_us))
+    noisy = current + rng.normal(0, noise_counts * counts_to_current(1), current.shape)
+    return current_to_counts(np.maximum(noisy, 0))
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    import time
+
+    n_coils, per_coil, batch = 13, 20_000, 5_000
+    path = tempfile.mkdtemp(prefix='capture_store_')
+    try:
+        start = time.perf_counter()
+        with CaptureStore(path, 'a') as store:
+            for coil in range(n_coils):
+                for first in range(1, per_coil + 1, batch):
+                    counts = synthetic_pulses(batch, seed=coil * per_coil + first)
+                    pulses = np.arange(first, first + batch)
+                    store.append(counts, pulses, coil=coil, session=1,
+                                 start_us=pulses * 2_000_000)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(d, f))
+                   for d, _, files in os.walk(path) for f in files)
+        print(f"Wrote {n_coils * per_coil:,} pulses ({size / 1e6:.0f} MB) in {elapsed:.2f} s")
+
+        store = CaptureStore(path)
+        start = time.perf_counter()
+        peaks = np.concatenate([views['counts'].max(axis=1) for views in store.chunks()])
+        elapsed = time.perf_counter() - start
+        scanned = len(store) * store.max_samples * 2
+        print(f"Scanned {len(store):,} pulses for peaks in {elapsed:.2f} s "
+              f"({scanned / elapsed / 1e9:.2f} GB/s), "
+              f"mean peak {counts_to_current(peaks.mean()):.2f} A")
+
+        start = time.perf_counter()
+        runs = store.select(session=1, coil=7, first=1_000, last=1_999)
+        elapsed = time.perf_counter() - start
+        print(f"Coil 7, pulses 1000-1999: {sum(len(r['pulse']) for r in runs)} pulses "
+              f"in {len(runs)} view(s), looked up in {elapsed * 1000:.2f} ms")
+        t_us, counts = store.waveform(1234, coil=7, session=1)
+        print(f"Pulse 1234 of coil 7: {len(counts)} samples, "
+              f"{counts_to_current(counts[-1]):.2f} A at {t_us[-1]} µs")
+    finally:
+        shutil.rmtree(path)
@@ -0,0 +1,243 @@
+"""
+Coil Design Model for Golden Ratio Motor
+Timing budgets, inductance limits, winding and bus capacitor calculations
+with no printing or plotting, so the math can be imported anywhere
+"""
+
+import math
+from functools import cached_property
+
+import numpy as np
+
+# Physical Constants
+PHI = (1 + math.sqrt(5)) / 2
+GOLDEN_ANGLE = 137.5  # degrees
+MU_0 = 4 * math.pi * 1e-7  # H/m
+
+# Motor Specifications (from visualization)
+RPM = 3000
+ROTATION_FREQ = RPM / 60  # Hz
+N_MAGNETS = 13
+PULSE_FREQ = ROTATION_FREQ * N_MAGNETS  # Hz
+PULSE_PERIOD = 1 / PULSE_FREQ  # seconds
+
+# Time Budget Breakdown (fractions of the pulse period)
+RISE_FRACTION = 0.3  # current ramps up
+HOLD_FRACTION = 0.4  # coil at full power
+FALL_FRACTION = 0.3  # current collapses
+
+PULSE_PERIOD_MS = PULSE_PERIOD * 1000
+RISE_TIME_BUDGET = RISE_FRACTION * PULSE_PERIOD_MS  # ms
+HOLD_TIME_BUDGET = HOLD_FRACTION * PULSE_PERIOD_MS  # ms
+FALL_TIME_BUDGET = FALL_FRACTION * PULSE_PERIOD_MS  # ms
+
+# L/R Time Constant
+# I(t) = I_max * (1 - e^(-t/(L/R))) reaches 90% after t = ln(10) * L/R ≈ 2.3 * L/R
+TIME_CONSTANTS_FOR_90_PERCENT = 2.3
+TAU_MAX_RISE = (RISE_TIME_BUDGET / 1000) / TIME_CONSTANTS_FOR_90_PERCENT  # seconds
+TAU_MAX_FALL = (FALL_TIME_BUDGET / 1000) / TIME_CONSTANTS_FOR_90_PERCENT  # seconds
+
+# Drive
+VOLTAGES = [12, 24, 48, 96]  # Common DC bus voltages
+TARGET_CURRENT = 5  # Amps (typical for small motor)
+OPTIMAL_VOLTAGE = 48  # good balance of switching speed and component stress
+
+# Typical values for small motor coil
+CORE_AREA_CM2 = 4  # cm²
+CORE_LENGTH_CM = 5  # cm
+MU_R_FERRITE = 2000  # relative permeability
+CORE_AREA = CORE_AREA_CM2 * 1e-4  # m²
+CORE_LENGTH = CORE_LENGTH_CM * 1e-2  # m
+AVG_TURN_LENGTH_CM = 8  # cm (depends on coil diameter)
+RESISTANCE_PER_M = 0.0132  # Ω/m for AWG 16
+RESISTANCE_MATCH_TOLERANCE = 0.3  # allowed winding vs target resistance mismatch
+CORE_WINDOW_AREA_CM2 = 2.5  # winding window of an E55 ferrite core
+
+# Copper wire
+COPPER_RESISTIVITY = 1.724e-8  # Ω·m @ 20°C
+COPPER_DENSITY = 8960  # kg/m³
+AMPACITY_A_PER_MM2 = 7.5  # matches the AWG 14/16/18 continuous ratings
+
+# Energy storage
+VOLTAGE_DROOP_PERCENT = 5  # Allow 5% voltage drop
+
+
+class CoilDesign:
+    """
+    One coil/drive operating point.
+
+    Every derived quantity is a lazily computed, cached property, so building
+    a design is free and only the numbers that are read get evaluated.
+    Inputs are plain attributes; create a new design rather than mutating one.
+
+    Parameters
+    ----------
+    voltage : float
+        DC bus voltage in V
+    current : float
+        Target coil current in A
+    rpm : float
+        Rotor speed the timing budgets are derived for
+    n_magnets : int
+        Magnets (pulses) per rotation
+    rise_fraction, hold_fraction : float
+        Share of the pulse period for current rise and hold; the rest is fall
+    core_area_cm2, core_length_cm : float
+        Core cross-section and magnetic path length
+    mu_r : float
+        Relative permeability of the core
+    avg_turn_length_cm : float
+        Mean length of one winding turn
+    resistance_per_m : float
+        Wire resistance in Ω/m
+    droop_percent : float
+        Allowed bus voltage droop during one pulse
+    """
+
+    def __init__(self, voltage=OPTIMAL_VOLTAGE, current=TARGET_CURRENT, rpm=RPM,
+                 n_magnets=N_MAGNETS, rise_fraction=RISE_FRACTION,
+                 hold_fraction=HOLD_FRACTION, core_area_cm2=CORE_AREA_CM2,
+                 core_length_cm=CORE_LENGTH_CM, mu_r=MU_R_FERRITE,
+                 avg_turn_length_cm=AVG_TURN_LENGTH_CM,
+                 resistance_per_m=RESISTANCE_PER_M,
+                 droop_percent=VOLTAGE_DROOP_PERCENT):
+        self.voltage = voltage
+        self.current = current
+        self.rpm = rpm
+        self.n_magnets = n_magnets
+        self.rise_fraction = rise_fraction
+        self.hold_fraction = hold_fraction
+        self.core_area_cm2 = core_area_cm2
+        self.core_length_cm = core_length_cm
+        self.mu_r = mu_r
+        self.avg_turn_length_cm = avg_turn_length_cm
+        self.resistance_per_m = resistance_per_m
+        self.droop_percent = droop_percent
+
+    def __repr__(self):
+        return (f"CoilDesign(voltage={self.voltage}, current={self.current}, "
+                f"rpm={self.rpm}, mu_r={self.mu_r})")
+
+    # Timing
+
+    @cached_property
+    def fall_fraction(self):
+        return 1 - self.rise_fraction - self.hold_fraction
+
+    @cached_property
+    def pulse_freq(self):
+        """Pulse frequency in Hz"""
+        return self.rpm / 60 * self.n_magnets
+
+    @cached_property
+    def pulse_period_ms(self):
+        return 1000 / self.pulse_freq
+
+    @cached_property
+    def rise_time_budget(self):
+        """Rise budget in ms"""
+        return self.rise_fraction * self.pulse_period_ms
+
+    @cached_property
+    def hold_time_budget(self):
+        """Hold budget in ms"""
+        return self.hold_fraction * self.pulse_period_ms
+
+    @cached_property
+    def fall_time_budget(self):
+        """Fall budget in ms"""
+        return self.fall_fraction * self.pulse_period_ms
+
+    @cached_property
+    def tau_max_rise(self):
+        """Largest L/R (s) that still reaches 90% current within the rise budget"""
+        return (self.rise_time_budget / 1000) / TIME_CONSTANTS_FOR_90_PERCENT
+
+    @cached_property
+    def tau_max_fall(self):
+        """Largest L/R (s) that still collapses within the fall budget"""
+        return (self.fall_time_budget / 1000) / TIME_CONSTANTS_FOR_90_PERCENT
+
+    # Resistance & inductance limits
+
+    @cached_property
+    def R(self):
+        """Target coil resistance in Ω"""
+        return self.voltage / self.current
+
+    @cached_property
+    def L_max(self):
+        """Maximum inductance in H"""
+        return self.tau_max_rise * self.R
+
+    @cached_property
+    def L_max_mH(self):
+        return self.L_max * 1000
+
+    @cached_property
+    def P(self):
+        """Peak power per coil in W"""
+        return self.voltage * self.current
+
+    # Winding
+
+    @cached_property
+    def N_turns(self):
+        """Turns giving L_max: N = sqrt(L * l / (μ₀ * μᵣ * A))"""
+        return math.sqrt(self.L_max * self.core_length_cm * 1e-2
+                         / (MU_0 * self.mu_r * self.core_area_cm2 * 1e-4))
+
+    @cached_property
+    def total_wire_length_m(self):
+        return self.N_turns * self.avg_turn_length_cm / 100
+
+    @cached_property
+    def calculated_resistance(self):
+        """Resistance of the winding in Ω"""
+        return self.total_wire_length_m * self.resistance_per_m
+
+    @cached_property
+    def resistance_mismatch(self):
+        """Relative difference between winding and target resistance"""
+        return abs(self.calculated_resistance - self.R) / self.R
+
+    @cached_property
+    def resistance_ok(self):
+        return self.resistance_mismatch <= RESISTANCE_MATCH_TOLERANCE
+
+    # Energy storage
+
+    @cached_property
+    def energy_per_pulse(self):
+        """Energy drawn during the hold time in J"""
+        return self.P * self.hold_time_budget / 1000
+
+    @cached_property
+    def C_min(self):
+        """
+        Minimum bus capacitance in F.
+
+        For voltage droop ΔE = 0.5 * C * (V² - (V-ΔV)²), simplified to
+        C ≈ E / (V * ΔV).
+        """
+        dv = self.voltage * self.droop_percent / 100
+        return self.energy_per_pulse / (self.voltage * dv)
+
+    @cached_property
+    def C_min_uF(self):
+        return self.C_min * 1e6
+
+
+def voltage_table(voltages=VOLTAGES, current=TARGET_CURRENT, **kwargs):
+    """Resistance, maximum inductance and power for each drive voltage"""
+    rows = []
+    for V in voltages:
+        design = CoilDesign(voltage=V, current=current, **kwargs)
+        rows.append({'V': V, 'R': design.R, 'L_max': design.L_max,
+                     'L_max_mH': design.L_max_mH, 'P': design.P})
+    return rows
+
+
+def awg_diameter_m(awg):
+    """Bare copper diameter of an AWG gauge (scalar or array) in metres"""
+    return 0.127e-3 * 92 ** ((36 - np.asarray(awg, dtype=float)) / 39)
@@ -0,0 +1,253 @@
+"""
+Monte Carlo Tolerance Analysis for Golden Ratio Motor Coils
+Samples core permeability, core area and turn length around their nominal
+values and measures how many hand-wound coils still meet the L/R budget
+
+The drive reaches the design's loop resistance R with a series resistor
+sized once for the nominal winding, so every build's τ is its inductance
+over that resistor plus its own sampled winding resistance.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from coil_design import MU_0, RESISTANCE_MATCH_TOLERANCE, CoilDesign
+
+# Relative spread of each input: ('normal', sigma) or ('uniform', half-width)
+TOLERANCES = {
+    'mu_r': ('normal', 0.20),  # ferrite μᵣ is typically quoted ±20-25%
+    'core_area_cm2': ('normal', 0.03),
+    'avg_turn_length_cm': ('uniform', 0.15),  # hand winding tension and spacing
+}
+
+CHUNK_SIZE = 500_000  # samples evaluated per task
+HIST_BINS = 200
+HIST_RANGE = (0.0, 2.0)  # histogram range as a multiple of the nominal value
+QUANTITIES = ('tau', 'inductance', 'resistance')
+
+
+def _sample(rng, nominal, spec, n):
+    kind, spread = spec
+    if kind == 'normal':
+        factor = 1 + spread * rng.standard_normal(n)
+    elif kind == 'uniform':
+        factor = 1 + spread * rng.uniform(-1, 1, n)
+    else:
+        raise ValueError(f"unknown distribution {kind!r}")
+    return nominal * np.maximum(factor, 1e-3)
+
+
+def _histogram(values, nominal, bins=HIST_BINS, value_range=HIST_RANGE):
+    """Counts on a fixed grid; the outer bins also collect out-of-range values"""
+    lo, hi = value_range
+    idx = ((values / nominal - lo) * (bins / (hi - lo))).astype(np.int64)
+    np.clip(idx, 0, bins - 1, out=idx)
+    return np.bincount(idx, minlength=bins)
+
+
+def _evaluate_chunk(task):
+    """Evaluate one chunk of samples and return only its aggregates"""
+    chunk_index, n, seed, params, tolerances = task
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+
+    mu_r = _sample(rng, params['mu_r'], tolerances['mu_r'], n)
+    area_cm2 = _sample(rng, params['core_area_cm2'], tolerances['core_area_cm2'], n)
+    turn_cm = _sample(rng, params['avg_turn_length_cm'], tolerances['avg_turn_length_cm'], n)
+
+    n_turns = params['n_turns']
+    inductance = MU_0 * mu_r * n_turns ** 2 * area_cm2 * 1e-4 / (params['core_length_cm'] * 1e-2)
+    resistance = n_turns * turn_cm / 100 * params['resistance_per_m']
+    loop_resistance = params['series_resistance'] + resistance
+    tau = inductance / loop_resistance
+
+    tau_ok = tau < params['tau_max_rise']
+    r_ok = np.abs(loop_resistance - params['R']) / params['R'] <= RESISTANCE_MATCH_TOLERANCE
+
+    values = {'tau': tau, 'inductance': inductance, 'resistance': resistance}
+    return {
+        'n': n,
+        'tau_ok': int(np.count_nonzero(tau_ok)),
+        'resistance_ok': int(np.count_nonzero(r_ok)),
+        'both_ok': int(np.count_nonzero(tau_ok & r_ok)),
+        'sum': {q: float(v.sum()) for q, v in values.items()},
+        'sum_sq': {q: float(np.dot(v, v)) for q, v in values.items()},
+        'hist': {q: _histogram(v, params['nominal'][q]) for q, v in values.items()},
+    }
+
+
+def _merge(total, part):
+    total['n'] += part['n']
+    for key in ('tau_ok', 'resistance_ok', 'both_ok'):
+        total[key] += part[key]
+    for q in QUANTITIES:
+        total['sum'][q] += part['sum'][q]
+        total['sum_sq'][q] += part['sum_sq'][q]
+        total['hist'][q] += part['hist'][q]
+
+
+def _summary(total, params):
+    n = total['n']
+    result = {
+        'n_samples': n,
+        'n_turns': params['n_turns'],
+        'nominal': params['nominal'],
+        'tau_max_rise': params['tau_max_rise'],
+        'R': params['R'],
+        'series_resistance': params['series_resistance'],
+        'resistance_matchable': params['resistance_matchable'],
+        'tau_yield': total['tau_ok'] / n,
+        'resistance_yield': total['resistance_ok'] / n,
+        'yield': total['both_ok'] / n,
+        'mean': {}, 'std': {},
+        'hist': {q: total['hist'][q].copy() for q in QUANTITIES},
+        'bin_edges': {q: np.linspace(*HIST_RANGE, HIST_BINS + 1) * params['nominal'][q]
+                      for q in QUANTITIES},
+    }
+    for q in QUANTITIES:
+        mean = total['sum'][q] / n
+        result['mean'][q] = mean
+        result['std'][q] = math.sqrt(max(total['sum_sq'][q] / n - mean * mean, 0.0))
+    return result
+
+
+def iter_monte_carlo(design=None, n_samples=10**6, n_turns=None, tolerances=TOLERANCES,
+                     series_resistance=None, workers=None, chunk_size=CHUNK_SIZE, seed=0):
+    """
+    Run the tolerance analysis, yielding the running aggregate after each chunk.
+
+    Chunks are spread over a process pool with at most two tasks in flight
+    per worker. Each task returns histogram counts and sums rather than the
+    samples, so memory stays bounded however large ``n_samples`` is.
+    Results are reproducible for a given ``seed`` and ``chunk_size``.
+
+    Parameters
+    ----------
+    design : CoilDesign
+        Nominal design (48V default)
+    n_samples : int
+        Total number of simulated coil builds
+    n_turns : float
+        Turns actually wound; defaults to the nominal turn count rounded
+        down, since a hand-wound coil has whole turns
+    tolerances : dict
+        Distribution of each input, see ``TOLERANCES``
+    series_resistance : float
+        Resistance (Ω) in the loop besides the winding; defaults to what
+        brings the nominal winding up to ``design.R`` (0 if it is above)
+    workers : int
+        Worker processes; 1 evaluates in-process
+    """
+    if n_samples < 1:
+        raise ValueError("n_samples must be at least 1")
+    if design is None:
+        design = CoilDesign()
+    if n_turns is None:
+        n_turns = max(math.floor(design.N_turns), 1)
+
+    nominal_L = MU_0 * design.mu_r * n_turns ** 2 * design.core_area_cm2 * 1e-4 / (
+        design.core_length_cm * 1e-2)
+    nominal_R = n_turns * design.avg_turn_length_cm / 100 * design.resistance_per_m
+    if series_resistance is None:
+        series_resistance = max(design.R - nominal_R, 0.0)
+    nominal_loop = series_resistance + nominal_R
+    params = {
+        'mu_r': design.mu_r,
+        'core_area_cm2': design.core_area_cm2,
+        'avg_turn_length_cm': design.avg_turn_length_cm,
+        'core_length_cm': design.core_length_cm,
+        'resistance_per_m': design.resistance_per_m,
+        'R': design.R,
+        'series_resistance': series_resistance,
+        # A nominal loop outside the tolerance fails every build by construction
+        'resistance_matchable': abs(nominal_loop - design.R) / design.R
+                                <= RESISTANCE_MATCH_TOLERANCE,
+        'tau_max_rise': design.tau_max_rise,
+        'n_turns': n_turns,
+        'nominal': {
+            'tau': nominal_L / nominal_loop,
+            'inductance': nominal_L,
+            'resistance': nominal_R,
+        },
+    }
+
+    sizes = [chunk_size] * (n_samples // chunk_size)
+    if n_samples % chunk_size:
+        sizes.append(n_samples % chunk_size)
+    tasks = ((k, n, seed, params, tolerances) for k, n in enumerate(sizes))
+
+    total = {'n': 0, 'tau_ok': 0, 'resistance_ok': 0, 'both_ok': 0,
+             'sum': dict.fromkeys(QUANTITIES, 0.0), 'sum_sq': dict.fromkeys(QUANTITIES, 0.0),
+             'hist': {q: np.zeros(HIST_BINS, dtype=np.int64) for q in QUANTITIES}}
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            _merge(total, _evaluate_chunk(task))
+            yield _summary(total, params)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_in_flight = 2 * workers
+        pending = set()
+        for task in tasks:
+            pending.add(pool.submit(_evaluate_chunk, task))
+            if len(pending) < max_in_flight:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _merge(total, future.result())
+                yield _summary(total, params)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _merge(total, future.result())
+                yield _summary(total, params)
+
+
+def monte_carlo(design=None, n_samples=10**6, **kwargs):
+    """Run the tolerance analysis to completion and return the final aggregate"""
+    result = None
+    for result in iter_monte_carlo(design, n_samples, **kwargs):
+        pass
+    return result
+
+
+def print_tolerance_report(result):
+    """Print yield statistics and spreads from a Monte Carlo result"""
+    print(f"\n{'COIL WINDING TOLERANCE ANALYSIS':^70}")
+    print("-" * 70)
+    print(f"Simulated builds:         {result['n_samples']:,}")
+    print(f"Turns wound:              {result['n_turns']}")
+    print(f"Maximum τ (tau) for rise: {result['tau_max_rise']*1e6:.1f} µs")
+    print(f"Loop resistance for τ:    winding + {result['series_resistance']:.3f} Ω series "
+          f"(target R {result['R']:.3f} Ω)")
+    print(f"\n{'Quantity':>12} | {'Nominal':>12} | {'Mean':>12} | {'Std dev':>10}")
+    print("-" * 70)
+    units = {'tau': ('µs', 1e6), 'inductance': ('mH', 1e3), 'resistance': ('Ω', 1)}
+    for q in QUANTITIES:
+        unit, scale = units[q]
+        print(f"{q:>12} | {result['nominal'][q]*scale:9.3f} {unit:>2} | "
+              f"{result['mean'][q]*scale:9.3f} {unit:>2} | {result['std'][q]*scale:10.3f}")
+    print(f"\nYield (τ < TAU_MAX_RISE):          {result['tau_yield']*100:6.2f}%")
+    if result['resistance_matchable']:
+        print(f"Yield (loop R within {RESISTANCE_MATCH_TOLERANCE:.0%}):        "
+              f"{result['resistance_yield']*100:6.2f}%")
+        print(f"Yield (both):                      {result['yield']*100:6.2f}%")
+    else:
+        nominal_loop = result['series_resistance'] + result['nominal']['resistance']
+        print(f"Yield (loop R within {RESISTANCE_MATCH_TOLERANCE:.0%}):           n/a "
+              f"(nominal loop {nominal_loop:.3f} Ω is off target; change the winding)")
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    result = monte_carlo(n_samples=10**7)
+    elapsed = time.perf_counter() - start
+    print_tolerance_report(result)
+    print(f"\n{result['n_samples']:,} samples in {elapsed:.1f} s "
+          f"({result['n_samples'] / elapsed / 1e6:.1f} M samples/s)")
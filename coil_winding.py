@@ -0,0 +1,159 @@
+"""
+Coil Winding Solver for Golden Ratio Motor
+Picks wire gauge and turn count together so a coil meets both the L_max
+limit and the target resistance, and checks that it fits the core window
+"""
+
+import math
+from functools import lru_cache
+from typing import NamedTuple
+
+from coil_design import (
+    MU_0, CORE_AREA_CM2, CORE_LENGTH_CM, MU_R_FERRITE, AVG_TURN_LENGTH_CM,
+    CORE_WINDOW_AREA_CM2, RESISTANCE_MATCH_TOLERANCE, COPPER_RESISTIVITY,
+    AMPACITY_A_PER_MM2, awg_diameter_m,
+)
+
+HAND_WINDING_FILL = 0.65  # packing of round wire wound by hand (0.91 is ideal hexagonal)
+SOLVER_CACHE_SIZE = 4096
+
+
+class WireGauge(NamedTuple):
+    awg: int
+    diameter_mm: float  # bare copper
+    insulated_diameter_mm: float  # heavy-build enamel
+    resistance_per_m: float  # Ω/m @ 20°C
+    ampacity: float  # A continuous
+    fill_factor: float  # copper share of the winding window
+
+
+def _wire_gauge(awg):
+    diameter = float(awg_diameter_m(awg)) * 1e3  # mm
+    insulated = diameter + 0.02 + 0.045 * math.sqrt(diameter)
+    area = math.pi / 4 * diameter ** 2
+    return WireGauge(
+        awg=awg,
+        diameter_mm=diameter,
+        insulated_diameter_mm=insulated,
+        resistance_per_m=COPPER_RESISTIVITY / (area * 1e-6),
+        ampacity=AMPACITY_A_PER_MM2 * area,
+        fill_factor=HAND_WINDING_FILL * (diameter / insulated) ** 2,
+    )
+
+
+AWG_TABLE = tuple(_wire_gauge(awg) for awg in range(10, 45))
+
+
+class WindingSolution(NamedTuple):
+    feasible: bool
+    awg: int
+    turns: int
+    inductance: float  # H
+    resistance: float  # Ω
+    mismatch: float  # relative to the target resistance
+    ampacity_ok: bool
+    window_fill: float  # share of the usable window taken (> 1 does not fit)
+    reason: str
+
+
+def _check(gauge, turns, L_per_turn2, turn_length_m, window_mm2, R_target,
+           current_rms, tolerance):
+    resistance = turns * turn_length_m * gauge.resistance_per_m
+    mismatch = abs(resistance - R_target) / R_target
+    ampacity_ok = gauge.ampacity >= current_rms
+    copper_mm2 = turns * math.pi / 4 * gauge.diameter_mm ** 2
+    window_fill = copper_mm2 / (window_mm2 * gauge.fill_factor)
+
+    problems = []
+    if mismatch > tolerance:
+        problems.append(f"resistance off by {mismatch:.0%}")
+    if not ampacity_ok:
+        problems.append(f"AWG {gauge.awg} rated {gauge.ampacity:.2f} A < {current_rms:.2f} A RMS")
+    if window_fill > 1:
+        problems.append(f"winding needs {window_fill:.0%} of the core window")
+    return WindingSolution(
+        feasible=not problems,
+        awg=gauge.awg,
+        turns=turns,
+        inductance=L_per_turn2 * turns ** 2,
+        resistance=resistance,
+        mismatch=mismatch,
+        ampacity_ok=ampacity_ok,
+        window_fill=window_fill,
+        reason="; ".join(problems) or "ok",
+    )
+
+
+@lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def solve_winding(L_max, R_target, current, core_area_cm2=CORE_AREA_CM2,
+                  core_length_cm=CORE_LENGTH_CM, mu_r=MU_R_FERRITE,
+                  avg_turn_length_cm=AVG_TURN_LENGTH_CM,
+                  window_area_cm2=CORE_WINDOW_AREA_CM2,
+                  tolerance=RESISTANCE_MATCH_TOLERANCE, duty=1.0):
+    """
+    Choose gauge and turns meeting L_max and R_target within ``tolerance``.
+
+    For every gauge the turn count is the one giving the target resistance,
+    capped at the most turns L_max allows. Among feasible windings the
+    closest resistance match wins, then the thicker wire. When nothing is
+    feasible, the closest match among the gauges that carry the current and
+    fit the window is returned with ``feasible=False`` and the reason (its
+    resistance is off, so it needs series resistance or another core). When
+    no gauge carries the current in the window, the solution has no gauge
+    (``turns=0``) and only the reason. Results are memoized on the (hashable)
+    inputs, so the report and interactive tools never re-solve the same
+    design; the vectorized sweeps in electrical_specs use a fixed gauge per
+    grid point and do not call the solver.
+
+    Parameters
+    ----------
+    L_max : float
+        Inductance limit in H
+    R_target : float
+        Target coil resistance in Ω
+    current : float
+        Peak coil current in A
+    duty : float
+        Share of time the coil conducts; ampacity is checked at the RMS current
+    """
+    L_per_turn2 = MU_0 * mu_r * core_area_cm2 * 1e-4 / (core_length_cm * 1e-2)
+    max_turns = math.floor(math.sqrt(L_max / L_per_turn2))
+    turn_length_m = avg_turn_length_cm / 100
+    window_mm2 = window_area_cm2 * 100
+    current_rms = current * math.sqrt(duty)
+
+    if max_turns < 1:
+        return WindingSolution(False, 0, 0, 0.0, 0.0, 1.0, False, 0.0,
+                               "L_max is below one turn on this core")
+
+    candidates = []
+    for gauge in AWG_TABLE:
+        turns_for_R = R_target / (turn_length_m * gauge.resistance_per_m)
+        turns = min(max_turns, max(1, round(turns_for_R)))
+        candidates.append(_check(gauge, turns, L_per_turn2, turn_length_m, window_mm2,
+                                 R_target, current_rms, tolerance))
+
+    feasible = [c for c in candidates if c.feasible]
+    if feasible:
+        return min(feasible, key=lambda c: (c.mismatch, c.awg))
+    # Never suggest a wire that would overheat or not fit, however well it matches R
+    usable = [c for c in candidates if c.ampacity_ok and c.window_fill <= 1]
+    if usable:
+        return min(usable, key=lambda c: (c.mismatch, c.awg))
+    rated = [c for c in candidates if c.ampacity_ok]
+    if rated:
+        reason = (f"every gauge rated for {current_rms:.2f} A RMS needs more than the core "
+                  f"window at the turns L_max allows")
+    else:
+        reason = f"no gauge up to AWG {AWG_TABLE[0].awg} is rated for {current_rms:.2f} A RMS"
+    return WindingSolution(False, 0, 0, 0.0, 0.0, 1.0, False, 0.0, reason)
+
+
+def solve_design_winding(design, window_area_cm2=CORE_WINDOW_AREA_CM2):
+    """Solve the winding for a CoilDesign (cached via ``solve_winding``)"""
+    duty = (design.rise_fraction + design.hold_fraction) / design.n_magnets
+    return solve_winding(design.L_max, design.R, design.current,
+                         core_area_cm2=design.core_area_cm2,
+                         core_length_cm=design.core_length_cm, mu_r=design.mu_r,
+                         avg_turn_length_cm=design.avg_turn_length_cm,
+                         window_area_cm2=window_area_cm2, duty=duty)
@@ -0,0 +1,326 @@
+"""
+Design Database for Golden Ratio Motor
+Keeps every evaluated coil design, its inputs and derived metrics in an
+embedded SQLite file so sweeps can be compared and queried after the fact
+
+One row per design point, keyed by a 64-bit hash of its ``evaluate_designs``
+inputs (voltage, current, budget split, core, μᵣ, AWG, speed, ...) used as
+the SQLite rowid. The inputs are stored alongside the sweep outputs (R,
+L_max, P, N_turns, calculated resistance, C_min, copper mass, RPM limit,
+feasibility); unit-scaled values (L_max_mH, C_min_uF) and the timing
+budgets of the pulse are generated columns computed on read. Indexes on
+L_max and C_min, alone and after voltage, serve range queries such as
+
+    store.select(V=48, L_max=(1e-4, None), C_min=(None, 500e-6))
+
+``add_sweep`` evaluates only the grid points not stored yet and inserts
+them in batched transactions, so widening one axis of a sweep costs only
+the new points. Each completed grid leaves a fingerprint of its keys, and
+re-running it skips the database lookup altogether.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from coil_design import (N_MAGNETS, RESISTANCE_MATCH_TOLERANCE, RPM, CORE_LENGTH_CM,
+                         TIME_CONSTANTS_FOR_90_PERCENT, VOLTAGE_DROOP_PERCENT)
+from electrical_specs import (SWEEP_AWG, SWEEP_BUDGET_SPLITS, SWEEP_CORE_AREAS_CM2,
+                              SWEEP_CURRENTS, SWEEP_MU_R, SWEEP_VOLTAGES, design_grid,
+                              evaluate_designs)
+
+DEFAULT_DB = 'motor_designs.sqlite'
+MODEL_VERSION = 1  # bump when evaluate_designs changes so stale metrics are dropped
+BATCH_ROWS = 50_000  # rows per executemany / transaction
+
+INPUT_COLUMNS = ('V', 'I', 'rise_frac', 'hold_frac', 'core_area_cm2', 'mu_r', 'awg',
+                 'rpm', 'n_magnets', 'core_length_cm', 'droop_percent', 'match_tolerance')
+METRIC_COLUMNS = ('R', 'L_max', 'P', 'N_turns', 'wire_length_m', 'R_calc', 'mismatch',
+                  'copper_mass_kg', 'ampacity', 'I_rms', 'C_min', 'turns_wound', 'tau',
+                  'rpm_limit', 'feasible')
+# Computed by SQLite when read, so they cost neither insert time nor file space
+DERIVED_COLUMNS = {
+    'fall_frac': '1 - rise_frac - hold_frac',
+    'L_max_mH': 'L_max * 1000.0',
+    'C_min_uF': 'C_min * 1000000.0',
+    'pulse_period_ms': '60000.0 / (rpm * n_magnets)',
+    'rise_time_budget': 'rise_frac * 60000.0 / (rpm * n_magnets)',
+    'hold_time_budget': 'hold_frac * 60000.0 / (rpm * n_magnets)',
+    'fall_time_budget': '(1 - rise_frac - hold_frac) * 60000.0 / (rpm * n_magnets)',
+    'tau_max_rise': f'rise_frac * 60.0 / (rpm * n_magnets) / {TIME_CONSTANTS_FOR_90_PERCENT!r}',
+    'tau_max_fall': f'(1 - rise_frac - hold_frac) * 60.0 / (rpm * n_magnets) '
+                    f'/ {TIME_CONSTANTS_FOR_90_PERCENT!r}',
+}
+COLUMNS = INPUT_COLUMNS + tuple(DERIVED_COLUMNS) + METRIC_COLUMNS
+INDEXES = {
+    'designs_v_lmax': ('V', 'L_max'),
+    'designs_v_cmin': ('V', 'C_min'),
+    'designs_lmax': ('L_max',),
+    'designs_cmin': ('C_min',),
+}
+BULK_LOAD_RATIO = 0.5  # rebuild the indexes after inserts larger than this share of the table
+KEY_SEED = np.uint64(0x9E3779B97F4A7C15)
+KEY_MULTIPLIER = np.uint64(0xBF58476D1CE4E5B9)
+
+
+def design_keys(inputs):
+    """64-bit key of each design point (flat arrays), mixed from the bits of its inputs"""
+    n = len(np.asarray(inputs['V']))
+    key = np.full(n, KEY_SEED, dtype=np.uint64)
+    for name in INPUT_COLUMNS:
+        bits = np.ascontiguousarray(np.broadcast_to(
+            np.asarray(inputs[name], dtype=np.float64), (n,))).view(np.uint64)
+        key = (key ^ bits) * KEY_MULTIPLIER
+        key ^= key >> np.uint64(31)
+    return key.view(np.int64)
+
+
+def grid_fingerprint(inputs):
+    """64-bit fingerprint of the set of design points in ``inputs``, in any order"""
+    keys = np.sort(design_keys(inputs))
+    return int.from_bytes(hashlib.blake2b(keys.tobytes(), digest_size=8).digest(),
+                          'little', signed=True)
+
+
+def _rows(columns, values):
+    """Row tuples of plain Python numbers for executemany"""
+    return zip(*(np.asarray(values[name]).tolist() for name in columns))
+
+
+class DesignStore:
+    """
+    SQLite table of evaluated designs.
+
+    Parameters
+    ----------
+    path : str
+        Database file, created on first use (``':memory:'`` for a scratch store)
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._create()
+
+    def _create(self):
+        columns = ', '.join(
+            [f'{name} INTEGER NOT NULL' if name == 'n_magnets' else f'{name} REAL NOT NULL'
+             for name in INPUT_COLUMNS]
+            + [f'{name} REAL GENERATED ALWAYS AS ({expr}) VIRTUAL'
+               for name, expr in DERIVED_COLUMNS.items()]
+            + [f'{name} INTEGER' if name == 'feasible' else f'{name} REAL'
+               for name in METRIC_COLUMNS])
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)')
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS designs ('
+                              f'id INTEGER PRIMARY KEY, {columns}, created REAL)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS sweeps '
+                              '(fingerprint INTEGER PRIMARY KEY, n_points INTEGER, created REAL)')
+            self._create_indexes()
+            stored = self.conn.execute("SELECT value FROM meta WHERE key = 'model_version'"
+                                       ).fetchone()
+            if stored is not None and stored[0] != MODEL_VERSION:
+                # Metrics from another version of the model would be wrong
+                self.conn.execute('DELETE FROM designs')
+                self.conn.execute('DELETE FROM sweeps')
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('model_version', ?)",
+                              (MODEL_VERSION,))
+
+    def _create_indexes(self):
+        for name, indexed in INDEXES.items():
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON designs '
+                              f'({", ".join(indexed)})')
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM designs').fetchone()[0]
+
+    def missing(self, inputs):
+        """Positions of the design points in ``inputs`` (flat arrays) not stored yet"""
+        keys = design_keys(inputs)
+        # Read every stored id once (SQLite scans them from its smallest index,
+        # so they arrive unsorted) and look the keys up by binary search
+        rows = self.conn.execute('SELECT id FROM designs')
+        stored = np.sort(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(self)))
+        if not len(stored):
+            return np.arange(len(keys))
+        found = stored[np.minimum(np.searchsorted(stored, keys), len(stored) - 1)] == keys
+        return np.flatnonzero(~found)
+
+    def insert(self, designs):
+        """
+        Store evaluated designs (flat arrays of every input and metric
+        column), ignoring points already stored. One transaction of
+        BATCH_ROWS-row ``executemany`` calls; a load larger than
+        BULK_LOAD_RATIO of the table drops the indexes and rebuilds them
+        once at the end, which is far cheaper than updating them per row.
+        """
+        columns = ('id',) + INPUT_COLUMNS + METRIC_COLUMNS
+        keys = design_keys(designs)
+        order = np.argsort(keys)  # rowid order appends to the table b-tree
+        n = len(keys)
+        values = {name: np.broadcast_to(np.asarray(designs[name]), (n,))[order]
+                  for name in columns[1:]}
+        values['id'] = keys[order]
+        values['feasible'] = values['feasible'].astype(int)
+        sql = (f'INSERT OR IGNORE INTO designs ({", ".join(columns)}, created) '
+               f'VALUES ({", ".join("?" * len(columns))}, {time.time()!r})')
+        bulk = n > BULK_LOAD_RATIO * len(self)
+        with self.conn:
+            if bulk:
+                for name in INDEXES:
+                    self.conn.execute(f'DROP INDEX IF EXISTS {name}')
+            for start in range(0, n, BATCH_ROWS):
+                part = {name: value[start:start + BATCH_ROWS] for name, value in values.items()}
+                self.conn.executemany(sql, _rows(columns, part))
+            if bulk:
+                self._create_indexes()
+        return n
+
+    def add_sweep(self, voltages=SWEEP_VOLTAGES, currents=SWEEP_CURRENTS,
+                  budget_splits=SWEEP_BUDGET_SPLITS, core_areas_cm2=SWEEP_CORE_AREAS_CM2,
+                  mu_rs=SWEEP_MU_R, awgs=SWEEP_AWG, **kwargs):
+        """
+        Evaluate and store the points of a ``sweep_design_space`` grid that
+        are not in the database yet. Keyword arguments (rpm, n_magnets,
+        core_length_cm, droop_percent, match_tolerance) apply to every point
+        and are part of its key.
+
+        Returns a dict with ``n_grid``, ``n_new`` and ``seconds``.
+        """
+        start = time.perf_counter()
+        grid = design_grid(voltages, currents, budget_splits, core_areas_cm2, mu_rs, awgs)
+        fixed = {'rpm': RPM, 'n_magnets': N_MAGNETS, 'core_length_cm': CORE_LENGTH_CM,
+                 'droop_percent': VOLTAGE_DROOP_PERCENT,
+                 'match_tolerance': RESISTANCE_MATCH_TOLERANCE}
+        unknown = set(kwargs) - set(fixed)
+        if unknown:
+            raise TypeError(f"unknown sweep parameters: {sorted(unknown)}")
+        fixed.update(kwargs)
+        n_grid = len(grid['V'])
+        inputs = {**grid, **{name: np.full(n_grid, value) for name, value in fixed.items()}}
+
+        fingerprint = grid_fingerprint(inputs)
+        if self.conn.execute('SELECT 1 FROM sweeps WHERE fingerprint = ?',
+                             (fingerprint,)).fetchone():
+            return {'n_grid': n_grid, 'n_new': 0, 'seconds': time.perf_counter() - start}
+        new = self.missing(inputs)
+        if len(new):
+            inputs = {name: value[new] for name, value in inputs.items()}
+            self.insert({**inputs, **evaluate_designs(**{name: inputs[name] for name in grid},
+                                                      **fixed)})
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO sweeps VALUES (?, ?, ?)',
+                              (fingerprint, n_grid, time.time()))
+        return {'n_grid': n_grid, 'n_new': len(new), 'seconds': time.perf_counter() - start}
+
+    def select(self, order_by=None, limit=None, columns=None, **filters):
+        """
+        Stored designs matching ``filters`` as a dict of arrays (like a sweep).
+
+        Each filter names a column: a number selects equality, a
+        ``(low, high)`` pair a closed range with ``None`` for an open end,
+        e.g. ``select(V=48, L_max=(1e-4, None), C_min=(None, 500e-6))``.
+        ``order_by`` is a column name (prefix ``-`` for descending).
+        """
+        names = COLUMNS
+        columns = tuple(columns or names)
+        unknown = (set(filters) | set(columns)) - set(names)
+        if order_by is not None:
+            unknown |= {order_by.lstrip('-')} - set(names)
+        if unknown:
+            raise ValueError(f"unknown columns: {sorted(unknown)}")
+
+        clauses, params = [], []
+        for name, value in filters.items():
+            if isinstance(value, (tuple, list)):
+                low, high = value
+                if low is not None:
+                    clauses.append(f'{name} >= ?')
+                    params.append(float(low))
+                if high is not None:
+                    clauses.append(f'{name} <= ?')
+                    params.append(float(high))
+            else:
+                clauses.append(f'{name} = ?')
+                params.append(value.item() if isinstance(value, np.generic) else value)
+        sql = f'SELECT {", ".join(columns)} FROM designs'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        if order_by is not None:
+            sql += f" ORDER BY {order_by.lstrip('-')}{' DESC' if order_by.startswith('-') else ''}"
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        rows = self.conn.execute(sql, params).fetchall()
+        table = np.array(rows, dtype=float).reshape(len(rows), len(columns))
+        result = {name: table[:, k] for k, name in enumerate(columns)}
+        if 'feasible' in result:
+            result['feasible'] = result['feasible'].astype(bool)
+        return result
+
+    def query_plan(self, **filters):
+        """SQLite's plan for a ``select`` with these filters (to check index use)"""
+        clauses = [f'{name} BETWEEN ? AND ?' if isinstance(value, (tuple, list))
+                   else f'{name} = ?' for name, value in filters.items()]
+        params = []
+        for value in filters.values():
+            if isinstance(value, (tuple, list)):
+                params += [-np.inf if value[0] is None else value[0],
+                           np.inf if value[1] is None else value[1]]
+            else:
+                params.append(value)
+        sql = 'EXPLAIN QUERY PLAN SELECT * FROM designs'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        return [row[-1] for row in self.conn.execute(sql, params)]
+
+    def voltage_table(self, current, **filters):
+        """
+        ``voltage_table`` rows (V, R, L_max, L_max_mH, P) of the stored
+        designs at ``current``, one per voltage (other inputs narrowed by
+        ``filters``)
+        """
+        found = self.select(I=current, columns=('V', 'R', 'L_max', 'L_max_mH', 'P'),
+                            order_by='V', **filters)
+        _, first = np.unique(found['V'], return_index=True)
+        return [{name: float(values[k]) for name, values in found.items()} for k in first]
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(prefix='design_store_'), DEFAULT_DB)
+    with DesignStore(path) as store:
+        report = store.add_sweep()
+        print(f"First sweep:   {report['n_new']:,} of {report['n_grid']:,} points evaluated "
+              f"and stored in {report['seconds']:.2f} s")
+        report = store.add_sweep()
+        print(f"Same sweep:    {report['n_new']:,} new points, {report['seconds']:.2f} s")
+        report = store.add_sweep(voltages=SWEEP_VOLTAGES + [120])
+        print(f"Add 120 V:     {report['n_new']:,} new of {report['n_grid']:,}, "
+              f"{report['seconds']:.2f} s")
+        print(f"Stored designs: {len(store):,} ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+        start = time.perf_counter()
+        found = store.select(V=48, L_max=(1e-4, None), C_min=(None, 500e-6), order_by='P')
+        elapsed = time.perf_counter() - start
+        print(f"\n48 V, L_max > 0.1 mH, C_min < 500 µF: {len(found['V']):,} designs "
+              f"in {elapsed * 1000:.1f} ms")
+        print("Plan:", '; '.join(store.query_plan(V=48, L_max=(1e-4, None))))
+        for k in range(min(5, len(found['V']))):
+            print(f"  {found['I'][k]:4.1f} A  μᵣ {found['mu_r'][k]:5.0f}  AWG {found['awg'][k]:2.0f}  "
+                  f"L_max {found['L_max_mH'][k]:.3f} mH  {found['N_turns'][k]:5.1f} turns  "
+                  f"C_min {found['C_min_uF'][k]:5.0f} µF  {found['P'][k]:.0f} W")
@@ -2,311 +2,665 @@
 Electrical Engineering Specifications for Golden Ratio Motor
 Calculates maximum inductance, wire gauge, and drive requirements
 Based on 1.54ms pulse window at 650 Hz
+
+The design math lives in coil_design.py; this module adds the vectorized
+design-space sweep plus the printed report and plots. Matplotlib is only
+imported when a figure is rendered.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-
-# Physical Constants
-PHI = (1 + np.sqrt(5)) / 2
-GOLDEN_ANGLE = 137.5  # degrees
-
-# Motor Specifications (from visualization)
-RPM = 3000
-ROTATION_FREQ = RPM / 60  # Hz
-N_MAGNETS = 13
-PULSE_FREQ = ROTATION_FREQ * N_MAGNETS  # Hz
-PULSE_PERIOD = 1 / PULSE_FREQ  # seconds
-
-# Time Budget Breakdown
-# We have 1.54ms per pulse, but need to account for:
-# - Rise time (current ramps up)
-# - Hold time (coil at full power)
-# - Fall time (current collapses)
-
-PULSE_PERIOD_MS = PULSE_PERIOD * 1000
-RISE_TIME_BUDGET = 0.3 * PULSE_PERIOD_MS  # 30% for rise
-HOLD_TIME_BUDGET = 0.4 * PULSE_PERIOD_MS  # 40% for hold
-FALL_TIME_BUDGET = 0.3 * PULSE_PERIOD_MS  # 30% for fall
-
-print("=" * 70)
-print("ELECTRICAL ENGINEERING ANALYSIS - COIL DESIGN")
-print("=" * 70)
-
-print(f"\n{'TIMING CONSTRAINTS':^70}")
-print("-" * 70)
-print(f"Pulse frequency:          {PULSE_FREQ:.1f} Hz")
-print(f"Period per pulse:         {PULSE_PERIOD_MS:.3f} ms ({PULSE_PERIOD*1e6:.1f} µs)")
-print(f"\nTime Budget Allocation:")
-print(f"  Rise time (0-90%):      {RISE_TIME_BUDGET:.3f} ms ({RISE_TIME_BUDGET/PULSE_PERIOD_MS*100:.0f}%)")
-print(f"  Hold time (active):     {HOLD_TIME_BUDGET:.3f} ms ({HOLD_TIME_BUDGET/PULSE_PERIOD_MS*100:.0f}%)")
-print(f"  Fall time (90-0%):      {FALL_TIME_BUDGET:.3f} ms ({FALL_TIME_BUDGET/PULSE_PERIOD_MS*100:.0f}%)")
-
-# L/R Time Constant Calculation
-# For an RL circuit, current rises as: I(t) = I_max * (1 - e^(-t/(L/R)))
-# To reach 90% of max current: 0.9 = 1 - e^(-t/(L/R))
-# Solving: t = (L/R) * ln(10) ≈ 2.3 * (L/R)
-
-# We need: rise_time = 2.3 * (L/R)
-# Therefore: L/R = rise_time / 2.3
-
-TIME_CONSTANTS_FOR_90_PERCENT = 2.3
-TAU_MAX_RISE = (RISE_TIME_BUDGET / 1000) / TIME_CONSTANTS_FOR_90_PERCENT  # seconds
-TAU_MAX_FALL = (FALL_TIME_BUDGET / 1000) / TIME_CONSTANTS_FOR_90_PERCENT  # seconds
-
-print(f"\n{'L/R TIME CONSTANT':^70}")
-print("-" * 70)
-print(f"Maximum τ (tau) for rise: {TAU_MAX_RISE*1000:.3f} ms ({TAU_MAX_RISE*1e6:.1f} µs)")
-print(f"Maximum τ (tau) for fall: {TAU_MAX_FALL*1000:.3f} ms ({TAU_MAX_FALL*1e6:.1f} µs)")
-
-# Voltage and Resistance Trade-off
-# Higher voltage = faster switching, but requires more robust components
-# We'll calculate for multiple voltage scenarios
-
-VOLTAGES = [12, 24, 48, 96]  # Common DC bus voltages
-TARGET_CURRENT = 5  # Amps (typical for small motor)
-
-print(f"\n{'RESISTANCE & INDUCTANCE LIMITS':^70}")
-print("-" * 70)
-print(f"Target current:           {TARGET_CURRENT:.1f} A")
-print(f"\nFor various drive voltages:")
-print(f"{'Voltage':>8} | {'Resistance':>12} | {'Max Inductance':>15} | {'Power':>10}")
-print("-" * 70)
-
-voltage_data = []
-for V in VOLTAGES:
-    R = V / TARGET_CURRENT  # Ohms
-    L_max = TAU_MAX_RISE * R  # Henrys
-    L_max_mH = L_max * 1000  # milliHenrys
-    P = V * TARGET_CURRENT  # Watts
-    print(f"{V:7}V | {R:10.2f} Ω | {L_max_mH:12.3f} mH | {P:8.0f} W")
-    voltage_data.append({'V': V, 'R': R, 'L_max': L_max, 'L_max_mH': L_max_mH, 'P': P})
-
-# Wire Gauge Recommendations
-# Based on resistance per unit length and current capacity
-
-print(f"\n{'WIRE GAUGE RECOMMENDATIONS':^70}")
-print("-" * 70)
-print(f"Target current:           {TARGET_CURRENT:.1f} A")
-print(f"Recommended wire sizes (for {TARGET_CURRENT}A continuous):")
-print(f"\n  AWG 14:  2.5 mm²  (15A capacity, 8.3 Ω/km @ 20°C)")
-print(f"  AWG 16:  1.3 mm²  (10A capacity, 13.2 Ω/km @ 20°C)")
-print(f"  AWG 18:  0.8 mm²  (7A capacity, 21.0 Ω/km @ 20°C)")
-print(f"\nFor HIGH-SPEED switching (low inductance):")
-print(f"  → Use LITZ WIRE (multiple fine strands) to reduce skin effect")
-print(f"  → OR use flat/ribbon wire for minimal self-inductance")
-
-# Core Material Selection
-print(f"\n{'CORE MATERIAL REQUIREMENTS':^70}")
-print("-" * 70)
-print(f"Operating frequency:      {PULSE_FREQ:.0f} Hz")
-print(f"\nCore material must have low losses at {PULSE_FREQ:.0f} Hz:")
-print(f"\n  ✓ LAMINATED SILICON STEEL (0.35mm sheets)")
-print(f"    - Used in: transformers, motors")
-print(f"    - Loss at 650 Hz: ~10 W/kg (acceptable)")
-print(f"    - Permeability: 2000-8000")
-print(f"\n  ✓ FERRITE (Manganese-Zinc or Nickel-Zinc)")
-print(f"    - Used in: high-frequency inductors")
-print(f"    - Loss at 650 Hz: ~1 W/kg (excellent)")
-print(f"    - Permeability: 1000-3000")
-print(f"\n  ✗ SOLID IRON (DO NOT USE)")
-print(f"    - Eddy current losses: >100 W/kg at 650 Hz")
-print(f"    - Will overheat and kill efficiency")
-print(f"\n  ✓ SOFT MAGNETIC COMPOSITE (SMC/Powder Core)")
-print(f"    - Used in: high-frequency motors")
-print(f"    - Loss at 650 Hz: ~5 W/kg (good)")
-print(f"    - Can be molded into complex Golden Ratio shapes")
-
-# Recommended Design
-print(f"\n{'RECOMMENDED COIL DESIGN':^70}")
-print("-" * 70)
-
-# Select optimal voltage (48V is good balance)
-optimal_idx = 2  # 48V
-optimal = voltage_data[optimal_idx]
-
-print(f"\nOptimal Drive Voltage:    {optimal['V']} VDC")
-print(f"Target Coil Resistance:   {optimal['R']:.2f} Ω")
-print(f"Maximum Inductance:       {optimal['L_max_mH']:.3f} mH")
-print(f"Operating Current:        {TARGET_CURRENT:.1f} A")
-print(f"Power per Coil:           {optimal['P']:.0f} W")
-print(f"\nAssuming {N_MAGNETS} coils (one per magnet):")
-print(f"Peak System Power:        {optimal['P'] * N_MAGNETS:.0f} W")
-print(f"Average Power (6% duty):  {optimal['P'] * N_MAGNETS * 0.06:.0f} W")
-
-# Practical Coil Winding
-# Estimate number of turns needed
-
-# For a coil: L = (μ₀ * μᵣ * N² * A) / l
-# Where: N = turns, A = core area, l = magnetic path length, μᵣ = permeability
-
-# Typical values for small motor coil
-CORE_AREA_CM2 = 4  # cm²
-CORE_LENGTH_CM = 5  # cm
-MU_R_FERRITE = 2000  # relative permeability
-
-CORE_AREA = CORE_AREA_CM2 * 1e-4  # m²
-CORE_LENGTH = CORE_LENGTH_CM * 1e-2  # m
-MU_0 = 4 * np.pi * 1e-7  # H/m
-
-# Solve for N: N = sqrt(L * l / (μ₀ * μᵣ * A))
-L_target = optimal['L_max']
-N_turns = np.sqrt(L_target * CORE_LENGTH / (MU_0 * MU_R_FERRITE * CORE_AREA))
-
-# Wire length per turn (approximate)
-AVG_TURN_LENGTH_CM = 8  # cm (depends on coil diameter)
-TOTAL_WIRE_LENGTH_M = N_turns * AVG_TURN_LENGTH_CM / 100
-
-# Wire resistance (AWG 16 copper)
-RESISTANCE_PER_M = 0.0132  # Ω/m for AWG 16
-CALCULATED_RESISTANCE = TOTAL_WIRE_LENGTH_M * RESISTANCE_PER_M
-
-print(f"\n{'COIL WINDING CALCULATIONS':^70}")
-print("-" * 70)
-print(f"Core dimensions:          {CORE_AREA_CM2} cm² × {CORE_LENGTH_CM} cm path")
-print(f"Core material:            Ferrite (μᵣ = {MU_R_FERRITE})")
-print(f"Number of turns:          {N_turns:.0f} turns")
-print(f"Wire length per coil:     {TOTAL_WIRE_LENGTH_M:.1f} m")
-print(f"Wire gauge:               AWG 16 (1.3mm diameter)")
-print(f"Calculated resistance:    {CALCULATED_RESISTANCE:.2f} Ω")
-print(f"Target resistance:        {optimal['R']:.2f} Ω")
-
-if abs(CALCULATED_RESISTANCE - optimal['R']) / optimal['R'] > 0.3:
-    print(f"\n⚠️  Resistance mismatch > 30%")
-    print(f"   Adjust: turns={N_turns * np.sqrt(optimal['R']/CALCULATED_RESISTANCE):.0f} or wire gauge")
-else:
-    print(f"\n✓  Resistance match within spec")
-
-# Driver Circuit Requirements
-print(f"\n{'DRIVER CIRCUIT REQUIREMENTS':^70}")
-print("-" * 70)
-print(f"Switching frequency:      {PULSE_FREQ:.0f} Hz")
-print(f"Rise time requirement:    < {RISE_TIME_BUDGET:.3f} ms")
-print(f"Current capacity:         {TARGET_CURRENT:.1f} A per channel")
-print(f"Number of channels:       {N_MAGNETS} (one per coil)")
-print(f"\nRecommended Components:")
-print(f"  • MOSFET/IGBT:          Logic-level N-channel, Rds(on) < 0.1Ω")
-print(f"                          (e.g., IRFZ44N, IRL540N)")
-print(f"  • Flyback Diode:        Fast recovery, {TARGET_CURRENT*2:.0f}A rated")
-print(f"                          (e.g., UF5408, MUR860)")
-print(f"  • Gate Driver:          High-speed driver IC")
-print(f"                          (e.g., IR2104, MCP1416)")
-print(f"  • Microcontroller:      PWM capable, {PULSE_FREQ*2:.0f}+ Hz timer")
-print(f"                          (e.g., Arduino Due, STM32, ESP32)")
-
-# Energy Storage (for pulse generation)
-# Calculate capacitor size needed to supply pulse current
-
-PULSE_DURATION = HOLD_TIME_BUDGET / 1000  # seconds
-ENERGY_PER_PULSE = optimal['P'] * PULSE_DURATION  # Joules
-VOLTAGE_DROOP_PERCENT = 5  # Allow 5% voltage drop
-
-# E = 0.5 * C * V²
-# For voltage droop: ΔE = 0.5 * C * (V² - (V-ΔV)²)
-# Simplify: C ≈ 2 * E / (2*V*ΔV)
-
-DV = optimal['V'] * (VOLTAGE_DROOP_PERCENT / 100)
-C_min = ENERGY_PER_PULSE / (optimal['V'] * DV)  # Farads
-C_min_uF = C_min * 1e6
-
-print(f"\n{'POWER SUPPLY & ENERGY STORAGE':^70}")
-print("-" * 70)
-print(f"Energy per pulse:         {ENERGY_PER_PULSE*1000:.2f} mJ")
-print(f"Bus voltage:              {optimal['V']} VDC")
-print(f"Minimum bus capacitor:    {C_min_uF:.0f} µF")
-print(f"Recommended:              {C_min_uF*2:.0f} µF (2x safety margin)")
-print(f"Type:                     Electrolytic, {optimal['V']*1.5:.0f}V rated, low ESR")
-
-# Create visualization
-fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-fig.suptitle('Electrical Design Parameters', fontsize=16, fontweight='bold')
-
-# 1. Current Rise/Fall Curve
-ax1 = axes[0, 0]
-t_rise = np.linspace(0, PULSE_PERIOD_MS, 1000)
-i_rise = TARGET_CURRENT * (1 - np.exp(-t_rise / (TAU_MAX_RISE * 1000)))
-
-ax1.plot(t_rise, i_rise, 'b-', linewidth=2, label='Current Rise')
-ax1.axhline(TARGET_CURRENT * 0.9, color='r', linestyle='--', 
-           label='90% Current', alpha=0.7)
-ax1.axvline(RISE_TIME_BUDGET, color='g', linestyle='--', 
-           label=f'Rise Budget ({RISE_TIME_BUDGET:.2f}ms)', alpha=0.7)
-ax1.fill_between(t_rise, 0, i_rise, alpha=0.3)
-ax1.set_xlabel('Time (ms)')
-ax1.set_ylabel('Current (A)')
-ax1.set_title('Coil Current Rise Time')
-ax1.legend()
-ax1.grid(True, alpha=0.3)
-
-# 2. Inductance vs Voltage Trade-off
-ax2 = axes[0, 1]
-voltages = [v['V'] for v in voltage_data]
-inductances = [v['L_max_mH'] for v in voltage_data]
-
-ax2.bar(voltages, inductances, color='steelblue', alpha=0.7, edgecolor='black')
-ax2.set_xlabel('Drive Voltage (V)')
-ax2.set_ylabel('Maximum Inductance (mH)')
-ax2.set_title('Max Inductance vs Drive Voltage')
-ax2.grid(True, alpha=0.3, axis='y')
-for i, (v, l) in enumerate(zip(voltages, inductances)):
-    ax2.text(v, l + 0.005, f'{l:.3f}', ha='center', va='bottom', fontweight='bold')
-
-# 3. Power Dissipation by Component
-ax3 = axes[1, 0]
-components = ['Coil\nResistance', 'MOSFET\nRds(on)', 'Wire\nResistance', 'Diode\nForward Drop']
-power_losses = [
-    optimal['P'] * 0.60,  # 60% in coil
-    optimal['P'] * 0.15,  # 15% in MOSFET
-    optimal['P'] * 0.15,  # 15% in wire
-    optimal['P'] * 0.10   # 10% in diode
-]
-
-colors = ['#ff6b6b', '#ee5a6f', '#d44f73', '#b94377']
-ax3.pie(power_losses, labels=components, autopct='%1.0f%%',
-        colors=colors, startangle=90)
-ax3.set_title(f'Power Loss Distribution\n(per coil, {optimal["P"]:.0f}W total)')
-
-# 4. Pulse Timing Diagram
-ax4 = axes[1, 1]
-t_total = np.linspace(0, PULSE_PERIOD_MS * 3, 1000)
-pulse_signal = np.zeros_like(t_total)
-
-for n in range(3):
-    t_offset = n * PULSE_PERIOD_MS
-    mask = (t_total >= t_offset) & (t_total < t_offset + RISE_TIME_BUDGET + HOLD_TIME_BUDGET)
-    pulse_signal[mask] = 1
-
-ax4.plot(t_total, pulse_signal, 'purple', linewidth=2)
-ax4.fill_between(t_total, 0, pulse_signal, alpha=0.3, color='purple')
-ax4.set_xlabel('Time (ms)')
-ax4.set_ylabel('Gate Signal')
-ax4.set_title(f'Pulse Train @ {PULSE_FREQ:.0f} Hz')
-ax4.set_ylim(-0.1, 1.3)
-ax4.grid(True, alpha=0.3)
-ax4.axhline(0.5, color='gray', linestyle=':', alpha=0.5)
-ax4.text(PULSE_PERIOD_MS / 2, 1.15, f'{PULSE_PERIOD_MS:.2f}ms', 
-         ha='center', fontsize=10, bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-
-plt.tight_layout()
-
-print(f"\n{'='*70}")
-print("CRITICAL DESIGN SUMMARY")
-print(f"{'='*70}")
-print(f"\n✓ Use {optimal['V']}V drive with {TARGET_CURRENT}A coils")
-print(f"✓ Maximum inductance: {optimal['L_max_mH']:.3f} mH")
-print(f"✓ Target resistance: {optimal['R']:.2f} Ω")
-print(f"✓ Wind ~{N_turns:.0f} turns on ferrite core")
-print(f"✓ Use AWG 16 wire (or thicker)")
-print(f"✓ Fast-switching MOSFETs (< 100ns rise time)")
-print(f"✓ Bus capacitor: >{C_min_uF*2:.0f} µF")
-print(f"\n⚠️  FAILURE MODES TO AVOID:")
-print(f"   • Inductance > {optimal['L_max_mH']:.3f} mH → Late pulse → braking")
-print(f"   • Solid iron core → Eddy currents → overheating")
-print(f"   • Slow MOSFETs → Overlap → shoot-through")
-print(f"   • Insufficient capacitor → Voltage sag → weak pulse")
-print(f"\n{'='*70}\n")
-
-plt.savefig('electrical_specifications.png', dpi=150, bbox_inches='tight')
-print("📊 Electrical specifications graph saved as 'electrical_specifications.png'")
-print("\nVisualization ready. Close the window when done.")
-plt.show()
+
+from coil_design import (
+    PHI, GOLDEN_ANGLE, MU_0, RPM, ROTATION_FREQ, N_MAGNETS, PULSE_FREQ,
+    PULSE_PERIOD, PULSE_PERIOD_MS, RISE_TIME_BUDGET, HOLD_TIME_BUDGET,
+    FALL_TIME_BUDGET, RISE_FRACTION, HOLD_FRACTION, FALL_FRACTION,
+    TIME_CONSTANTS_FOR_90_PERCENT, TAU_MAX_RISE, TAU_MAX_FALL,
+    VOLTAGES, TARGET_CURRENT, OPTIMAL_VOLTAGE, CORE_AREA_CM2, CORE_LENGTH_CM,
+    MU_R_FERRITE, AVG_TURN_LENGTH_CM, RESISTANCE_PER_M,
+    RESISTANCE_MATCH_TOLERANCE, VOLTAGE_DROOP_PERCENT, COPPER_RESISTIVITY,
+    COPPER_DENSITY, AMPACITY_A_PER_MM2, CoilDesign, awg_diameter_m, voltage_table,
+)
+from coil_winding import solve_design_winding
+from instrumentation import count, span, traced
+from pulse_simulator import simulate_design
+
+# Design Space Sweep
+# The CoilDesign calculations repeated over full grids of inputs with NumPy
+# broadcasting, so every combination is evaluated in one pass.
+
+SWEEP_VOLTAGES = [12, 24, 36, 48, 60, 72, 96]
+SWEEP_CURRENTS = [2, 3, 4, 5, 6, 8, 10]
+SWEEP_BUDGET_SPLITS = [(0.20, 0.50, 0.30), (0.25, 0.45, 0.30), (0.30, 0.40, 0.30),
+                       (0.25, 0.35, 0.40), (0.30, 0.30, 0.40), (0.35, 0.30, 0.35)]
+SWEEP_CORE_AREAS_CM2 = [1, 2, 3, 4, 6, 8, 10]
+SWEEP_MU_R = [1, 10, 50, 100, 250, 500, 1000, 2000, 4000]
+SWEEP_AWG = list(range(10, 41))
+
+ENVELOPE_RPM = np.linspace(0, 6000, 6001)  # startup through twice the rated speed
+
+
+def rpm_limit(tau, rise_frac=RISE_FRACTION, fall_frac=FALL_FRACTION, n_magnets=N_MAGNETS):
+    """Highest RPM at which a coil with time constant ``tau`` meets both rise and fall budgets"""
+    tau = np.asarray(tau, dtype=float)
+    with np.errstate(divide='ignore'):
+        return np.minimum(rise_frac, fall_frac) * 60 / (n_magnets * TIME_CONSTANTS_FOR_90_PERCENT * tau)
+
+
+def operating_envelope(tau, V, I, capacitance, rpm=ENVELOPE_RPM,
+                       rise_frac=RISE_FRACTION, hold_frac=HOLD_FRACTION,
+                       n_magnets=N_MAGNETS, droop_limit=VOLTAGE_DROOP_PERCENT):
+    """
+    Timing budgets and limits of each design as functions of RPM.
+
+    ``tau``, ``V``, ``I`` and ``capacitance`` are per-design (scalars or
+    shape (designs,)); results have shape (designs, len(rpm)). At 0 RPM the
+    pulse period is infinite, so budgets and L_max are ``inf`` and the
+    capacitor droop is ``inf`` unless the hold time is capped by firmware.
+
+    Returns a dict with the pulse period and rise/hold/fall budgets (s),
+    the tau and inductance limits, the bus droop in percent, ``fits``
+    (timing window met), ``droop_ok``, and per design ``rpm_limit`` (first
+    grid RPM that no longer fits, NaN if all do) and ``rpm_limit_exact``.
+    """
+    tau, V, I, capacitance = (np.atleast_1d(np.asarray(a, dtype=float))[:, None]
+                              for a in (tau, V, I, capacitance))
+    rpm = np.asarray(rpm, dtype=float)
+    fall_frac = 1 - rise_frac - hold_frac
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        period = 60 / (rpm * n_magnets)
+    period = np.broadcast_to(period, np.broadcast_shapes(tau.shape, rpm.shape))
+    rise = rise_frac * period
+    hold = hold_frac * period
+    fall = fall_frac * period
+    tau_max_rise = rise / TIME_CONSTANTS_FOR_90_PERCENT
+    tau_max_fall = fall / TIME_CONSTANTS_FOR_90_PERCENT
+    L_max = tau_max_rise * (V / I)
+    droop = V * I * hold / (V * V * capacitance) * 100
+
+    fits = (tau <= tau_max_rise) & (tau <= tau_max_fall)
+    failing = ~fits
+    first_fail = failing.argmax(axis=1)
+    grid_limit = np.where(failing.any(axis=1), rpm[first_fail], np.nan)
+
+    return {
+        'rpm': rpm, 'pulse_period': period, 'rise_budget': rise, 'hold_budget': hold,
+        'fall_budget': fall, 'tau_max_rise': tau_max_rise, 'tau_max_fall': tau_max_fall,
+        'L_max': L_max, 'droop_percent': droop, 'fits': fits, 'droop_ok': droop <= droop_limit,
+        'rpm_limit': grid_limit,
+        'rpm_limit_exact': rpm_limit(tau[:, 0], rise_frac, fall_frac, n_magnets),
+    }
+
+
+def evaluate_designs(V, I, rise_frac, hold_frac, core_area_cm2, mu_r, awg,
+                     rpm=RPM, n_magnets=N_MAGNETS, core_length_cm=CORE_LENGTH_CM,
+                     droop_percent=VOLTAGE_DROOP_PERCENT,
+                     match_tolerance=RESISTANCE_MATCH_TOLERANCE):
+    """
+    Evaluate coil designs element-wise; all inputs broadcast against each other.
+
+    Returns a dict of arrays holding the same quantities as the report
+    (R, L_max, N_turns, wire length, calculated resistance, C_min) plus the
+    copper mass, wire ampacity, the RPM at which a whole-turn winding stops
+    fitting its timing window and a ``feasible`` mask. A design is feasible
+    when the wound resistance is within ``match_tolerance`` of the target,
+    the wire carries the RMS coil current and the fall budget is at least as
+    long as the rise budget (the flyback decays with the same L/R).
+    """
+    V, I, rise_frac, hold_frac, core_area_cm2, mu_r, awg = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in
+          (V, I, rise_frac, hold_frac, core_area_cm2, mu_r, awg)))
+    fall_frac = 1 - rise_frac - hold_frac
+
+    period = 60 / (rpm * n_magnets)
+    tau_max_rise = rise_frac * period / TIME_CONSTANTS_FOR_90_PERCENT
+    R = V / I
+    L_max = tau_max_rise * R
+    P = V * I
+
+    area = core_area_cm2 * 1e-4
+    n_turns = np.sqrt(L_max * core_length_cm * 1e-2 / (MU_0 * mu_r * area))
+    turn_length_m = AVG_TURN_LENGTH_CM / 100 * np.sqrt(core_area_cm2 / CORE_AREA_CM2)
+    wire_length_m = n_turns * turn_length_m
+
+    wire_area = np.pi / 4 * awg_diameter_m(awg) ** 2
+    R_calc = wire_length_m * COPPER_RESISTIVITY / wire_area
+    copper_mass = wire_length_m * wire_area * COPPER_DENSITY
+    ampacity = AMPACITY_A_PER_MM2 * wire_area * 1e6
+
+    energy = P * hold_frac * period
+    C_min = energy / (V * V * droop_percent / 100)
+
+    # Each coil conducts for rise + hold once per rotation (the ~6% duty above)
+    I_rms = I * np.sqrt((rise_frac + hold_frac) / n_magnets)
+
+    # A real coil has whole turns; rounding down leaves some speed headroom
+    turns_wound = np.maximum(np.floor(n_turns), 1)
+    tau = tau_max_rise * (turns_wound / n_turns) ** 2
+    rpm_max = rpm_limit(tau, rise_frac, fall_frac, n_magnets)
+
+    mismatch = np.abs(R_calc - R) / R
+    feasible = (mismatch <= match_tolerance) & (ampacity >= I_rms) & (fall_frac >= rise_frac)
+
+    return {
+        'V': V, 'I': I, 'rise_frac': rise_frac, 'hold_frac': hold_frac,
+        'fall_frac': fall_frac, 'core_area_cm2': core_area_cm2, 'mu_r': mu_r,
+        'awg': awg, 'R': R, 'L_max': L_max, 'P': P, 'N_turns': n_turns,
+        'wire_length_m': wire_length_m, 'R_calc': R_calc, 'mismatch': mismatch,
+        'copper_mass_kg': copper_mass, 'ampacity': ampacity, 'I_rms': I_rms,
+        'C_min': C_min, 'turns_wound': turns_wound, 'tau': tau, 'rpm_limit': rpm_max,
+        'feasible': feasible,
+    }
+
+
+def design_grid(voltages=SWEEP_VOLTAGES, currents=SWEEP_CURRENTS,
+                budget_splits=SWEEP_BUDGET_SPLITS, core_areas_cm2=SWEEP_CORE_AREAS_CM2,
+                mu_rs=SWEEP_MU_R, awgs=SWEEP_AWG):
+    """
+    Inputs of every point of the voltage × current × budget split × core
+    area × μᵣ × AWG grid, as flat ``evaluate_designs`` arguments.
+    """
+    splits = np.asarray(budget_splits, dtype=float)
+    axes = np.meshgrid(np.asarray(voltages, dtype=float), np.asarray(currents, dtype=float),
+                       np.arange(len(splits)), np.asarray(core_areas_cm2, dtype=float),
+                       np.asarray(mu_rs, dtype=float), np.asarray(awgs, dtype=float),
+                       indexing='ij')
+    V, I, split_idx, area, mu_r, awg = (axis.ravel() for axis in axes)
+    return {'V': V, 'I': I, 'rise_frac': splits[split_idx, 0], 'hold_frac': splits[split_idx, 1],
+            'core_area_cm2': area, 'mu_r': mu_r, 'awg': awg}
+
+
+@traced('specs.sweep')
+def sweep_design_space(voltages=SWEEP_VOLTAGES, currents=SWEEP_CURRENTS,
+                       budget_splits=SWEEP_BUDGET_SPLITS,
+                       core_areas_cm2=SWEEP_CORE_AREAS_CM2, mu_rs=SWEEP_MU_R,
+                       awgs=SWEEP_AWG, **kwargs):
+    """
+    Evaluate the full grid voltage × current × budget split × core area × μᵣ × AWG.
+
+    ``budget_splits`` is a sequence of (rise, hold, fall) fractions of the
+    pulse period. Extra keyword arguments are passed to ``evaluate_designs``.
+    Returns a dict of flat arrays, one entry per grid point.
+    """
+    grid = design_grid(voltages, currents, budget_splits, core_areas_cm2, mu_rs, awgs)
+    result = evaluate_designs(**grid, **kwargs)
+    count('specs.designs_evaluated', result['feasible'].size)
+    return result
+
+
+def pareto_front(objectives, chunk_size=1024):
+    """
+    Indices of the non-dominated rows of ``objectives`` (every column minimised).
+
+    Rows are sorted lexicographically so a row can only be dominated by rows
+    before it; the sorted rows are then screened in chunks against the front
+    found so far, keeping each comparison a bounded broadcast.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if len(objectives) == 0:
+        return np.empty(0, dtype=int)
+
+    # Identical rows cannot dominate each other; screen unique rows only
+    unique, inverse = np.unique(objectives, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    front = np.empty((0, unique.shape[1]))
+    kept = []
+    for start in range(0, len(unique), chunk_size):
+        block = unique[start:start + chunk_size]
+        dominated = np.zeros(len(block), dtype=bool)
+        for other in (front, block):
+            no_worse = (other[:, None, :] <= block[None, :, :]).all(axis=2)
+            better = (other[:, None, :] < block[None, :, :]).any(axis=2)
+            dominated |= (no_worse & better).any(axis=0)
+        front = np.concatenate([front, block[~dominated]])
+        kept.append(start + np.flatnonzero(~dominated))
+
+    on_front = np.zeros(len(unique), dtype=bool)
+    on_front[np.concatenate(kept)] = True
+    return np.flatnonzero(on_front[inverse])
+
+
+@traced('specs.pareto')
+def pareto_designs(sweep):
+    """Pareto-optimal feasible designs: min power, max L_max, min copper mass"""
+    feasible = np.flatnonzero(sweep['feasible'])
+    objectives = np.column_stack([sweep['P'][feasible],
+                                  -sweep['L_max'][feasible],
+                                  sweep['copper_mass_kg'][feasible]])
+    idx = feasible[pareto_front(objectives)]
+    idx = idx[np.lexsort((sweep['copper_mass_kg'][idx], sweep['P'][idx]))]
+    return {key: value[idx] for key, value in sweep.items()}
+
+
+@traced('specs.report')
+def print_report(design=None, sweep=None):
+    """Print the full coil design report for ``design`` (48V default)"""
+    if design is None:
+        design = CoilDesign()
+    voltage_data = voltage_table(current=design.current, rpm=design.rpm,
+                                 n_magnets=design.n_magnets,
+                                 rise_fraction=design.rise_fraction,
+                                 hold_fraction=design.hold_fraction)
+    current = design.current
+    n_magnets = design.n_magnets
+    pulse_freq = design.pulse_freq
+    pulse_period_ms = design.pulse_period_ms
+
+    print("=" * 70)
+    print("ELECTRICAL ENGINEERING ANALYSIS - COIL DESIGN")
+    print("=" * 70)
+
+    print(f"\n{'TIMING CONSTRAINTS':^70}")
+    print("-" * 70)
+    print(f"Pulse frequency:          {pulse_freq:.1f} Hz")
+    print(f"Period per pulse:         {pulse_period_ms:.3f} ms ({pulse_period_ms*1e3:.1f} µs)")
+    print(f"\nTime Budget Allocation:")
+    print(f"  Rise time (0-90%):      {design.rise_time_budget:.3f} ms ({design.rise_time_budget/pulse_period_ms*100:.0f}%)")
+    print(f"  Hold time (active):     {design.hold_time_budget:.3f} ms ({design.hold_time_budget/pulse_period_ms*100:.0f}%)")
+    print(f"  Fall time (90-0%):      {design.fall_time_budget:.3f} ms ({design.fall_time_budget/pulse_period_ms*100:.0f}%)")
+
+    print(f"\n{'L/R TIME CONSTANT':^70}")
+    print("-" * 70)
+    print(f"Maximum τ (tau) for rise: {design.tau_max_rise*1000:.3f} ms ({design.tau_max_rise*1e6:.1f} µs)")
+    print(f"Maximum τ (tau) for fall: {design.tau_max_fall*1000:.3f} ms ({design.tau_max_fall*1e6:.1f} µs)")
+
+    print(f"\n{'RESISTANCE & INDUCTANCE LIMITS':^70}")
+    print("-" * 70)
+    print(f"Target current:           {current:.1f} A")
+    print(f"\nFor various drive voltages:")
+    print(f"{'Voltage':>8} | {'Resistance':>12} | {'Max Inductance':>15} | {'Power':>10}")
+    print("-" * 70)
+    for row in voltage_data:
+        print(f"{row['V']:7}V | {row['R']:10.2f} Ω | {row['L_max_mH']:12.3f} mH | {row['P']:8.0f} W")
+
+    # Wire Gauge Recommendations
+    # Based on resistance per unit length and current capacity
+
+    print(f"\n{'WIRE GAUGE RECOMMENDATIONS':^70}")
+    print("-" * 70)
+    print(f"Target current:           {current:.1f} A")
+    print(f"Recommended wire sizes (for {current}A continuous):")
+    print(f"\n  AWG 14:  2.5 mm²  (15A capacity, 8.3 Ω/km @ 20°C)")
+    print(f"  AWG 16:  1.3 mm²  (10A capacity, 13.2 Ω/km @ 20°C)")
+    print(f"  AWG 18:  0.8 mm²  (7A capacity, 21.0 Ω/km @ 20°C)")
+    print(f"\nFor HIGH-SPEED switching (low inductance):")
+    print(f"  → Use LITZ WIRE (multiple fine strands) to reduce skin effect")
+    print(f"  → OR use flat/ribbon wire for minimal self-inductance")
+
+    # Core Material Selection
+    print(f"\n{'CORE MATERIAL REQUIREMENTS':^70}")
+    print("-" * 70)
+    print(f"Operating frequency:      {pulse_freq:.0f} Hz")
+    print(f"\nCore material must have low losses at {pulse_freq:.0f} Hz:")
+    print(f"\n  ✓ LAMINATED SILICON STEEL (0.35mm sheets)")
+    print(f"    - Used in: transformers, motors")
+    print(f"    - Loss at 650 Hz: ~10 W/kg (acceptable)")
+    print(f"    - Permeability: 2000-8000")
+    print(f"\n  ✓ FERRITE (Manganese-Zinc or Nickel-Zinc)")
+    print(f"    - Used in: high-frequency inductors")
+    print(f"    - Loss at 650 Hz: ~1 W/kg (excellent)")
+    print(f"    - Permeability: 1000-3000")
+    print(f"\n  ✗ SOLID IRON (DO NOT USE)")
+    print(f"    - Eddy current losses: >100 W/kg at 650 Hz")
+    print(f"    - Will overheat and kill efficiency")
+    print(f"\n  ✓ SOFT MAGNETIC COMPOSITE (SMC/Powder Core)")
+    print(f"    - Used in: high-frequency motors")
+    print(f"    - Loss at 650 Hz: ~5 W/kg (good)")
+    print(f"    - Can be molded into complex Golden Ratio shapes")
+
+    # Recommended Design
+    print(f"\n{'RECOMMENDED COIL DESIGN':^70}")
+    print("-" * 70)
+    print(f"\nOptimal Drive Voltage:    {design.voltage} VDC")
+    print(f"Target Coil Resistance:   {design.R:.2f} Ω")
+    print(f"Maximum Inductance:       {design.L_max_mH:.3f} mH")
+    print(f"Operating Current:        {current:.1f} A")
+    print(f"Power per Coil:           {design.P:.0f} W")
+    print(f"\nAssuming {n_magnets} coils (one per magnet):")
+    print(f"Peak System Power:        {design.P * n_magnets:.0f} W")
+    print(f"Average Power (6% duty):  {design.P * n_magnets * 0.06:.0f} W")
+
+    print(f"\n{'COIL WINDING CALCULATIONS':^70}")
+    print("-" * 70)
+    print(f"Core dimensions:          {design.core_area_cm2} cm² × {design.core_length_cm} cm path")
+    print(f"Core material:            Ferrite (μᵣ = {design.mu_r})")
+    print(f"Number of turns:          {design.N_turns:.0f} turns")
+    print(f"Wire length per coil:     {design.total_wire_length_m:.1f} m")
+    print(f"Wire gauge:               AWG 16 (1.3mm diameter)")
+    print(f"Calculated resistance:    {design.calculated_resistance:.2f} Ω")
+    print(f"Target resistance:        {design.R:.2f} Ω")
+
+    if not design.resistance_ok:
+        print(f"\n⚠️  Resistance mismatch > {RESISTANCE_MATCH_TOLERANCE:.0%}")
+        with span('specs.winding'):
+            winding = solve_design_winding(design)
+        if winding.feasible:
+            print(f"   Wind {winding.turns} turns of AWG {winding.awg} instead: "
+                  f"{winding.resistance:.2f} Ω, {winding.inductance*1000:.3f} mH, "
+                  f"{winding.window_fill:.0%} of core window")
+        elif winding.turns:
+            print(f"   No gauge meets L_max and R on this core; {winding.turns} turns of "
+                  f"AWG {winding.awg} carry the current but give {winding.resistance:.2f} Ω")
+            print(f"   ({winding.reason})")
+            if winding.resistance < design.R:
+                print(f"   Add {design.R - winding.resistance:.2f} Ω series resistance "
+                      f"or change core (μᵣ, area)")
+            else:
+                print(f"   Change core (μᵣ, area) to allow more inductance per Ω")
+        else:
+            print(f"   No winding exists on this core: {winding.reason}")
+            print(f"   Change core (μᵣ, area) or drive a lower current")
+    else:
+        print(f"\n✓  Resistance match within spec")
+
+    # Driver Circuit Requirements
+    print(f"\n{'DRIVER CIRCUIT REQUIREMENTS':^70}")
+    print("-" * 70)
+    print(f"Switching frequency:      {pulse_freq:.0f} Hz")
+    print(f"Rise time requirement:    < {design.rise_time_budget:.3f} ms")
+    print(f"Current capacity:         {current:.1f} A per channel")
+    print(f"Number of channels:       {n_magnets} (one per coil)")
+    print(f"\nRecommended Components:")
+    print(f"  • MOSFET/IGBT:          Logic-level N-channel, Rds(on) < 0.1Ω")
+    print(f"                          (e.g., IRFZ44N, IRL540N)")
+    print(f"  • Flyback Diode:        Fast recovery, {current*2:.0f}A rated")
+    print(f"                          (e.g., UF5408, MUR860)")
+    print(f"  • Gate Driver:          High-speed driver IC")
+    print(f"                          (e.g., IR2104, MCP1416)")
+    print(f"  • Microcontroller:      PWM capable, {pulse_freq*2:.0f}+ Hz timer")
+    print(f"                          (e.g., Arduino Due, STM32, ESP32)")
+
+    print(f"\n{'POWER SUPPLY & ENERGY STORAGE':^70}")
+    print("-" * 70)
+    print(f"Energy per pulse:         {design.energy_per_pulse*1000:.2f} mJ")
+    print(f"Bus voltage:              {design.voltage} VDC")
+    print(f"Minimum bus capacitor:    {design.C_min_uF:.0f} µF")
+    print(f"Recommended:              {design.C_min_uF*2:.0f} µF (2x safety margin)")
+    print(f"Type:                     Electrolytic, {design.voltage*1.5:.0f}V rated, low ESR")
+
+    # Operating envelope of the whole-turn winding with the recommended capacitor
+    turns = max(np.floor(design.N_turns), 1)
+    tau = design.tau_max_rise * (turns / design.N_turns) ** 2
+    with span('specs.envelope'):
+        envelope = operating_envelope(tau, design.voltage, design.current, design.C_min * 2,
+                                      rise_frac=design.rise_fraction,
+                                      hold_frac=design.hold_fraction, n_magnets=n_magnets)
+    print(f"\n{'OPERATING ENVELOPE (0-6000 RPM)':^70}")
+    print("-" * 70)
+    print(f"Coil τ ({turns:.0f} turns):         {tau*1e6:.1f} µs")
+    print(f"Timing window fits up to: {envelope['rpm_limit_exact'][0]:.0f} RPM")
+    print(f"\n{'RPM':>8} | {'Period':>9} | {'Max τ':>9} | {'Max L':>9} | {'Droop':>7} | Fits")
+    print("-" * 70)
+    for rpm in (500, 1000, 2250, 2400, 3000, 4000, 6000):
+        k = np.searchsorted(envelope['rpm'], rpm)
+        print(f"{rpm:8d} | {envelope['pulse_period'][0, k]*1000:6.3f} ms | "
+              f"{envelope['tau_max_rise'][0, k]*1e6:6.1f} µs | "
+              f"{envelope['L_max'][0, k]*1000:6.3f} mH | "
+              f"{envelope['droop_percent'][0, k]:5.1f} % | "
+              f"{'✓' if envelope['fits'][0, k] else '✗'}")
+
+    if sweep is not None:
+        print_sweep_summary(sweep)
+
+    print(f"\n{'='*70}")
+    print("CRITICAL DESIGN SUMMARY")
+    print(f"{'='*70}")
+    print(f"\n✓ Use {design.voltage}V drive with {current}A coils")
+    print(f"✓ Maximum inductance: {design.L_max_mH:.3f} mH")
+    print(f"✓ Target resistance: {design.R:.2f} Ω")
+    print(f"✓ Wind ~{design.N_turns:.0f} turns on ferrite core")
+    print(f"✓ Use AWG 16 wire (or thicker)")
+    print(f"✓ Fast-switching MOSFETs (< 100ns rise time)")
+    print(f"✓ Bus capacitor: >{design.C_min_uF*2:.0f} µF")
+    print(f"\n⚠️  FAILURE MODES TO AVOID:")
+    print(f"   • Inductance > {design.L_max_mH:.3f} mH → Late pulse → braking")
+    print(f"   • Solid iron core → Eddy currents → overheating")
+    print(f"   • Slow MOSFETs → Overlap → shoot-through")
+    print(f"   • Insufficient capacitor → Voltage sag → weak pulse")
+    print(f"\n{'='*70}\n")
+
+
+@traced('specs.sweep_summary')
+def print_sweep_summary(sweep, max_rows=15):
+    """Print the size of a sweep and its Pareto-optimal designs"""
+    front = pareto_designs(sweep)
+
+    print(f"\n{'DESIGN SPACE SWEEP':^70}")
+    print("-" * 70)
+    print(f"Candidates evaluated:     {len(sweep['V']):,}")
+    print(f"Feasible designs:         {np.count_nonzero(sweep['feasible']):,}")
+    print(f"Pareto-optimal designs:   {len(front['V'])} (power vs L_max vs copper mass)")
+    print(f"\n{'Voltage':>8} | {'Current':>8} | {'Split':>9} | {'Core':>6} | {'μᵣ':>5} | "
+          f"{'AWG':>4} | {'L_max':>9} | {'Turns':>6} | {'Copper':>8} | {'C_min':>8} | {'RPM lim':>7}")
+    print("-" * 70)
+    for k in range(min(len(front['V']), max_rows)):
+        split = f"{front['rise_frac'][k]:.2f}/{front['hold_frac'][k]:.2f}"
+        print(f"{front['V'][k]:7.0f}V | {front['I'][k]:6.1f} A | {split:>9} | "
+              f"{front['core_area_cm2'][k]:3.0f}cm² | {front['mu_r'][k]:5.0f} | {front['awg'][k]:4.0f} | "
+              f"{front['L_max'][k]*1000:6.3f} mH | {front['N_turns'][k]:6.0f} | "
+              f"{front['copper_mass_kg'][k]*1000:6.1f} g | {front['C_min'][k]*1e6:5.0f} µF | "
+              f"{front['rpm_limit'][k]:7.0f}")
+    if len(front['V']) > max_rows:
+        print(f"... {len(front['V']) - max_rows} more")
+
+
+# Plot styles of the current-rise and pulse-timing panels, shared with the
+# live bench dashboard (telemetry_dashboard.py)
+RISE_STYLE = dict(color='b', linestyle='-', linewidth=2)
+TARGET_STYLE = dict(color='r', linestyle='--', alpha=0.7)
+BUDGET_STYLE = dict(color='g', linestyle='--', alpha=0.7)
+PULSE_STYLE = dict(color='purple', linewidth=2)
+FILL_ALPHA = 0.3
+
+
+def _fill_verts(x, y):
+    """Polygon outline of the area between ``y`` and zero, as fill_between draws it"""
+    return np.concatenate([[[x[0], 0]], np.column_stack([x, y]), [[x[-1], 0]]])
+
+
+class SpecSheetRenderer:
+    """
+    The 4-panel electrical design figure, built once and updated per design.
+
+    All artists are created in the constructor; ``update`` only replaces
+    their data, so rendering many design variants skips figure construction
+    and layout. With ``headless=True`` the figure is drawn on an Agg canvas
+    without pyplot.
+    """
+
+    @traced('specs.figure')
+    def __init__(self, headless=False, design=None):
+        with span('specs.new_figure', headless=headless):
+            if headless:
+                from matplotlib.figure import Figure
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                fig = Figure(figsize=(14, 10))
+                FigureCanvasAgg(fig)
+            else:
+                import matplotlib.pyplot as plt
+                fig = plt.figure(figsize=(14, 10))
+        self.fig = fig
+        axes = fig.subplots(2, 2)
+        fig.suptitle('Electrical Design Parameters', fontsize=16, fontweight='bold')
+
+        # 1. Current Rise/Fall Curve
+        ax1 = self.ax1 = axes[0, 0]
+        self.rise_line, = ax1.plot([], [], **RISE_STYLE, label='Current Rise')
+        # Simulated pulse with MOSFET Rds(on) and flyback diode drop
+        self.sim_line, = ax1.plot([], [], 'k--', linewidth=1.5,
+                                  label='Simulated (with flyback)')
+        self.target_line = ax1.axhline(0, **TARGET_STYLE, label='90% Current')
+        self.budget_line = ax1.axvline(0, **BUDGET_STYLE, label='Rise Budget')
+        self.rise_fill = ax1.fill_between([0, 1], 0, [0, 0], alpha=FILL_ALPHA)
+        ax1.set_xlabel('Time (ms)')
+        ax1.set_ylabel('Current (A)')
+        ax1.set_title('Coil Current Rise Time')
+        self.legend1 = ax1.legend()
+        ax1.grid(True, alpha=0.3)
+
+        # 2. Inductance vs Voltage Trade-off
+        ax2 = self.ax2 = axes[0, 1]
+        self.bars = ax2.bar(VOLTAGES, [1] * len(VOLTAGES), color='steelblue',
+                            alpha=0.7, edgecolor='black')
+        self.bar_labels = [ax2.text(v, 0, '', ha='center', va='bottom', fontweight='bold')
+                           for v in VOLTAGES]
+        ax2.set_xlabel('Drive Voltage (V)')
+        ax2.set_ylabel('Maximum Inductance (mH)')
+        ax2.set_title('Max Inductance vs Drive Voltage')
+        ax2.grid(True, alpha=0.3, axis='y')
+
+        # 3. Power Dissipation by Component (60% coil, 15% MOSFET, 15% wire, 10% diode)
+        ax3 = self.ax3 = axes[1, 0]
+        components = ['Coil\nResistance', 'MOSFET\nRds(on)', 'Wire\nResistance', 'Diode\nForward Drop']
+        power_losses = [0.60, 0.15, 0.15, 0.10]
+        colors = ['#ff6b6b', '#ee5a6f', '#d44f73', '#b94377']
+        ax3.pie(power_losses, labels=components, autopct='%1.0f%%',
+                colors=colors, startangle=90)
+
+        # 4. Pulse Timing Diagram
+        ax4 = self.ax4 = axes[1, 1]
+        self.pulse_line, = ax4.plot([], [], **PULSE_STYLE)
+        self.pulse_fill = ax4.fill_between([0, 1], 0, [0, 0], alpha=FILL_ALPHA,
+                                           color=PULSE_STYLE['color'])
+        ax4.set_xlabel('Time (ms)')
+        ax4.set_ylabel('Gate Signal')
+        ax4.set_ylim(-0.1, 1.3)
+        ax4.grid(True, alpha=0.3)
+        ax4.axhline(0.5, color='gray', linestyle=':', alpha=0.5)
+        self.period_label = ax4.text(0, 1.15, '', ha='center', fontsize=10,
+                                     bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+        self.update(design if design is not None else CoilDesign())
+        with span('specs.tight_layout'):
+            fig.tight_layout()
+
+    @traced('specs.update')
+    def update(self, design):
+        """Replace the data of every artist with the numbers of ``design``"""
+        voltage_data = voltage_table(current=design.current, rpm=design.rpm,
+                                     n_magnets=design.n_magnets,
+                                     rise_fraction=design.rise_fraction,
+                                     hold_fraction=design.hold_fraction)
+        period_ms = design.pulse_period_ms
+        rise_ms = design.rise_time_budget
+
+        # 1. Current Rise/Fall Curve
+        t_rise = np.linspace(0, period_ms, 1000)
+        i_rise = design.current * (1 - np.exp(-t_rise / (design.tau_max_rise * 1000)))
+        self.rise_line.set_data(t_rise, i_rise)
+        with span('specs.simulate'):
+            sim = simulate_design(design, n_channels=1, duration=1.5 * 60 / design.rpm)
+        t_sim = sim['t_wave'] * 1000
+        shown = t_sim <= period_ms
+        self.sim_line.set_data(t_sim[shown], sim['i_wave'][0, 0, 0][shown])
+        self.target_line.set_ydata([design.current * 0.9] * 2)
+        self.budget_line.set_xdata([rise_ms] * 2)
+        self.legend1.get_texts()[3].set_text(f'Rise Budget ({rise_ms:.2f}ms)')
+        self.rise_fill.set_verts([_fill_verts(t_rise, i_rise)])
+        self.ax1.relim()
+        self.ax1.autoscale_view()
+
+        # 2. Inductance vs Voltage Trade-off
+        for bar, label, row in zip(self.bars, self.bar_labels, voltage_data):
+            bar.set_height(row['L_max_mH'])
+            label.set_y(row['L_max_mH'] + 0.005)
+            label.set_text(f"{row['L_max_mH']:.3f}")
+        self.ax2.relim()
+        self.ax2.autoscale_view()
+
+        # 3. Power Dissipation by Component
+        self.ax3.set_title(f'Power Loss Distribution\n(per coil, {design.P:.0f}W total)')
+
+        # 4. Pulse Timing Diagram
+        t_total = np.linspace(0, period_ms * 3, 1000)
+        pulse_signal = np.zeros_like(t_total)
+        for n in range(3):
+            t_offset = n * period_ms
+            mask = (t_total >= t_offset) & (t_total < t_offset + rise_ms + design.hold_time_budget)
+            pulse_signal[mask] = 1
+        self.pulse_line.set_data(t_total, pulse_signal)
+        self.pulse_fill.set_verts([_fill_verts(t_total, pulse_signal)])
+        self.ax4.set_title(f'Pulse Train @ {design.pulse_freq:.0f} Hz')
+        self.period_label.set_x(period_ms / 2)
+        self.period_label.set_text(f'{period_ms:.2f}ms')
+        self.ax4.relim()
+        self.ax4.autoscale_view(scaley=False)
+        return self.fig
+
+    def save(self, path, dpi=150, **kwargs):
+        with span('specs.savefig', dpi=dpi):
+            self.fig.savefig(path, dpi=dpi, **kwargs)
+
+
+def plot_specifications(design=None):
+    """Build the 4-panel electrical design figure for ``design`` (48V default)"""
+    return SpecSheetRenderer(design=design).fig
+
+
+_worker_renderer = None
+
+
+def _init_render_worker(dpi):
+    global _worker_renderer
+    _worker_renderer = (SpecSheetRenderer(headless=True), dpi)
+
+
+def _render_one(task):
+    design, path = task
+    renderer, dpi = _worker_renderer
+    renderer.update(design)
+    # Fast zlib level: batch sheets are rendered far more often than archived
+    renderer.save(path, dpi=dpi, pil_kwargs={'compress_level': 1})
+    return path
+
+
+def render_spec_sheets(designs, output_dir='spec_sheets', workers=None, dpi=150):
+    """
+    Render one electrical_specifications-style PNG per design, headlessly.
+
+    Every worker process builds a single Agg figure and reuses it for all
+    its designs. Prints the achieved throughput and returns the file paths
+    in the order of ``designs``.
+    """
+    import os
+    import time
+    from multiprocessing import Pool
+
+    designs = list(designs)
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(design, os.path.join(
+        output_dir, f'spec_{k:04d}_{design.voltage:g}V_{design.current:g}A.png'))
+        for k, design in enumerate(designs)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_render_worker(dpi)
+        paths = [_render_one(task) for task in tasks]
+    else:
+        with Pool(workers, initializer=_init_render_worker, initargs=(dpi,)) as pool:
+            paths = pool.map(_render_one, tasks, chunksize=max(1, len(tasks) // 64))
+    elapsed = time.perf_counter() - start
+
+    rate = len(paths) / elapsed * 60 if elapsed > 0 else float('inf')
+    print(f"Rendered {len(paths)} spec sheets in {elapsed:.1f} s ({rate:.0f} sheets/min)")
+    return paths
+
+
+def main():
+    with span('specs.import_pyplot'):
+        import matplotlib.pyplot as plt
+
+    design = CoilDesign()
+    print_report(design, sweep=sweep_design_space())
+    plot_specifications(design)
+
+    with span('specs.savefig', dpi=150):
+        plt.savefig('electrical_specifications.png', dpi=150, bbox_inches='tight')
+    print("📊 Electrical specifications graph saved as 'electrical_specifications.png'")
+    print("\nVisualization ready. Close the window when done.")
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
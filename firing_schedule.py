@@ -0,0 +1,351 @@
+"""
+Firing Schedule Generator for Golden Ratio Motor
+Gate-on delays and pulse widths of all 13 coil channels over a grid of
+rotor speeds, emitted as a C lookup table for the firmware and checked on
+the host for worst-case timing jitter and channel overlap
+
+Channel k serves the magnet at k × golden angle: as in
+pulse_simulator.channel_offsets, its pulse period opens when the rotor
+reaches that angle and spans 360/13°. The hold window (full current) stays
+at a fixed rotor angle, the RISE … RISE+HOLD share of the period at the
+design speed. Current rise and collapse take the same time at any speed
+(set by the coil's L/R), so the gate turns on RISE_TIME_BUDGET before the
+hold window, an advance angle that grows with speed, and off at its end.
+At 3000 RPM this is exactly the RISE/HOLD/FALL split of coil_design.
+
+Delays count from the index edge, which sits half a magnet pitch before
+channel 0 opens so that no gate-on crosses it and the firing order is the
+same at every speed. The firmware times the rotation between index edges,
+finds the table row and a Q16 weight with integer math and interpolates
+each channel's delay and width between the two neighbouring rows: no
+floating point in the ISR, and the row spacing costs no accuracy because
+the delays are linear in the rotation period. ``verify_schedule`` runs
+that integer lookup for every whole-microsecond period in the range.
+
+    python firing_schedule.py                        # firing_schedule.h
+    python firing_schedule.py --rpm-step 50 -o build/firing_schedule.h
+"""
+
+import sys
+
+import numpy as np
+
+from coil_design import (FALL_TIME_BUDGET, GOLDEN_ANGLE, HOLD_FRACTION, N_MAGNETS, RISE_FRACTION,
+                         RISE_TIME_BUDGET, RPM)
+from rotor_geometry import magnet_layout
+
+RPM_MIN = 300  # below this the firmware starts the rotor open-loop
+RPM_MAX = RPM
+RPM_STEP = 100  # table row spacing
+WEIGHT_BITS = 16  # fixed-point fraction of the interpolation weight
+ISR_LATENCY_US = 5  # assumed worst-case timer interrupt latency of the MCU
+JITTER_LIMIT = 0.1  # allowed timing error as a share of the rise time
+MAX_GATES_ON = 1  # the bus capacitance (C_min) is sized for one coil pulse at a time
+HEADER_FILE = 'firing_schedule.h'
+US = 1e6
+
+
+def hold_windows(n_channels=N_MAGNETS, rise_fraction=RISE_FRACTION,
+                 hold_fraction=HOLD_FRACTION, golden_angle=GOLDEN_ANGLE):
+    """
+    Start and end of each channel's hold window in degrees after the index
+    edge, which is half a magnet pitch before channel 0 opens
+    """
+    pitch = 360 / n_channels
+    opens = magnet_layout(n_channels, golden_angle=golden_angle).angles + pitch / 2
+    return opens + rise_fraction * pitch, opens + (rise_fraction + hold_fraction) * pitch
+
+
+def gate_times(period, hold_start, hold_end, rise_time=RISE_TIME_BUDGET / 1000):
+    """
+    Exact gate-on delay after the index edge and gate-on duration (s) for a
+    rotation ``period`` in s (broadcast against the channels on the last axis)
+    """
+    period = np.asarray(period, dtype=float)[..., None]
+    on = hold_start / 360 * period - rise_time
+    width = (hold_end - hold_start) / 360 * period + rise_time
+    return on, width
+
+
+def firing_schedule(rpm_min=RPM_MIN, rpm_max=RPM_MAX, rpm_step=RPM_STEP, n_channels=N_MAGNETS,
+                    rise_time=RISE_TIME_BUDGET / 1000, fall_time=FALL_TIME_BUDGET / 1000,
+                    golden_angle=GOLDEN_ANGLE):
+    """
+    Firing table for rpm_min … rpm_max in ``rpm_step`` rows.
+
+    Returns a dict with the ``rpm`` grid, each row's ``period_us`` and
+    gate-on ``advance_deg`` before the hold window, the firing ``order`` of
+    the channels and, per row and channel in firing order, ``on_us``
+    (gate-on delay after the index edge) and ``width_us`` as emitted, plus
+    the inputs needed to verify it (``hold_start``, ``hold_end`` in firing
+    order, times in s).
+    """
+    if rpm_step <= 0 or (rpm_max - rpm_min) % rpm_step or rpm_max <= rpm_min:
+        raise ValueError("rpm_step must be positive and divide rpm_max - rpm_min")
+    rpm = np.arange(rpm_min, rpm_max + 1, rpm_step)
+    hold_start, hold_end = hold_windows(n_channels, golden_angle=golden_angle)
+    order = np.argsort(hold_start, kind='stable')
+    hold_start, hold_end = hold_start[order], hold_end[order]
+    on, width = gate_times(60 / rpm, hold_start, hold_end, rise_time)
+    if on.min() < 0:
+        raise ValueError(f"gate-on crosses the index edge below {rpm_max} RPM")
+
+    on_us = np.rint(on * US).astype(np.int64)
+    width_us = np.rint(width * US).astype(np.int64)
+    if width_us.max() > np.iinfo(np.uint16).max:
+        raise ValueError(f"pulse width {width_us.max()} µs does not fit the 16-bit table; "
+                         "raise rpm_min")
+    return {
+        'rpm': rpm, 'rpm_step': rpm_step, 'period_us': np.rint(60 * US / rpm).astype(np.int64),
+        'advance_deg': rise_time * rpm * 6.0, 'order': order, 'on_us': on_us,
+        'width_us': width_us, 'hold_start': hold_start, 'hold_end': hold_end,
+        'rise_time': rise_time, 'fall_time': fall_time,
+    }
+
+
+def firing_row(schedule, period_us):
+    """
+    Table row below a measured rotation period (µs, integers) and the Q16
+    weight of the next row, as the firmware's ``firing_row`` and
+    ``firing_weight`` compute them
+    """
+    period_us = np.asarray(period_us, dtype=np.int64)
+    rpm_min, step = int(schedule['rpm'][0]), schedule['rpm_step']
+    n_rows = len(schedule['rpm'])
+    row = (60_000_000 - rpm_min * period_us) // (step * period_us)
+    row = np.clip(row, 0, n_rows - 2)
+    table = schedule['period_us']
+    span = table[row] - table[row + 1]
+    weight = ((table[row] - period_us) << WEIGHT_BITS) // span
+    return row, np.clip(weight, 0, 1 << WEIGHT_BITS)
+
+
+def lookup(schedule, period_us):
+    """Gate-on delays and widths (µs, channels in firing order) the firmware uses"""
+    row, weight = firing_row(schedule, period_us)
+    weight = weight[..., None]
+    result = []
+    for name in ('on_us', 'width_us'):
+        low, high = schedule[name][row], schedule[name][row + 1]
+        result.append(low + (((high - low) * weight) >> WEIGHT_BITS))
+    return tuple(result)
+
+
+def max_concurrent(start, duration, period):
+    """
+    Most intervals open at once in each row of ``start``/``duration``
+    (rows × intervals), on a circle of ``period`` (per row). Intervals that
+    only touch do not count as overlapping.
+    """
+    period = np.asarray(period, dtype=float)[:, None]
+    start = np.mod(start, period)
+    end = start + duration
+    open_at_zero = (end > period).sum(axis=1)
+    times = np.concatenate([start, np.mod(end, period)], axis=1)
+    steps = np.concatenate([np.ones_like(start), -np.ones_like(start)], axis=1)
+    order = np.lexsort((steps, times))  # ends before starts at equal times
+    level = open_at_zero[:, None] + np.cumsum(np.take_along_axis(steps, order, axis=1), axis=1)
+    return np.maximum(level.max(axis=1), open_at_zero).astype(int)
+
+
+def verify_schedule(schedule, isr_latency_us=ISR_LATENCY_US, jitter_limit=JITTER_LIMIT,
+                    max_gates_on=MAX_GATES_ON):
+    """
+    Worst-case timing and overlap between every pair of neighbouring rows.
+
+    The firmware lookup is run for every whole-microsecond rotation period
+    of the range and its gate edges compared with the exact times; the ISR
+    latency is added on top. The gate-on windows are widened by that error
+    before counting channels on at once, which must not exceed
+    ``max_gates_on``; each channel's current must also have collapsed (fall
+    budget) before it fires again.
+
+    Returns per-row arrays (the last row shares the interval before it)
+    ``jitter_us``, ``gates_on``, ``conducting`` (channels carrying current,
+    including the fall), ``gate_gap_us`` (shortest nominal gate-off to next
+    gate-on, negative when gates overlap) and ``ok``, plus
+    ``jitter_limit_us``.
+    """
+    rpm, table = schedule['rpm'], schedule['period_us']
+    periods = np.arange(table[-1], table[0] + 1)
+    on_us, width_us = lookup(schedule, periods)
+    on, width = gate_times(periods / US, schedule['hold_start'], schedule['hold_end'],
+                           schedule['rise_time'])
+    error = np.maximum(np.abs(on * US - on_us), np.abs((on + width) * US - on_us - width_us))
+    row, _ = firing_row(schedule, periods)
+    interval = np.zeros(len(rpm))
+    np.maximum.at(interval, row, error.max(axis=1))
+    interval[-1] = interval[-2]
+    jitter = interval + isr_latency_us
+
+    on_us, width_us = schedule['on_us'], schedule['width_us']
+    gates_on = max_concurrent(on_us - jitter[:, None], width_us + 2 * jitter[:, None], table)
+    conduction = width_us + schedule['fall_time'] * US
+    conducting = max_concurrent(on_us, conduction, table)
+    next_on = np.concatenate([on_us[:, 1:], on_us[:, :1] + table[:, None]], axis=1)
+    gate_gap = (next_on - on_us - width_us).min(axis=1)
+
+    limit = jitter_limit * schedule['rise_time'] * US
+    ok = (jitter <= limit) & (gates_on <= max_gates_on) & (conduction.max(axis=1) < table)
+    return {'rpm': rpm, 'jitter_us': jitter, 'jitter_limit_us': limit, 'gates_on': gates_on,
+            'conducting': conducting, 'gate_gap_us': gate_gap, 'ok': ok}
+
+
+def table_bytes(schedule):
+    """Flash used by the emitted tables"""
+    n_rows, n_channels = schedule['on_us'].shape
+    return n_channels + n_rows * 4 + n_rows * n_channels * (4 + 2)
+
+
+def _c_array(values, width):
+    return ', '.join(f'{v:{width}d}' for v in values)
+
+
+def _c_rows(rpm, values, width):
+    return ',\n'.join(f'  /* {r:4d} */ {{{_c_array(row, width)}}}'
+                      for r, row in zip(rpm.tolist(), values.tolist()))
+
+
+def format_header(schedule, verification=None):
+    """C header holding the firing tables and the integer lookup"""
+    rpm = schedule['rpm']
+    n_rows, n_channels = schedule['on_us'].shape
+    jitter = ''
+    if verification is not None:
+        jitter = (f" * Worst-case timing error {verification['jitter_us'].max():.1f} us "
+                  f"(interpolation, rounding and ISR latency).\n")
+    return f"""/*
+ * Golden Ratio Motor - {n_channels}-channel firing schedule
+ * Generated by firing_schedule.py; regenerate instead of editing.
+ *
+ * {rpm[0]}-{rpm[-1]} RPM in {schedule['rpm_step']} RPM rows, channels in firing order:
+ *   FIRING_CHANNEL[i]        coil channel (k serves the magnet at k x golden angle)
+ *   FIRING_ON_US[row][i]     gate-on delay after the index edge, us
+ *   FIRING_WIDTH_US[row][i]  gate-on time, us
+ * The index edge is half a magnet pitch before channel 0 opens. Gates turn on
+ * {schedule['rise_time'] * US:.1f} us before each hold window and off at its end; allow {schedule['fall_time'] * US:.1f} us
+ * for the current to collapse.
+{jitter} *
+ * Once per rotation, from the period between index edges:
+ *   uint16_t row = firing_row(period_us);
+ *   uint32_t w = firing_weight(period_us, row);
+ *   for (i = 0; i < FIRING_N_CHANNELS; i++)  arm FIRING_CHANNEL[i] at
+ *     firing_on_us(row, w, i) for firing_width_us(row, w, i)
+ * Outside FIRING_RPM_MIN..FIRING_RPM_MAX the first or last row is used:
+ * run the rotor from the schedule only inside that range.
+ */
+#ifndef FIRING_SCHEDULE_H
+#define FIRING_SCHEDULE_H
+
+#include <stdint.h>
+
+#define FIRING_N_CHANNELS {n_channels}
+#define FIRING_N_ROWS {n_rows}
+#define FIRING_RPM_MIN {rpm[0]}UL
+#define FIRING_RPM_MAX {rpm[-1]}UL
+#define FIRING_RPM_STEP {schedule['rpm_step']}UL
+#define FIRING_WEIGHT_BITS {WEIGHT_BITS}
+
+static const uint8_t FIRING_CHANNEL[FIRING_N_CHANNELS] = {{{_c_array(schedule['order'], 1)}}};
+
+static const uint32_t FIRING_PERIOD_US[FIRING_N_ROWS] = {{
+  {_c_array(schedule['period_us'], 1)}
+}};
+
+static const uint32_t FIRING_ON_US[FIRING_N_ROWS][FIRING_N_CHANNELS] = {{
+{_c_rows(rpm, schedule['on_us'], 6)}
+}};
+
+static const uint16_t FIRING_WIDTH_US[FIRING_N_ROWS][FIRING_N_CHANNELS] = {{
+{_c_rows(rpm, schedule['width_us'], 5)}
+}};
+
+/* Row at or below the rotor speed for a rotation period in us */
+static inline uint16_t firing_row(uint32_t period_us) {{
+  if (period_us == 0 || period_us <= FIRING_PERIOD_US[FIRING_N_ROWS - 1]) return FIRING_N_ROWS - 2;
+  if (period_us >= FIRING_PERIOD_US[0]) return 0;
+  uint32_t row = (60000000UL - FIRING_RPM_MIN * period_us) / (FIRING_RPM_STEP * period_us);
+  return row > FIRING_N_ROWS - 2 ? FIRING_N_ROWS - 2 : (uint16_t)row;
+}}
+
+/* Weight of row + 1, 0 .. 1 << FIRING_WEIGHT_BITS */
+static inline uint32_t firing_weight(uint32_t period_us, uint16_t row) {{
+  if (period_us >= FIRING_PERIOD_US[row]) return 0;
+  if (period_us <= FIRING_PERIOD_US[row + 1]) return 1UL << FIRING_WEIGHT_BITS;
+  return (uint32_t)(((uint64_t)(FIRING_PERIOD_US[row] - period_us) << FIRING_WEIGHT_BITS)
+                    / (FIRING_PERIOD_US[row] - FIRING_PERIOD_US[row + 1]));
+}}
+
+static inline uint32_t firing_on_us(uint16_t row, uint32_t weight, uint8_t i) {{
+  int32_t low = (int32_t)FIRING_ON_US[row][i];
+  int32_t step = (int32_t)FIRING_ON_US[row + 1][i] - low;
+  return (uint32_t)(low + (int32_t)(((int64_t)step * weight) >> FIRING_WEIGHT_BITS));
+}}
+
+static inline uint16_t firing_width_us(uint16_t row, uint32_t weight, uint8_t i) {{
+  int32_t low = FIRING_WIDTH_US[row][i];
+  int32_t step = (int32_t)FIRING_WIDTH_US[row + 1][i] - low;
+  return (uint16_t)(low + (int32_t)(((int64_t)step * weight) >> FIRING_WEIGHT_BITS));
+}}
+
+#endif /* FIRING_SCHEDULE_H */
+"""
+
+
+def write_header(schedule, path=HEADER_FILE, verification=None):
+    """Write ``format_header`` to ``path``; returns its size in bytes"""
+    text = format_header(schedule, verification)
+    with open(path, 'w') as f:
+        f.write(text)
+    return len(text.encode())
+
+
+def print_schedule_report(schedule, verification, every=300):
+    """Print the schedule and its verification at every ``every`` RPM and at failing rows"""
+    rpm = schedule['rpm']
+    print(f"\n{'FIRING SCHEDULE':^70}")
+    print("-" * 70)
+    print(f"{'RPM':>5} {'Advance':>8} {'Width':>9} {'Jitter':>9} {'Gap':>9} "
+          f"{'Gates':>5} {'Coils':>5}  Status")
+    shown = (rpm % every == 0) | (rpm == rpm[0]) | (rpm == rpm[-1]) | ~verification['ok']
+    for k in np.flatnonzero(shown):
+        print(f"{rpm[k]:5d} {schedule['advance_deg'][k]:7.2f}° "
+              f"{schedule['width_us'][k].max():6d} µs {verification['jitter_us'][k]:6.1f} µs "
+              f"{verification['gate_gap_us'][k]:6.0f} µs {verification['gates_on'][k]:5d} "
+              f"{verification['conducting'][k]:5d}  {'ok' if verification['ok'][k] else 'FAIL'}")
+    print("-" * 70)
+    worst = int(np.argmax(verification['jitter_us']))
+    print(f"{len(rpm)} rows × {schedule['on_us'].shape[1]} channels, "
+          f"{table_bytes(schedule):,} bytes of tables")
+    print(f"Worst-case jitter {verification['jitter_us'][worst]:.1f} µs at {rpm[worst]} RPM "
+          f"(limit {verification['jitter_limit_us']:.1f} µs)")
+    separate = rpm[verification['gate_gap_us'] >= 0]
+    if len(separate):
+        print(f"Gate windows never overlap up to {separate.max()} RPM")
+    n_fail = int((~verification['ok']).sum())
+    print(f"{n_fail} row(s) fail the jitter/overlap checks" if n_fail
+          else "All rows within the jitter and overlap limits")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-o', '--output', default=HEADER_FILE)
+    parser.add_argument('--rpm-min', type=int, default=RPM_MIN)
+    parser.add_argument('--rpm-max', type=int, default=RPM_MAX)
+    parser.add_argument('--rpm-step', type=int, default=RPM_STEP)
+    parser.add_argument('--latency-us', type=float, default=ISR_LATENCY_US,
+                        help='worst-case interrupt latency added to the jitter')
+    args = parser.parse_args(argv)
+
+    schedule = firing_schedule(args.rpm_min, args.rpm_max, args.rpm_step)
+    verification = verify_schedule(schedule, isr_latency_us=args.latency_us)
+    print_schedule_report(schedule, verification)
+    size = write_header(schedule, args.output, verification)
+    print(f"Header ({size:,} bytes) written to {args.output}")
+    return 0 if verification['ok'].all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
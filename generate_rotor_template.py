@@ -1,35 +1,58 @@
 """
 Golden Ratio Magnet Positioning Template Generator
-Creates printable PDF template for precise φ-spaced magnet placement
+Creates printable PDF template for precise φ-spaced magnet placement,
+and SVG/DXF files for laser-cut or CNC rotor production
 """
 
+import io
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle, Wedge, Rectangle
-from matplotlib.backends.backend_pdf import PdfPages
 
-# Constants
-PHI = (1 + np.sqrt(5)) / 2
-GOLDEN_ANGLE = 137.5  # degrees
+from coil_design import PHI, GOLDEN_ANGLE
+from instrumentation import count, span, traced
+from magnet_clearance import check_clearance, format_clearance
+from rotor_geometry import magnet_layout, layout_from_angles
 
-def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=13, 
-                          magnet_size=(25, 10), output_file="rotor_template.pdf"):
+PAGE_SIZE = (8.5, 11)  # inches (US Letter)
+CROSSHAIR_MM = 7.62  # half-length of the centre cross-hair (0.3")
+LABEL_OFFSET_MM = 10.16  # magnet label distance outside the magnet circle (0.4")
+SCALE_BAR_MM = 100
+SCALE_BAR_GAP_MM = 15  # scale bar distance below the rotor edge
+PDF_REFERENCE = re.compile(rb'(\d+) 0 R\b')
+
+def _template_layout(n_magnets, radius, magnet_angles=None, polarity=None):
+    """Golden-angle layout, or the explicit angles/polarities of e.g. an optimized one"""
+    if magnet_angles is None and polarity is None:
+        return magnet_layout(n_magnets, radius)
+    if magnet_angles is None:
+        magnet_angles = np.arange(n_magnets) * GOLDEN_ANGLE
+    return layout_from_angles(magnet_angles, radius, polarity)
+
+def _checked_clearance(layout_mm, rotor_diameter_mm, magnet_size):
+    """Clearance report of a layout in mm; colliding or overhanging magnets are refused"""
+    report = check_clearance(layout_mm, magnet_size, rotor_diameter_mm / 2)
+    if not report['ok']:
+        raise ValueError("magnets do not fit on the rotor:\n" + format_clearance(report))
+    return report
+
+@traced('template.draw')
+def draw_rotor_template(fig, rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=13,
+                        magnet_size=(25, 10), magnet_angles=None, polarity=None):
     """
-    Generate printable template for precise magnet positioning
+    Draw the positioning template onto an empty 8.5x11 inch figure
     
-    Parameters:
-    -----------
-    rotor_diameter_mm : float
-        Diameter of rotor disc in mm
-    magnet_radius_mm : float
-        Radius from center where magnets are placed
-    n_magnets : int
-        Number of magnets (should be Fibonacci number)
-    magnet_size : tuple
-        (length, width) of magnets in mm
-    output_file : str
-        Output PDF filename
+    ``magnet_angles`` (degrees) and ``polarity`` (+1 N / -1 S per magnet)
+    override the golden-angle layout with alternating poles. Raises
+    ValueError, listing the offending magnets, if any overlap or hang over
+    the rotor edge. Returns the magnet angles in degrees.
     """
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Circle, Rectangle
     
     # Convert to inches for printing (1 inch = 25.4 mm)
     scale = 25.4  # mm per inch
@@ -37,9 +60,14 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
     magnet_radius_in = magnet_radius_mm / scale
     magnet_length_in = magnet_size[0] / scale
     magnet_width_in = magnet_size[1] / scale
+    custom = magnet_angles is not None
+    with span('template.clearance'):
+        clearance = _checked_clearance(
+            _template_layout(n_magnets, magnet_radius_mm, magnet_angles, polarity),
+            rotor_diameter_mm, magnet_size)
+    layout = _template_layout(n_magnets, magnet_radius_in, magnet_angles, polarity)
+    n_magnets = len(layout.angles)
     
-    # Create figure (8.5x11 inch paper)
-    fig = plt.figure(figsize=(8.5, 11))
     ax = fig.add_subplot(111, aspect='equal')
     
     # Title and instructions
@@ -53,7 +81,8 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
         f"3. Tape to center of {rotor_diameter_mm}mm aluminum disc",
         f"4. Use center cross-hair for precise alignment",
         f"5. Place magnets in marked rectangles",
-        f"6. Check polarity: N-S-N-S alternating",
+        f"6. Check polarity: N-S-N-S alternating" if polarity is None
+        else f"6. Check polarity against the N/S labels",
         f"7. Glue with epoxy (JB Weld recommended)",
         "",
         f"SPECIFICATIONS:",
@@ -61,7 +90,9 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
         f"- Magnet Circle Radius: {magnet_radius_mm}mm",
         f"- Number of Magnets: {n_magnets}",
         f"- Magnet Size: {magnet_size[0]}mm × {magnet_size[1]}mm",
-        f"- Angular Spacing: {GOLDEN_ANGLE}° (Golden Angle)",
+        f"- Minimum Magnet Gap: {clearance['min_gap']:.1f}mm",
+        f"- Angular Spacing: {GOLDEN_ANGLE}° (Golden Angle)" if not custom
+        else f"- Angular Spacing: optimized (see table)",
         f"- Pattern: Fibonacci spiral (φ = {PHI:.6f})",
     ]
     
@@ -80,28 +111,27 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
     ax.add_patch(rotor_circle)
     
     # Draw center cross-hair
-    ax.plot([-0.3, 0.3], [0, 0], 'k-', linewidth=1)
-    ax.plot([0, 0], [-0.3, 0.3], 'k-', linewidth=1)
+    crosshair_in = CROSSHAIR_MM / scale
+    ax.plot([-crosshair_in, crosshair_in], [0, 0], 'k-', linewidth=1)
+    ax.plot([0, 0], [-crosshair_in, crosshair_in], 'k-', linewidth=1)
     ax.plot(0, 0, 'ko', markersize=8)
     
     # Draw magnet positions
-    magnet_angles = []
+    magnet_angles = layout.angles.tolist()
     for i in range(n_magnets):
-        angle_deg = i * GOLDEN_ANGLE
-        angle_rad = np.radians(angle_deg)
-        magnet_angles.append(angle_deg % 360)
+        angle_deg = layout.angles[i]
+        angle_rad = layout.radians[i]
+        x_center = layout.x[i]
+        y_center = layout.y[i]
         
-        # Calculate magnet center position
-        x_center = magnet_radius_in * np.cos(angle_rad)
-        y_center = magnet_radius_in * np.sin(angle_rad)
-        
-        # Draw magnet outline (rectangle rotated to point toward center)
+        # Draw magnet outline (rectangle rotated about its centre to face the centre)
         magnet_rect = Rectangle(
             (x_center - magnet_width_in/2, y_center - magnet_length_in/2),
             magnet_width_in, magnet_length_in,
             angle=angle_deg,
+            rotation_point='center',
             fill=True,
-            facecolor='lightblue' if i % 2 == 0 else 'lightcoral',
+            facecolor='lightblue' if layout.polarity[i] > 0 else 'lightcoral',
             edgecolor='black',
             linewidth=1.5,
             alpha=0.7
@@ -109,11 +139,11 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
         ax.add_patch(magnet_rect)
         
         # Label magnet number and polarity
-        label_radius = magnet_radius_in + 0.4
+        label_radius = magnet_radius_in + LABEL_OFFSET_MM / scale
         label_x = label_radius * np.cos(angle_rad)
         label_y = label_radius * np.sin(angle_rad)
         
-        polarity = 'N' if i % 2 == 0 else 'S'
+        polarity = 'N' if layout.polarity[i] > 0 else 'S'
         label_text = f'{i}\n{polarity}'
         ax.text(label_x, label_y, label_text, 
                ha='center', va='center', 
@@ -131,8 +161,8 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
     
     # Add legend
     legend_elements = [
-        plt.Rectangle((0, 0), 1, 1, fc='lightblue', ec='black', label='North Pole (N)'),
-        plt.Rectangle((0, 0), 1, 1, fc='lightcoral', ec='black', label='South Pole (S)')
+        Rectangle((0, 0), 1, 1, fc='lightblue', ec='black', label='North Pole (N)'),
+        Rectangle((0, 0), 1, 1, fc='lightcoral', ec='black', label='South Pole (S)')
     ]
     ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
     
@@ -149,7 +179,7 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
         for j in range(3):
             if i + j < n_magnets:
                 angle = magnet_angles[i + j]
-                polarity = 'N' if (i + j) % 2 == 0 else 'S'
+                polarity = 'N' if layout.polarity[i + j] > 0 else 'S'
                 line += f"Mag {i+j:2d} ({polarity}): {angle:6.1f}°    "
         fig.text(0.1, y_pos, line, fontsize=8, family='monospace')
         y_pos -= 0.015
@@ -161,28 +191,394 @@ def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=
             'Measure this line with a ruler. It should be EXACTLY 100mm (3.937 inches).', 
             fontsize=8)
     
-    # Draw 100mm verification line
+    # Draw 100mm verification line (figure coordinates are fractions of the page)
     line_y = scale_box_y - 0.04
-    line_length = 100 / scale  # 100mm in inches
-    fig.plot([0.1, 0.1 + line_length], [line_y, line_y], 'k-', linewidth=2)
-    fig.plot([0.1, 0.1], [line_y - 0.005, line_y + 0.005], 'k-', linewidth=2)
-    fig.plot([0.1 + line_length, 0.1 + line_length], 
-            [line_y - 0.005, line_y + 0.005], 'k-', linewidth=2)
+    line_length = 100 / scale / fig.get_figwidth()  # 100mm as a fraction of the page width
+    for xs, ys in (([0.1, 0.1 + line_length], [line_y, line_y]),
+                   ([0.1, 0.1], [line_y - 0.005, line_y + 0.005]),
+                   ([0.1 + line_length, 0.1 + line_length], [line_y - 0.005, line_y + 0.005])):
+        fig.add_artist(Line2D(xs, ys, color='k', linewidth=2, transform=fig.transFigure))
     fig.text(0.1 + line_length/2, line_y - 0.015, '100mm / 3.937"', 
             ha='center', fontsize=9, fontweight='bold')
     
+    return magnet_angles
+
+def create_rotor_template(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=13, 
+                          magnet_size=(25, 10), output_file="rotor_template.pdf", show=True,
+                          magnet_angles=None, polarity=None):
+    """
+    Generate printable template for precise magnet positioning
+    
+    Parameters:
+    -----------
+    rotor_diameter_mm : float
+        Diameter of rotor disc in mm
+    magnet_radius_mm : float
+        Radius from center where magnets are placed
+    n_magnets : int
+        Number of magnets (should be Fibonacci number)
+    magnet_size : tuple
+        (length, width) of magnets in mm
+    output_file : str
+        Output PDF filename
+    show : bool
+        Open the template in a window after saving
+    magnet_angles : sequence, optional
+        Magnet angles in degrees (e.g. from magnet_optimizer) instead of
+        k × golden angle; sets the number of magnets
+    polarity : sequence, optional
+        +1 (N) / -1 (S) per magnet instead of alternating poles
+    """
+    with span('template.import_pyplot'):
+        import matplotlib.pyplot as plt
+    
+    custom = magnet_angles is not None
+    with span('template.new_figure'):
+        fig = plt.figure(figsize=PAGE_SIZE)
+    magnet_angles = draw_rotor_template(fig, rotor_diameter_mm, magnet_radius_mm,
+                                        n_magnets, magnet_size, magnet_angles, polarity)
+    
     # Save as PDF
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    with span('template.savefig', dpi=300):
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
+    count('template.pages')
     print(f"Template saved as: {output_file}")
     print(f"\n✓ Print at 100% scale (NO SCALING)")
     print(f"✓ Verify scale using the 100mm reference line")
-    print(f"✓ Magnet positions are marked with alternating N/S poles")
-    print(f"✓ Angular spacing: {GOLDEN_ANGLE}° (Golden Angle φ)")
+    print(f"✓ Magnet positions are marked with " +
+          ("alternating N/S poles" if polarity is None else "their N/S poles"))
+    print(f"✓ Angular spacing: " +
+          (f"{GOLDEN_ANGLE}° (Golden Angle φ)" if not custom else "optimized layout"))
     
-    plt.show()
+    if show:
+        plt.show()
     
     return magnet_angles
 
+def _template_page_pdf(config):
+    """One template page as the bytes of a single-page PDF (runs in a worker process)"""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=PAGE_SIZE)
+    draw_rotor_template(fig, **config)
+    buffer = io.BytesIO()
+    with PdfPages(buffer) as pdf:
+        pdf.savefig(fig)
+    return buffer.getvalue()
+
+def _pdf_objects(data):
+    """
+    Objects of a PDF with a plain xref table, as matplotlib writes them
+    
+    Returns ({number: bytes between 'obj' and 'endobj'}, root number, info
+    number or None).
+    """
+    xref = int(data[data.rindex(b'startxref') + len(b'startxref'):].split()[0])
+    table, trailer = data[xref:].split(b'trailer', 1)
+    tokens = table.split()[1:]
+    offsets = {}
+    while tokens:
+        first, n = int(tokens[0]), int(tokens[1])
+        for k in range(n):
+            offset, _, state = tokens[2 + 3 * k:5 + 3 * k]
+            if state == b'n':
+                offsets[first + k] = int(offset)
+        tokens = tokens[2 + 3 * n:]
+    
+    ends = sorted(offsets.values()) + [xref]
+    objects = {}
+    for number, offset in offsets.items():
+        end = ends[ends.index(offset) + 1]
+        objects[number] = data[data.index(b'obj', offset) + 3:data.rindex(b'endobj', offset, end)]
+    root = int(re.search(rb'/Root (\d+) 0 R', trailer).group(1))
+    info = re.search(rb'/Info (\d+) 0 R', trailer)
+    return objects, root, int(info.group(1)) if info else None
+
+class _PdfConcatenator:
+    """
+    Appends the pages of single-page PDFs to one open PDF file, in order
+    
+    Each source's objects are renumbered and written straight through, so
+    only their offsets are kept; the page tree, catalog and xref table are
+    written by ``close()``. Stream data is copied untouched: matplotlib's
+    content streams refer to fonts and images by name, not object number.
+    """
+    
+    def __init__(self, file):
+        self.file = file
+        self.offsets = [0, 0, 0]  # 0: free, 1: catalog, 2: page tree
+        self.pages = []
+        file.write(b'%PDF-1.4\n%\xac\xdc \xab\xba\n')
+    
+    def _write(self, number, body):
+        self.offsets[number] = self.file.tell()
+        self.file.write(b'%d 0 obj' % number + body + b'endobj\n')
+    
+    def add(self, data):
+        objects, root, info = _pdf_objects(data)
+        tree = int(re.search(rb'/Pages (\d+) 0 R', objects[root]).group(1))
+        kids = re.search(rb'/Kids \[([^\]]*)\]', objects[tree]).group(1)
+        numbers = {tree: 2}
+        for number in sorted(objects):
+            if number not in (root, info, tree):
+                numbers[number] = len(self.offsets)
+                self.offsets.append(0)
+        
+        def renumber(match):
+            return b'%d 0 R' % numbers[int(match.group(1))]
+        
+        for number, body in objects.items():
+            if number in numbers and number != tree:
+                head, stream, rest = body.partition(b'stream')
+                self._write(numbers[number], PDF_REFERENCE.sub(renumber, head) + stream + rest)
+        self.pages.extend(numbers[int(kid)] for kid in PDF_REFERENCE.findall(kids))
+    
+    def close(self):
+        self._write(1, b'\n<< /Type /Catalog /Pages 2 0 R >>\n')
+        kids = b' '.join(b'%d 0 R' % page for page in self.pages)
+        self._write(2, b'\n<< /Type /Pages /Kids [ %s ] /Count %d >>\n' % (kids, len(self.pages)))
+        xref = self.file.tell()
+        self.file.write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self.offsets))
+        self.file.write(b''.join(b'%010d 00000 n \n' % offset for offset in self.offsets[1:]))
+        self.file.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                        % (len(self.offsets), xref))
+
+@traced('template.batch')
+def create_template_batch(configs, output_file="rotor_templates.pdf", workers=None):
+    """
+    Render many rotor configurations into one multi-page PDF, in order
+    
+    Each config is a dict of ``draw_rotor_template`` arguments
+    (rotor_diameter_mm, magnet_radius_mm, n_magnets, magnet_size). Worker
+    processes draw and render each page headlessly to a single-page PDF and
+    send back only its bytes (about 60 kB); the main process splices the
+    pages into ``output_file`` as they arrive, at about 1% of the rendering
+    cost. At most two pages per worker are in flight and each is dropped
+    once written, so memory stays flat however long ``configs`` (which may
+    be a generator) is. ``workers=1`` writes every page straight into one
+    ``PdfPages`` file instead, which shares the font subsets between pages
+    and so gives a file several times smaller.
+    
+    Returns the number of pages written.
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    n_pages = 0
+    if workers == 1:
+        from matplotlib.backends.backend_pdf import PdfPages
+        from matplotlib.figure import Figure
+        
+        with PdfPages(output_file) as pdf:
+            for config in configs:
+                fig = Figure(figsize=PAGE_SIZE)
+                draw_rotor_template(fig, **config)
+                with span('template.pdf_page'):
+                    pdf.savefig(fig)
+                count('template.pages')
+                n_pages += 1
+    else:
+        with open(output_file, 'wb') as file, ProcessPoolExecutor(max_workers=workers) as pool:
+            output = _PdfConcatenator(file)
+            
+            def write(page):
+                with span('template.pdf_page'):
+                    output.add(page)
+                count('template.pages')
+            
+            pending = deque()
+            for config in configs:
+                pending.append(pool.submit(_template_page_pdf, config))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+                    n_pages += 1
+            while pending:
+                write(pending.popleft().result())
+                n_pages += 1
+            output.close()
+    elapsed = time.perf_counter() - start
+    
+    rate = n_pages / elapsed if elapsed > 0 else float('inf')
+    print(f"Wrote {n_pages} template pages to {output_file} in {elapsed:.1f} s "
+          f"({rate:.1f} pages/s)")
+    return n_pages
+
+def template_shapes(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=13,
+                    magnet_size=(25, 10), magnet_angles=None, polarity=None):
+    """
+    Template geometry in mm, y up, origin at the rotor centre
+    
+    Magnet pockets are rectangles centred on each magnet position, the
+    length running tangentially and the width radially. Coordinates are
+    rounded to the micron; returns a dict shared by the SVG and DXF writers.
+    Raises ValueError if magnets overlap or hang over the rotor edge.
+    """
+    layout = _template_layout(n_magnets, magnet_radius_mm, magnet_angles, polarity)
+    _checked_clearance(layout, rotor_diameter_mm, magnet_size)
+    length, width = magnet_size
+    radial = np.stack([np.cos(layout.radians), np.sin(layout.radians)], axis=-1)
+    tangential = radial @ np.array([[0, 1], [-1, 0]])
+    centres = np.stack([layout.x, layout.y], axis=-1)
+    corner_signs = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])
+    pockets = (centres[:, None]
+               + corner_signs[:, 0, None] * radial[:, None] * (width / 2)
+               + corner_signs[:, 1, None] * tangential[:, None] * (length / 2))
+    rotor_radius = rotor_diameter_mm / 2
+    bar_y = -rotor_radius - SCALE_BAR_GAP_MM
+    def um(points):
+        return np.round(points, 3) + 0.0  # + 0.0 turns -0.0 into 0.0
+    
+    return {
+        'rotor_radius': rotor_radius,
+        'magnet_radius': magnet_radius_mm,
+        'pockets': um(pockets),  # (n_magnets, 4, 2)
+        'labels': um(centres * (1 + LABEL_OFFSET_MM / magnet_radius_mm)),
+        'polarity': layout.polarity,
+        'guides': um(centres * 0.7),  # radial alignment lines end here
+        'scale_bar': um([[-SCALE_BAR_MM / 2, bar_y], [SCALE_BAR_MM / 2, bar_y]]),
+    }
+
+def _um(value):
+    """Python float formatted to the micron, without a '-0.000'"""
+    return f"{value + 0.0:.3f}"
+
+def template_svg(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=13, magnet_size=(25, 10),
+                 magnet_angles=None, polarity=None):
+    """
+    Rotor template as an SVG document in millimetres
+    
+    Cut paths (rotor outline, magnet pockets) are red hairlines, engraving
+    (cross-hair, labels, scale bar) black and alignment guides blue, the
+    usual colour mapping for laser cutters.
+    """
+    shapes = template_shapes(rotor_diameter_mm, magnet_radius_mm, n_magnets, magnet_size,
+                             magnet_angles, polarity)
+    R = shapes['rotor_radius']
+    margin = 5
+    bottom = R + SCALE_BAR_GAP_MM + 10
+    width, height = 2 * (R + margin), R + margin + bottom
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_um(width)}mm" '
+        f'height="{_um(height)}mm" viewBox="{_um(-R - margin)} {_um(-R - margin)} '
+        f'{_um(width)} {_um(height)}">',
+        '<g id="cut" fill="none" stroke="#ff0000" stroke-width="0.01">',
+        f'<circle cx="0" cy="0" r="{_um(R)}"/>',
+    ]
+    # SVG y runs down, so every y is negated
+    for pocket in shapes['pockets'].tolist():
+        points = " ".join(f"{_um(x)},{_um(-y)}" for x, y in pocket)
+        out.append(f'<polygon points="{points}"/>')
+    out.append('</g>')
+
+    out.append('<g id="guide" fill="none" stroke="#0000ff" stroke-width="0.1">')
+    out.append(f'<circle cx="0" cy="0" r="{_um(shapes["magnet_radius"])}" '
+               'stroke-dasharray="3 2"/>')
+    for x, y in shapes['guides'].tolist():
+        out.append(f'<line x1="0" y1="0" x2="{_um(x)}" y2="{_um(-y)}"/>')
+    out.append('</g>')
+
+    c = CROSSHAIR_MM
+    (x0, y0), (x1, _) = shapes['scale_bar'].tolist()
+    out += [
+        '<g id="engrave" fill="none" stroke="#000000" stroke-width="0.2">',
+        f'<line x1="{_um(-c)}" y1="0" x2="{_um(c)}" y2="0"/>',
+        f'<line x1="0" y1="{_um(-c)}" x2="0" y2="{_um(c)}"/>',
+        f'<line x1="{_um(x0)}" y1="{_um(-y0)}" x2="{_um(x1)}" y2="{_um(-y0)}"/>',
+        f'<line x1="{_um(x0)}" y1="{_um(-y0 - 2)}" x2="{_um(x0)}" y2="{_um(-y0 + 2)}"/>',
+        f'<line x1="{_um(x1)}" y1="{_um(-y0 - 2)}" x2="{_um(x1)}" y2="{_um(-y0 + 2)}"/>',
+        '</g>',
+        '<g id="labels" fill="#000000" font-family="sans-serif" font-size="4" '
+        'text-anchor="middle" dominant-baseline="middle">',
+    ]
+    for i, ((x, y), p) in enumerate(zip(shapes['labels'].tolist(), shapes['polarity'])):
+        out.append(f'<text x="{_um(x)}" y="{_um(-y)}">{i} {"N" if p > 0 else "S"}</text>')
+    out.append(f'<text x="0" y="{_um(-y0 + 6)}">{SCALE_BAR_MM}mm</text>')
+    out += ['</g>', '</svg>', '']
+    return "\n".join(out)
+
+def _dxf_line(layer, x0, y0, x1, y1):
+    return (f"0\nLINE\n8\n{layer}\n10\n{_um(x0)}\n20\n{_um(y0)}\n"
+            f"11\n{_um(x1)}\n21\n{_um(y1)}\n")
+
+def _dxf_circle(layer, radius):
+    return f"0\nCIRCLE\n8\n{layer}\n10\n0.000\n20\n0.000\n40\n{_um(radius)}\n"
+
+def _dxf_text(layer, x, y, height, text):
+    # Centre-aligned: the alignment point (11/21) is what CAD programs use
+    return (f"0\nTEXT\n8\n{layer}\n10\n{_um(x)}\n20\n{_um(y)}\n40\n{height}\n1\n{text}\n"
+            f"72\n1\n11\n{_um(x)}\n21\n{_um(y)}\n73\n2\n")
+
+def template_dxf(rotor_diameter_mm=250, magnet_radius_mm=85, n_magnets=13, magnet_size=(25, 10),
+                 magnet_angles=None, polarity=None):
+    """
+    Rotor template as an ASCII DXF (R12) drawing in millimetres
+    
+    Layers CUT (rotor outline, closed magnet pockets), ENGRAVE (cross-hair,
+    labels, scale bar) and GUIDE (magnet circle, radial alignment lines).
+    """
+    shapes = template_shapes(rotor_diameter_mm, magnet_radius_mm, n_magnets, magnet_size,
+                             magnet_angles, polarity)
+    out = ["0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n9\n$INSUNITS\n70\n4\n0\nENDSEC\n",
+           "0\nSECTION\n2\nENTITIES\n",
+           _dxf_circle('CUT', float(shapes['rotor_radius']))]
+    for pocket in shapes['pockets'].tolist():
+        out.append("0\nPOLYLINE\n8\nCUT\n66\n1\n70\n1\n10\n0.0\n20\n0.0\n30\n0.0\n")
+        out += [f"0\nVERTEX\n8\nCUT\n10\n{_um(x)}\n20\n{_um(y)}\n30\n0.0\n" for x, y in pocket]
+        out.append("0\nSEQEND\n8\nCUT\n")
+
+    out.append(_dxf_circle('GUIDE', float(shapes['magnet_radius'])))
+    out += [_dxf_line('GUIDE', 0, 0, x, y) for x, y in shapes['guides'].tolist()]
+
+    c = CROSSHAIR_MM
+    (x0, y0), (x1, _) = shapes['scale_bar'].tolist()
+    out += [_dxf_line('ENGRAVE', -c, 0, c, 0), _dxf_line('ENGRAVE', 0, -c, 0, c),
+            _dxf_line('ENGRAVE', x0, y0, x1, y0),
+            _dxf_line('ENGRAVE', x0, y0 - 2, x0, y0 + 2),
+            _dxf_line('ENGRAVE', x1, y0 - 2, x1, y0 + 2),
+            _dxf_text('ENGRAVE', 0, y0 - 6, 4, f"{SCALE_BAR_MM}mm")]
+    for i, ((x, y), p) in enumerate(zip(shapes['labels'].tolist(), shapes['polarity'])):
+        out.append(_dxf_text('ENGRAVE', x, y, 4, f"{i} {'N' if p > 0 else 'S'}"))
+    out.append("0\nENDSEC\n0\nEOF\n")
+    return "".join(out)
+
+VECTOR_WRITERS = {'.svg': template_svg, '.dxf': template_dxf}
+
+def write_template(path, **config):
+    """Write one template as SVG or DXF, chosen by the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in VECTOR_WRITERS:
+        raise ValueError(f"unsupported template format {ext!r} (use .svg or .dxf)")
+    with open(path, 'w', newline='\n') as f:
+        f.write(VECTOR_WRITERS[ext](**config))
+    return path
+
+def write_template_files(configs, output_dir="rotor_templates", formats=('svg', 'dxf')):
+    """
+    Write SVG/DXF templates for a sweep of rotor configurations
+    
+    Files are named after the configuration, e.g.
+    ``rotor_250mm_r85mm_13mag_25x10.svg``. Prints the achieved rate and
+    returns the written paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    paths = []
+    for config in configs:
+        config = {'rotor_diameter_mm': 250, 'magnet_radius_mm': 85, 'n_magnets': 13,
+                  'magnet_size': (25, 10), **config}
+        length, width = config['magnet_size']
+        stem = (f"rotor_{config['rotor_diameter_mm']:g}mm_r{config['magnet_radius_mm']:g}mm_"
+                f"{config['n_magnets']}mag_{length:g}x{width:g}")
+        for fmt in formats:
+            paths.append(write_template(os.path.join(output_dir, f"{stem}.{fmt}"), **config))
+    elapsed = time.perf_counter() - start
+    
+    rate = len(paths) / elapsed if elapsed > 0 else float('inf')
+    print(f"Wrote {len(paths)} template files to {output_dir}/ in {elapsed:.2f} s "
+          f"({rate:.0f} files/s)")
+    return paths
+
 if __name__ == "__main__":
     print("=" * 60)
     print("GOLDEN RATIO MOTOR - ROTOR TEMPLATE GENERATOR")
@@ -0,0 +1,259 @@
+"""
+Timing Instrumentation for Golden Ratio Motor
+Opt-in nested timing spans and counters for the report, visualization and
+template code, exported as Chrome trace-event JSON (chrome://tracing,
+Perfetto) and as a per-stage summary table
+
+Instrumented code wraps its stages in ``span(name)`` and bumps counters
+with ``count(name)``. Both return at once while recording is off, so they
+can stay in hot paths such as animation frame callbacks. Recording is
+switched on with ``enable()`` / ``recording()`` or, for a whole script,
+with the MOTOR_TRACE environment variable:
+
+    MOTOR_TRACE=spec_trace.json python electrical_specs.py
+
+which writes the trace and prints the summary when the script exits.
+Spans are kept per thread; work done in worker processes is not traced.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+TRACE_ENV = 'MOTOR_TRACE'
+
+_enabled = False
+_events = []  # (name, thread, start ns, duration ns, child ns, args)
+_counters = {}  # name -> [(time ns, running total)]
+_local = threading.local()
+_lock = threading.Lock()
+_origin = time.perf_counter_ns()
+_NO_SPAN = nullcontext()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drop every recorded span and counter"""
+    with _lock:
+        _events.clear()
+        _counters.clear()
+
+
+@contextmanager
+def recording():
+    """Record spans inside the ``with`` block, restoring the previous state after"""
+    was_enabled = _enabled
+    enable()
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start', 'child')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.child = 0
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].child += duration
+        _events.append((self.name, threading.get_ident(), self.start, duration,
+                        self.child, self.args))
+        return False
+
+
+def span(name, **args):
+    """
+    Time the ``with`` block as ``name`` (nested spans are attributed to
+    their parent). Keyword arguments are shown with the event in the trace.
+    A shared no-op context while recording is off.
+    """
+    if not _enabled:
+        return _NO_SPAN
+    return _Span(name, args)
+
+
+def traced(name=None):
+    """Decorator form of ``span``, named after the function by default"""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1):
+    """Add ``value`` to counter ``name`` (no-op while recording is off)"""
+    if not _enabled:
+        return
+    with _lock:
+        series = _counters.setdefault(name, [])
+        total = (series[-1][1] if series else 0) + value
+        series.append((time.perf_counter_ns(), total))
+
+
+def counters():
+    """Current total of every counter"""
+    return {name: series[-1][1] for name, series in _counters.items()}
+
+
+def summary():
+    """
+    Per span name: ``calls``, ``total`` and ``self`` time (s, self excludes
+    nested spans), ``mean`` and ``max`` (s), sorted by self time.
+    """
+    stats = {}
+    for name, _, _, duration, child, _ in list(_events):
+        entry = stats.setdefault(name, {'calls': 0, 'total': 0, 'self': 0, 'max': 0})
+        entry['calls'] += 1
+        entry['total'] += duration
+        entry['self'] += duration - child
+        entry['max'] = max(entry['max'], duration)
+    result = {}
+    for name, entry in sorted(stats.items(), key=lambda item: -item[1]['self']):
+        result[name] = {'calls': entry['calls'], 'total': entry['total'] * 1e-9,
+                        'self': entry['self'] * 1e-9,
+                        'mean': entry['total'] * 1e-9 / entry['calls'],
+                        'max': entry['max'] * 1e-9}
+    return result
+
+
+def print_summary(max_rows=30):
+    """Print the per-stage timing table and counter totals"""
+    stats = summary()
+    wall = sum(entry['self'] for entry in stats.values())
+    print(f"\n{'TIMING SUMMARY':^70}")
+    print("-" * 70)
+    print(f"{'Stage':<30} {'Calls':>6} {'Total (ms)':>11} {'Self (ms)':>10} {'Self':>5} "
+          f"{'Max (ms)':>9}")
+    for name, entry in list(stats.items())[:max_rows]:
+        share = entry['self'] / wall if wall else 0
+        print(f"{name[:30]:<30} {entry['calls']:>6,} {entry['total'] * 1e3:11.2f} "
+              f"{entry['self'] * 1e3:10.2f} {share:5.0%} {entry['max'] * 1e3:9.2f}")
+    if len(stats) > max_rows:
+        print(f"... and {len(stats) - max_rows} more stages")
+    for name, total in counters().items():
+        print(f"{name:<30} {total:>6,}")
+
+
+def chrome_trace():
+    """Trace-event dict of every span ("X" events) and counter ("C" events)"""
+    pid = os.getpid()
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+               'args': {'name': 'golden-ratio-motor'}}]
+    for name, thread, start, duration, _, args in list(_events):
+        event = {'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': pid,
+                 'tid': thread, 'ts': (start - _origin) / 1e3, 'dur': duration / 1e3}
+        if args:
+            event['args'] = {key: value if isinstance(value, (int, float, str, bool))
+                             else repr(value) for key, value in args.items()}
+        events.append(event)
+    for name, series in list(_counters.items()):
+        events.extend({'name': name, 'ph': 'C', 'pid': pid, 'tid': 0,
+                       'ts': (t - _origin) / 1e3, 'args': {name: total}} for t, total in series)
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export_chrome_trace(path):
+    """Write the trace-event JSON to ``path``; returns the number of events"""
+    trace = chrome_trace()
+    with open(path, 'w') as f:
+        json.dump(trace, f)
+    return len(trace['traceEvents'])
+
+
+def _export_at_exit(path):
+    if _events or _counters:
+        n_events = export_chrome_trace(path)
+        print_summary()
+        print(f"Trace of {n_events:,} events written to {path}")
+
+
+if os.environ.get(TRACE_ENV):
+    enable()
+    atexit.register(_export_at_exit, os.environ[TRACE_ENV])
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import tempfile
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    # The instrumented modules record into the imported module, not this script
+    from instrumentation import (count, export_chrome_trace, print_summary, recording,
+                                 reset, span)
+
+    def frame_loop(n):
+        start = time.perf_counter()
+        for _ in range(n):
+            with span('frame'):
+                count('frames')
+        return (time.perf_counter() - start) / n
+
+    n = 200_000
+    disabled = frame_loop(n)
+    with recording():
+        enabled = frame_loop(n)
+    print(f"span + count per frame: {disabled * 1e9:.0f} ns off, {enabled * 1e9:.0f} ns recording")
+    reset()
+
+    # Trace the report, spec sheet, concept figure, animation frames and template
+    from electrical_specs import SpecSheetRenderer, print_report, sweep_design_space
+    from generate_rotor_template import create_rotor_template
+    from visualize_motor import create_animation, create_static_visualization
+
+    folder = tempfile.mkdtemp(prefix='motor_trace_')
+    with recording():
+        with contextlib.redirect_stdout(io.StringIO()):
+            print_report(sweep=sweep_design_space())
+            SpecSheetRenderer(headless=True).save(os.path.join(folder, 'specs.png'))
+            create_static_visualization().canvas.draw()
+            renderer_fig, anim = create_animation(frames=60)
+            for frame in range(60):
+                anim._func(frame)
+            create_rotor_template(output_file=os.path.join(folder, 'template.pdf'), show=False)
+    print_summary()
+    path = os.path.join(folder, 'trace.json')
+    print(f"{export_chrome_trace(path):,} trace events written to {path}")
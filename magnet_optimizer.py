@@ -0,0 +1,311 @@
+"""
+Magnet Arrangement Optimizer for Golden Ratio Motor
+Scores rotor layouts by cogging and torque ripple and searches magnet
+angles, counts and polarity patterns for smoother ones
+
+Scoring works in the frequency domain. Rotating a magnet by φ multiplies
+the harmonics of its torque profile by e^(ihφ), so a whole layout is the
+single-magnet spectrum (torque_map.single_magnet_profile) times the
+layout's structure factor Σₖ sₖ·e^(ihφₖ). Thousands of layouts are scored
+per batch with a few broadcast operations and one inverse FFT. Magnets
+are superposed, so interactions between neighbouring magnets are ignored.
+The search rejects layouts whose neighbouring pockets would touch; the
+ranked results are re-checked with magnet_clearance, as the templates do,
+so every layout reported feasible can be drawn.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from coil_design import GOLDEN_ANGLE, N_MAGNETS, TARGET_CURRENT
+from magnet_clearance import ROTOR_DIAMETER_MM, check_clearance
+from rotor_geometry import layout_from_angles, magnet_layout
+from torque_map import coil_moment, default_geometry, single_magnet_profile
+
+N_ANGLES = 720  # 0.5° resolution of the scored torque curves
+MAGNET_COUNTS = (8, 13, 21)  # Fibonacci numbers searched by default
+EVAL_CHUNK = 256  # layouts scored per broadcast batch
+ANGLE_STEP_DEG = 4.0  # initial spread of the angle perturbations
+MIN_ANGLE_STEP_DEG = 0.1
+FLIP_PROBABILITY = 0.05  # chance of flipping each magnet's polarity per move
+SPECTRUM_CUTOFF = 1e-6  # harmonics below this share of the peak are dropped
+MIN_MAGNET_GAP_MM = 0.5  # clearance kept between neighbouring magnet pockets
+
+
+def ripple_model(geometry=None, current=TARGET_CURRENT, stator_angles=None, n_angles=N_ANGLES):
+    """
+    Spectra and stator layout every score is computed from.
+
+    The stator has one coil per golden-angle position of the nominal
+    13-magnet rotor, as in the build guide, and does not change with the
+    rotor layout being scored.
+    """
+    if geometry is None:
+        geometry = default_geometry()
+    if stator_angles is None:
+        stator_angles = magnet_layout(N_MAGNETS).angles
+    _, per_moment, cogging = single_magnet_profile(geometry, n_angles)
+    drive = np.fft.rfft(per_moment * coil_moment(current, geometry))
+    cogging = np.fft.rfft(cogging)
+    # The profiles are smooth, so only the low harmonics carry any weight
+    significant = [np.flatnonzero(np.abs(s) > SPECTRUM_CUTOFF * np.abs(s).max()).max()
+                   for s in (drive, cogging)]
+    harmonics = np.arange(max(significant) + 1)
+
+    stator = np.radians(np.asarray(stator_angles, dtype=float))
+    stator_phase = np.exp(-1j * stator[:, None] * harmonics)
+    # Stator coils on grid points are applied as index shifts of one curve
+    shifts = stator / (2 * np.pi) * n_angles
+    on_grid = np.allclose(shifts, np.round(shifts), atol=1e-9)
+    stator_index = (np.arange(n_angles) - np.round(shifts).astype(int)[:, None]) % n_angles
+    length_mm, width_mm = geometry['magnet_size_mm'][:2]
+    # Neighbouring pockets first touch at their inner corners, not at the centre radius
+    inner_mm = geometry['magnet_radius_mm'] - width_mm / 2
+    corner_mm = math.hypot(inner_mm, length_mm / 2)
+    return {
+        'n_angles': n_angles,
+        'harmonics': harmonics,
+        'drive': drive[harmonics],
+        'cogging': cogging[harmonics],
+        'stator_phase': stator_phase,  # (coils, harmonics)
+        'stator_index': stator_index if on_grid else None,  # (coils, angles)
+        'cogging_stator': stator_phase.sum(axis=0),
+        # Smallest angle between two magnets that keeps MIN_MAGNET_GAP_MM between their pockets
+        'footprint_deg': 2 * math.degrees(
+            math.atan2(length_mm / 2, inner_mm)
+            + math.asin(min(1.0, MIN_MAGNET_GAP_MM / 2 / corner_mm))),
+    }
+
+
+def _score_chunk(angles, polarity, model):
+    n_angles = model['n_angles']
+    # e^(ihφ) for every magnet and harmonic, as running powers of e^(iφ)
+    phase = np.empty(angles.shape + (len(model['harmonics']),), dtype=complex)
+    phase[..., 0] = 1
+    phase[..., 1:] = np.exp(1j * np.radians(angles))[..., None]
+    np.cumprod(phase, axis=-1, out=phase)
+    structure = np.einsum('bn,bnh->bh', polarity.astype(float), phase)
+    cog_structure = phase.sum(axis=1)
+
+    # Each stator coil conducts only while it pushes forward (ideal commutation)
+    if model['stator_index'] is not None:
+        drive = np.fft.irfft(model['drive'] * structure, n_angles)[:, model['stator_index']]
+    else:
+        drive = np.fft.irfft((model['drive'] * structure)[:, None] * model['stator_phase'],
+                             n_angles)
+    np.maximum(drive, 0, out=drive)
+    cogging = np.fft.irfft(model['cogging'] * cog_structure * model['cogging_stator'], n_angles)
+    total = drive.sum(axis=1) + cogging
+
+    mean = total.mean(axis=1)
+    ripple = (total.max(axis=1) - total.min(axis=1)) / np.where(mean > 0, mean, np.nan)
+    sorted_angles = np.sort(angles % 360, axis=1)
+    gaps = np.diff(sorted_angles, axis=1, append=sorted_angles[:, :1] + 360)
+    min_gap = gaps.min(axis=1)
+    feasible = (min_gap > model['footprint_deg']) & (mean > 0)
+    return {
+        'score': np.where(feasible, ripple, np.inf),
+        'ripple': ripple,
+        'cogging_rms': cogging.std(axis=1),
+        'mean_torque': mean,
+        'min_gap': min_gap,
+        'feasible': feasible,
+    }
+
+
+def score_layouts(angles, polarity, model):
+    """
+    Score a batch of layouts of equal magnet count.
+
+    Parameters
+    ----------
+    angles : array (layouts, magnets)
+        Magnet angles in degrees
+    polarity : array (layouts, magnets)
+        +1 / -1 per magnet
+    model : dict
+        From ``ripple_model``
+
+    Returns
+    -------
+    dict
+        Per-layout arrays: ``ripple`` (peak-to-peak over mean torque of all
+        coils plus cogging), ``cogging_rms`` (N·m), ``mean_torque`` (N·m),
+        ``min_gap`` (degrees between neighbouring magnets), ``feasible``
+        (neighbouring pockets keep MIN_MAGNET_GAP_MM and torque is
+        positive) and ``score``
+        (ripple, inf when infeasible; lower is better).
+    """
+    angles = np.atleast_2d(np.asarray(angles, dtype=float))
+    polarity = np.broadcast_to(np.atleast_2d(polarity), angles.shape)
+    parts = [_score_chunk(angles[i:i + EVAL_CHUNK], polarity[i:i + EVAL_CHUNK], model)
+             for i in range(0, len(angles), EVAL_CHUNK)]
+    return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+
+def golden_layout(n_magnets, golden_angle=GOLDEN_ANGLE):
+    """Angles and alternating polarity of the k × golden angle layout"""
+    layout = magnet_layout(n_magnets, golden_angle=golden_angle)
+    return np.array(layout.angles), np.array(layout.polarity)
+
+
+def _search(task):
+    """One multi-start run: perturbation search from a (jittered) golden layout"""
+    start, n_magnets, seed, model, iterations, population = task
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(start,)))
+
+    angles, polarity = golden_layout(n_magnets)
+    if start > 0:  # start 0 of every count refines the golden layout itself
+        angles = angles + rng.normal(0, ANGLE_STEP_DEG, n_magnets)
+        polarity = polarity * np.where(rng.random(n_magnets) < FLIP_PROBABILITY, -1, 1)
+    angles[0] = 0.0  # scores do not change with a rotation of the whole rotor
+    best = {k: v[0] for k, v in score_layouts(angles, polarity, model).items()}
+
+    for it in range(iterations):
+        step = ANGLE_STEP_DEG * (1 - it / iterations) + MIN_ANGLE_STEP_DEG
+        candidates = angles + rng.normal(0, step, (population, n_magnets))
+        candidates[:, 0] = 0.0
+        flips = np.where(rng.random((population, n_magnets)) < FLIP_PROBABILITY, -1, 1)
+        candidate_polarity = polarity * flips
+        scores = score_layouts(candidates, candidate_polarity, model)
+        k = int(np.argmin(scores['score']))
+        if scores['score'][k] < best['score']:
+            angles, polarity = candidates[k], candidate_polarity[k]
+            best = {key: value[k] for key, value in scores.items()}
+
+    return {
+        'start': start,
+        'n_magnets': n_magnets,
+        'angles': np.mod(angles, 360),
+        'polarity': polarity.astype(int),
+        'evaluated': 1 + iterations * population,
+        **{key: float(value) if key != 'feasible' else bool(value)
+           for key, value in best.items()},
+    }
+
+
+def optimize_layouts(magnet_counts=MAGNET_COUNTS, n_starts=8, iterations=50, population=512,
+                     workers=None, seed=0, geometry=None, current=TARGET_CURRENT, top=10):
+    """
+    Multi-start search for low-ripple magnet layouts.
+
+    Each start perturbs magnet angles (shrinking steps) and flips
+    polarities, keeping the best of ``population`` candidates per
+    iteration. Starts run across a process pool with at most two tasks in
+    flight per worker.
+
+    Parameters
+    ----------
+    magnet_counts : sequence of int
+        Magnet counts to search; ``n_starts`` runs each
+    workers : int
+        Worker processes; 1 runs in-process
+    top : int
+        Number of ranked layouts returned
+
+    Returns
+    -------
+    dict
+        ``layouts`` ranked best first (each with ``angles``, ``polarity``,
+        scores, ``clearance_mm`` from magnet_clearance.check_clearance and
+        ``template`` arguments for create_rotor_template),
+        ``baseline`` scores of the golden layouts and ``evaluated``.
+    """
+    if geometry is None:
+        geometry = default_geometry()
+    model = ripple_model(geometry, current)
+    tasks = [(start, n, seed, model, iterations, population)
+             for n in magnet_counts for start in range(n_starts)]
+
+    results = []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [_search(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for task in tasks:
+                pending.add(pool.submit(_search, task))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results += [future.result() for future in done]
+            results += [future.result() for future in pending]
+
+    for result in results:
+        result['template'] = template_kwargs(result)
+        _confirm_clearance(result, result['template']['magnet_angles'], geometry)
+    results.sort(key=lambda r: (r['score'], r['n_magnets'], r['start']))
+
+    baseline = {}
+    for n in magnet_counts:
+        angles, polarity = golden_layout(n)
+        baseline[n] = {key: value[0] for key, value in score_layouts(angles, polarity, model).items()}
+        _confirm_clearance(baseline[n], angles, geometry)
+    return {
+        'layouts': results[:top],
+        'baseline': baseline,
+        'evaluated': sum(r['evaluated'] for r in results),
+    }
+
+
+def _confirm_clearance(scores, angles, geometry):
+    """
+    Re-check a layout with magnet_clearance, as the templates do, and mark it
+    infeasible when its pockets collide or overhang the rotor
+    """
+    layout = layout_from_angles(angles, geometry['magnet_radius_mm'])
+    report = check_clearance(layout, tuple(geometry['magnet_size_mm'][:2]),
+                             ROTOR_DIAMETER_MM / 2, min_gap=MIN_MAGNET_GAP_MM)
+    scores['clearance_mm'] = report['min_gap']
+    if not report['ok']:
+        scores['feasible'] = False
+        scores['score'] = float('inf')
+
+
+def template_kwargs(layout):
+    """Arguments for create_rotor_template / template_svg from an optimized layout"""
+    return {
+        'n_magnets': layout['n_magnets'],
+        'magnet_angles': [round(float(a), 3) for a in layout['angles']],
+        'polarity': [int(p) for p in layout['polarity']],
+    }
+
+
+def print_layout_report(result, max_rows=10):
+    """Print the golden-angle baselines and the ranked optimized layouts"""
+    print(f"\n{'MAGNET LAYOUT OPTIMIZATION':^70}")
+    print("-" * 70)
+    print(f"Layouts evaluated: {result['evaluated']:,}")
+    header = f"{'Layout':>18} | {'Ripple':>8} | {'Cogging RMS':>11} | {'Mean torque':>11} | {'Min gap':>7}"
+    print(f"\n{header}\n" + "-" * 70)
+
+    def row(name, s):
+        ripple = f"{s['ripple']*100:6.1f}%" if np.isfinite(s['ripple']) else "     n/a"
+        print(f"{name:>18} | {ripple:>8} | {s['cogging_rms']:8.4f} N·m | "
+              f"{s['mean_torque']:8.4f} N·m | {s['min_gap']:6.1f}°"
+              + ("" if s['feasible'] else "  (infeasible)"))
+
+    for n, s in result['baseline'].items():
+        row(f"golden, {n} mag", s)
+    print("-" * 70)
+    for rank, layout in enumerate(result['layouts'][:max_rows], 1):
+        row(f"#{rank}, {layout['n_magnets']} mag", layout)
+
+    if result['layouts']:
+        best = result['layouts'][0]
+        print("\nBest layout angles (°):  " + ", ".join(f"{a:.1f}" for a in best['angles']))
+        print("Best layout polarity:    " + " ".join('N' if p > 0 else 'S' for p in best['polarity']))
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    result = optimize_layouts()
+    elapsed = time.perf_counter() - start
+    print_layout_report(result)
+    print(f"\n{result['evaluated']:,} layouts in {elapsed:.1f} s "
+          f"({result['evaluated'] / elapsed:,.0f} layouts/s)")
@@ -0,0 +1,347 @@
+"""
+Command Line Runner for Golden Ratio Motor
+Builds the coil report, spec sheet, concept figure, rotor animation and
+magnet templates of one design file without prompts, caching every
+artifact under a hash of its inputs and of the code that produces it
+
+    python motor_cli.py example_design.toml
+    python motor_cli.py design.json --stages specs,template --output build/24v
+    python motor_cli.py design.toml --force         # rebuild even when cached
+
+The design file (TOML or JSON) has the sections of DEFAULT_CONFIG; keys
+left out keep their defaults ([design] takes CoilDesign arguments). Each
+stage reads only the values it needs, so editing e.g. the template section
+rebuilds the templates alone. A stage's key also covers the source of every
+repository module it imports (followed transitively through the import
+lines) and the installed numpy / matplotlib / Pillow, so code changes
+invalidate exactly the results they affect. Matplotlib and the motor
+modules are imported only by stages that run, which keeps a fully cached
+run to a few milliseconds.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+from instrumentation import span
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('MOTOR_CLI_CACHE', os.path.join(ROOT, '.cache', 'cli'))
+CACHE_VERSION = 1  # bump when the cache layout or stage outputs change
+LIBRARIES = ('numpy', 'matplotlib', 'PIL')
+
+DEFAULT_CONFIG = {
+    'design': {},  # CoilDesign arguments (voltage, current, rpm, n_magnets, ...)
+    'specs': {'sweep': True, 'dpi': 150},
+    'visualization': {'dpi': 100, 'animation': 'gif', 'frames': 60, 'fps': 30},
+    'template': {'rotor_diameter_mm': 250, 'magnet_radius_mm': 85, 'magnet_size': [25, 10],
+                 'formats': ['pdf', 'svg', 'dxf']},
+}
+
+_IMPORT = re.compile(r'^\s*(?:from\s+(\w+)|import\s+(\w+))', re.MULTILINE)
+
+
+def load_config(path):
+    """Read a TOML or JSON design file and fill in the defaults"""
+    with open(path, 'rb') as f:
+        if path.lower().endswith('.toml'):
+            import tomllib
+            data = tomllib.load(f)
+        else:
+            data = json.load(f)
+    return resolve_config(data)
+
+
+def resolve_config(data):
+    """Merge ``data`` over DEFAULT_CONFIG, rejecting unknown sections and keys"""
+    import inspect
+
+    from coil_design import CoilDesign
+
+    unknown = set(data) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"unknown config sections: {sorted(unknown)}")
+    config = {}
+    for section, defaults in DEFAULT_CONFIG.items():
+        values = data.get(section, {})
+        allowed = (set(inspect.signature(CoilDesign).parameters) if section == 'design'
+                   else set(defaults))
+        unknown = set(values) - allowed
+        if unknown:
+            raise ValueError(f"unknown keys in [{section}]: {sorted(unknown)}")
+        config[section] = {**defaults, **values}
+    return config
+
+
+# Stages: each maps the config to the inputs it reads and builds its
+# artifacts from those inputs into a folder, returning headline numbers
+
+def _design(inputs):
+    from coil_design import CoilDesign
+
+    return CoilDesign(**inputs['design'])
+
+
+def _specs_inputs(config):
+    return {'design': config['design'], 'sweep': config['specs']['sweep']}
+
+
+def _run_specs(inputs, folder):
+    from coil_winding import solve_design_winding
+    from electrical_specs import print_report, sweep_design_space
+
+    design = _design(inputs)
+    sweep = (sweep_design_space(rpm=design.rpm, n_magnets=design.n_magnets)
+             if inputs['sweep'] else None)
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        print_report(design, sweep=sweep)
+    with open(os.path.join(folder, 'report.txt'), 'w') as f:
+        f.write(report.getvalue())
+
+    numbers = {name: getattr(design, name) for name, value in vars(type(design)).items()
+               if hasattr(value, 'attrname')}
+    numbers['winding'] = solve_design_winding(design)._asdict()
+    with open(os.path.join(folder, 'specs.json'), 'w') as f:
+        json.dump(numbers, f, indent=2, default=float)
+    return {'L_max_mH': design.L_max_mH, 'R': design.R, 'N_turns': design.N_turns,
+            'C_min_uF': design.C_min_uF}
+
+
+def _spec_sheet_inputs(config):
+    return {'design': config['design'], 'dpi': config['specs']['dpi']}
+
+
+def _run_spec_sheet(inputs, folder):
+    from electrical_specs import SpecSheetRenderer
+
+    renderer = SpecSheetRenderer(headless=True, design=_design(inputs))
+    renderer.save(os.path.join(folder, 'electrical_specifications.png'), dpi=inputs['dpi'],
+                  bbox_inches='tight')
+    return {}
+
+
+def _motion_inputs(config, *keys):
+    design = _design({'design': config['design']})
+    return {'n_magnets': design.n_magnets, 'rpm': design.rpm,
+            **{key: config['visualization'][key] for key in keys}}
+
+
+def _run_static(inputs, folder):
+    import matplotlib.pyplot as plt
+    from visualize_motor import create_static_visualization
+
+    fig = create_static_visualization(n_magnets=inputs['n_magnets'], rpm=inputs['rpm'])
+    fig.savefig(os.path.join(folder, 'motor_concept.png'), dpi=inputs['dpi'])
+    plt.close(fig)
+    return {}
+
+
+def _run_animation(inputs, folder):
+    from visualize_motor import export_animation
+
+    path = os.path.join(folder, f"rotor_animation.{inputs['animation']}")
+    stats = export_animation(path, frames=inputs['frames'], fps=inputs['fps'],
+                             dpi=inputs['dpi'], n_magnets=inputs['n_magnets'], rpm=inputs['rpm'])
+    return {'frames': stats['frames'], 'render_fps': stats['fps']}
+
+
+def _template_inputs(config):
+    template = config['template']
+    design = _design({'design': config['design']})
+    return {'n_magnets': design.n_magnets, **template}
+
+
+def _run_template(inputs, folder):
+    from generate_rotor_template import create_rotor_template, write_template
+
+    shape = {'rotor_diameter_mm': inputs['rotor_diameter_mm'],
+             'magnet_radius_mm': inputs['magnet_radius_mm'],
+             'n_magnets': inputs['n_magnets'], 'magnet_size': tuple(inputs['magnet_size'])}
+    for fmt in inputs['formats']:
+        path = os.path.join(folder, f'rotor_template.{fmt}')
+        if fmt == 'pdf':
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_rotor_template(**shape, output_file=path, show=False)
+        else:
+            write_template(path, **shape)
+    return {}
+
+
+class Stage(NamedTuple):
+    name: str
+    module: str  # repository module the artifacts come from
+    inputs: Callable  # config -> the values the stage reads
+    run: Callable  # (inputs, folder) -> headline numbers
+
+
+STAGES = {stage.name: stage for stage in (
+    Stage('specs', 'electrical_specs', _specs_inputs, _run_specs),
+    Stage('spec_sheet', 'electrical_specs', _spec_sheet_inputs, _run_spec_sheet),
+    Stage('static', 'visualize_motor', lambda c: _motion_inputs(c, 'dpi'), _run_static),
+    Stage('animation', 'visualize_motor',
+          lambda c: _motion_inputs(c, 'animation', 'frames', 'fps', 'dpi'), _run_animation),
+    Stage('template', 'generate_rotor_template', _template_inputs, _run_template),
+)}
+
+
+@lru_cache(maxsize=None)
+def code_digest(module):
+    """Hash of ``module`` and every repository module it imports, transitively"""
+    seen, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(ROOT, f'{name}.py'), 'rb') as f:
+            source = f.read()
+        for match in _IMPORT.finditer(source.decode()):
+            imported = match.group(1) or match.group(2)
+            if imported not in seen and os.path.exists(os.path.join(ROOT, f'{imported}.py')):
+                pending.append(imported)
+    digest = hashlib.sha256()
+    for name in sorted(seen):
+        with open(os.path.join(ROOT, f'{name}.py'), 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read() + b'\0')
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def library_fingerprint():
+    """Installed numpy / matplotlib / Pillow, by their package files (without importing them)"""
+    from importlib.util import find_spec
+
+    fingerprint = {}
+    for name in LIBRARIES:
+        spec = find_spec(name)
+        if spec is not None and spec.origin:
+            stat = os.stat(spec.origin)
+            fingerprint[name] = [spec.origin, stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+
+def stage_key(stage, inputs):
+    """Content address of one stage result"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        runner = hashlib.sha256(f.read()).hexdigest()  # the stage functions themselves
+    payload = json.dumps({'version': CACHE_VERSION, 'stage': stage.name, 'inputs': inputs,
+                          'code': code_digest(stage.module), 'runner': runner,
+                          'libraries': library_fingerprint()}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def run_stage(stage, config, cache_dir=CACHE_DIR, force=False):
+    """
+    Return the cache manifest of ``stage`` for ``config``, building it
+    first when it is missing (or ``force``). The manifest lists the
+    artifacts (files in ``manifest['folder']``), the inputs and the
+    headline numbers; ``manifest['cached']`` tells whether it was reused.
+    """
+    inputs = stage.inputs(config)
+    key = stage_key(stage, inputs)
+    folder = os.path.join(cache_dir, stage.name, key)
+    manifest_path = os.path.join(folder, 'manifest.json')
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        return {**manifest, 'folder': folder, 'cached': True}
+
+    # Build in a scratch folder and rename it into place, so an interrupted
+    # run never leaves a half-written entry behind
+    os.makedirs(os.path.dirname(folder), exist_ok=True)
+    scratch = tempfile.mkdtemp(prefix=f'.{key}-', dir=os.path.dirname(folder))
+    try:
+        start = time.perf_counter()
+        with span(f'cli.{stage.name}'):
+            results = stage.run(inputs, scratch)
+        manifest = {'stage': stage.name, 'key': key, 'inputs': inputs, 'results': results,
+                    'artifacts': sorted(os.listdir(scratch)),
+                    'seconds': time.perf_counter() - start}
+        with open(os.path.join(scratch, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.replace(scratch, folder)
+    except BaseException:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    return {**manifest, 'folder': folder, 'cached': False}
+
+
+def run(config, stages=None, output_dir=None, cache_dir=CACHE_DIR, force=False):
+    """
+    Run ``stages`` (all enabled ones by default) for a resolved config and
+    copy their artifacts to ``output_dir`` if given. Returns the manifests
+    by stage name.
+    """
+    if stages is None:
+        stages = [name for name in STAGES
+                  if name != 'animation' or config['visualization']['animation']]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages: {sorted(unknown)} (choose from {list(STAGES)})")
+    manifests = {}
+    for name in stages:
+        manifest = manifests[name] = run_stage(STAGES[name], config, cache_dir, force)
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            for artifact in manifest['artifacts']:
+                shutil.copyfile(os.path.join(manifest['folder'], artifact),
+                                os.path.join(output_dir, artifact))
+    return manifests
+
+
+def print_run_summary(manifests, output_dir=None, elapsed=None):
+    """Print what was reused or built, with the artifacts of each stage"""
+    print(f"\n{'DESIGN BUILD':^70}")
+    print("-" * 70)
+    for name, manifest in manifests.items():
+        status = 'cached' if manifest['cached'] else f"built in {manifest['seconds']:.2f} s"
+        print(f"{name:<12} {manifest['key']}  {status}")
+        for artifact in manifest['artifacts']:
+            print(f"    {artifact}")
+        for key, value in manifest['results'].items():
+            print(f"    {key:<16} {value:.4g}")
+    print("-" * 70)
+    if output_dir is not None:
+        print(f"Artifacts copied to {output_dir}")
+    if elapsed is not None:
+        built = sum(not m['cached'] for m in manifests.values())
+        print(f"{built} of {len(manifests)} stages built, {elapsed * 1000:.0f} ms total")
+
+
+def main(argv=None):
+    import argparse
+
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Build the specs, figures and templates "
+                                                 "of a Golden Ratio Motor design file")
+    parser.add_argument('config', help='TOML or JSON design file')
+    parser.add_argument('--stages', help=f"comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument('--output', help='copy the artifacts here (default build/<design name>)')
+    parser.add_argument('--cache', default=CACHE_DIR, help='cache directory')
+    parser.add_argument('--force', action='store_true', help='rebuild even when cached')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('MPLBACKEND', 'Agg')  # never open windows or block on show()
+    config = load_config(args.config)
+    stages = args.stages.split(',') if args.stages else None
+    output_dir = args.output or os.path.join(
+        'build', os.path.splitext(os.path.basename(args.config))[0])
+    manifests = run(config, stages, output_dir, args.cache, args.force)
+    print_run_summary(manifests, output_dir, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
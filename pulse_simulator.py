@@ -0,0 +1,204 @@
+"""
+Coil Driver Circuit Simulator for Golden Ratio Motor
+Fixed-step time-domain model of the MOSFET / coil / flyback-diode channel,
+batched across all coil channels and any number of design variants
+
+Circuit (one channel, from the driver section of electrical_specs.py):
+  gate on:  V = i * (R + Rds_on) + L di/dt
+  gate off: current freewheels through the flyback diode,
+            0 = i * R + V_f + L di/dt   until it reaches zero
+
+Each channel fires once per rotation when its magnet (at k × golden angle)
+passes, so the 13 channels together form the 650 Hz pulse train.
+"""
+
+import numpy as np
+
+from coil_design import (
+    GOLDEN_ANGLE, N_MAGNETS, ROTATION_FREQ, PULSE_PERIOD, RISE_FRACTION,
+    HOLD_FRACTION, FALL_TIME_BUDGET,
+)
+from rotor_geometry import magnet_layout
+
+TIME_STEP = 1e-6  # s (1 µs)
+DIODE_FORWARD_DROP = 1.0  # V (UF5408 at a few amps)
+RDS_ON = 0.05  # Ω (logic-level MOSFET, Rds(on) < 0.1Ω)
+DECAY_THRESHOLD = 0.1  # current left after the 90% collapse the fall budget allows for
+
+
+def channel_offsets(n_channels=N_MAGNETS, rotation_freq=ROTATION_FREQ,
+                    golden_angle=GOLDEN_ANGLE):
+    """Firing time (s) of each channel within one rotation"""
+    angles = magnet_layout(n_channels, golden_angle=golden_angle).angles
+    return angles / 360 / rotation_freq
+
+
+def _batch(value, n_channels):
+    """Shape a scalar, (variants,) or (variants, channels) input as (variants, channels)"""
+    value = np.asarray(value, dtype=float)
+    if value.ndim == 0:
+        value = value.reshape(1, 1)
+    elif value.ndim == 1:
+        value = value[:, None]
+    return np.broadcast_to(value, (value.shape[0], n_channels))
+
+
+def simulate_pulse_train(voltage, resistance, inductance, duration=1.0, dt=TIME_STEP,
+                         n_channels=N_MAGNETS, rotation_freq=ROTATION_FREQ,
+                         on_time=(RISE_FRACTION + HOLD_FRACTION) * PULSE_PERIOD,
+                         fall_budget=FALL_TIME_BUDGET / 1000,
+                         diode_drop=DIODE_FORWARD_DROP, rds_on=RDS_ON,
+                         offsets=None, keep_waveforms=1):
+    """
+    Simulate consecutive pulses on every channel of every design variant.
+
+    The circuit is linear between switching edges, so each 1 µs step uses the
+    exact discretisation i[k+1] = i_inf + (i[k] - i_inf) * exp(-dt/τ). The
+    decay factors for a whole rotation are computed once; every pulse is
+    then a handful of broadcast operations over (variants, channels, steps),
+    carrying the current left over from the previous pulse into the next.
+
+    Parameters
+    ----------
+    voltage, resistance, inductance : float or array
+        Bus voltage (V), coil resistance (Ω) and inductance (H). Scalars,
+        shape (variants,) or shape (variants, channels).
+    duration : float
+        Simulated time in s
+    dt : float
+        Fixed time step in s
+    on_time : float
+        Gate-on time per pulse (rise + hold budget) in s
+    fall_budget : float
+        Time allowed for the current to collapse after gate-off in s
+    offsets : array, optional
+        Firing time of each channel within a rotation; golden-angle spacing
+        by default
+    keep_waveforms : int
+        Number of leading pulses per channel whose full waveforms are kept
+
+    Returns
+    -------
+    dict
+        Per-pulse arrays of shape (variants, channels, pulses): ``t_start``,
+        ``peak_current``, ``turn_off_current``, ``fall_time``,
+        ``residual_current``, ``braking`` and ``overlap``; per-variant event
+        counts ``n_braking`` and ``n_overlap``; and ``t_wave``/``i_wave``
+        holding the kept waveforms.
+    """
+    V = _batch(voltage, n_channels)
+    R = _batch(resistance, n_channels)
+    L = _batch(inductance, n_channels)
+    V, R, L = np.broadcast_arrays(V, R, L)
+    if offsets is None:
+        offsets = channel_offsets(n_channels, rotation_freq)
+    offsets = np.round(np.asarray(offsets, dtype=float) / dt) * dt
+
+    n_period = int(round(1 / (rotation_freq * dt)))
+    n_on = int(round(on_time / dt))
+    n_off = n_period - n_on
+    n_pulses = int(duration * rotation_freq)
+    if n_off <= 0:
+        raise ValueError("on_time must be shorter than one rotation")
+
+    # Steady-state current and exact per-step decay factors for both phases
+    i_inf_on = V / (R + rds_on)
+    i_inf_off = -diode_drop / R
+    k_on = np.arange(n_on + 1)
+    k_off = np.arange(1, n_off + 1)
+    decay_on = np.exp(-k_on * dt / (L / (R + rds_on))[..., None])
+    decay_off = np.exp(-k_off * dt / (L / R)[..., None])
+    threshold = DECAY_THRESHOLD * i_inf_on
+
+    shape = V.shape + (n_pulses,)
+    peak = np.empty(shape)
+    turn_off = np.empty(shape)
+    fall_time = np.empty(shape)
+    residual = np.empty(shape)
+
+    n_keep = min(keep_waveforms, n_pulses)
+    i_wave = np.empty(V.shape + (n_keep, n_period + 1))
+
+    i0 = np.zeros(V.shape)
+    for p in range(n_pulses):
+        rise = i_inf_on[..., None] + (i0 - i_inf_on)[..., None] * decay_on
+        i_off = rise[..., -1]
+        fall = i_inf_off[..., None] + (i_off - i_inf_off)[..., None] * decay_off
+        np.maximum(fall, 0, out=fall)  # the diode blocks reverse current
+
+        decayed = fall <= threshold[..., None]
+        steps = np.where(decayed.any(axis=-1), decayed.argmax(axis=-1) + 1, n_off)
+
+        peak[..., p] = np.maximum(rise.max(axis=-1), i0)
+        turn_off[..., p] = i_off
+        fall_time[..., p] = steps * dt
+        i0 = fall[..., -1]
+        residual[..., p] = i0
+
+        if p < n_keep:
+            i_wave[..., p, :n_on + 1] = rise
+            i_wave[..., p, n_on + 1:] = fall[..., :n_period - n_on]
+
+    t_start = offsets[:, None] + np.arange(n_pulses) / rotation_freq
+    t_start = np.broadcast_to(t_start, shape)
+    braking = fall_time > fall_budget
+
+    # Overlap: a channel still conducting when the next pulse of the train fires
+    n_variants = V.shape[0]
+    starts = t_start.reshape(n_variants, -1)
+    ends = (t_start + on_time + fall_time).reshape(n_variants, -1)
+    order = np.argsort(starts[0], kind='stable')
+    next_start = np.full(starts.shape, np.inf)
+    next_start[:, order[:-1]] = starts[:, order[1:]]
+    overlap = (ends > next_start).reshape(shape)
+    # ... or the same channel has not decayed by its own next pulse
+    overlap |= residual > threshold[..., None]
+
+    return {
+        't_start': t_start,
+        'peak_current': peak,
+        'turn_off_current': turn_off,
+        'fall_time': fall_time,
+        'residual_current': residual,
+        'braking': braking,
+        'overlap': overlap,
+        'n_braking': braking.reshape(n_variants, -1).sum(axis=1),
+        'n_overlap': overlap.reshape(n_variants, -1).sum(axis=1),
+        't_wave': np.arange(n_period + 1) * dt,
+        'i_wave': i_wave,
+    }
+
+
+def simulate_design(design, **kwargs):
+    """Simulate a CoilDesign wound right at its inductance limit"""
+    on_time = design.pulse_period_ms * (design.rise_fraction + design.hold_fraction) / 1000
+    kwargs.setdefault('rotation_freq', design.rpm / 60)
+    kwargs.setdefault('n_channels', design.n_magnets)
+    kwargs.setdefault('on_time', on_time)
+    kwargs.setdefault('fall_budget', design.fall_time_budget / 1000)
+    return simulate_pulse_train(design.voltage, design.R, design.L_max, **kwargs)
+
+
+def print_event_summary(result):
+    """Print braking and overlap counts for each simulated variant"""
+    n_variants, n_channels, n_pulses = result['fall_time'].shape
+    print(f"Simulated {n_channels} channels × {n_pulses} pulses per variant")
+    print(f"{'Variant':>8} | {'Peak':>8} | {'Max fall':>10} | {'Braking':>8} | {'Overlap':>8}")
+    print("-" * 56)
+    for v in range(n_variants):
+        print(f"{v:8d} | {result['peak_current'][v].max():6.2f} A | "
+              f"{result['fall_time'][v].max()*1e6:7.0f} µs | "
+              f"{result['n_braking'][v]:8d} | {result['n_overlap'][v]:8d}")
+
+
+if __name__ == "__main__":
+    import time
+
+    from coil_design import CoilDesign
+
+    design = CoilDesign()
+    start = time.perf_counter()
+    result = simulate_design(design, duration=10.0)
+    elapsed = time.perf_counter() - start
+    print_event_summary(result)
+    print(f"\n10 s at 1 µs for {design.n_magnets} coils simulated in {elapsed:.2f} s")
@@ -0,0 +1,276 @@
+"""
+Rotor Dynamics Simulator for Golden Ratio Motor
+Event-driven model of the spinning rotor: coil impulses at the golden-angle
+magnet positions, Q-derived drag, a load coupled through the hysteretic
+clutch band, and coast-down once the drive stops
+
+Between two magnet passes the rotor only coasts, and in the angle domain
+the kinetic energy E = ½Jω² obeys a linear equation:
+  dE/dθ = -E/Q - T_load        (drag loses 2π·E/Q per radian-turn)
+so each gap is the exact affine map E → a·E + b. Chains of gaps are solved
+in blocks with cumulative products and sums instead of a time step.
+
+At the target Q of 100 the 48V drive balances drag at about 420 RPM, far
+below the clutch band; the band is only reached with Q in the thousands
+(CLUTCH_DEMO_Q cycles the clutch under LOAD_TORQUE).
+"""
+
+import math
+
+import numpy as np
+
+from coil_design import GOLDEN_ANGLE, N_MAGNETS, RPM, CoilDesign
+from rotor_geometry import magnet_layout
+
+ROTOR_INERTIA = 0.0156  # kg·m² (2 kg, 250 mm disc: ½·m·r²)
+Q_FACTOR = 100  # target mechanical Q of the rotor
+COIL_EFFICIENCY = 0.5  # share of each coil pulse turned into rotor work
+LOAD_TORQUE = 0.05  # N·m drawn by the load while the clutch is engaged
+CLUTCH_ENGAGE_RPM = RPM * 0.8  # 2400 RPM
+CLUTCH_DISENGAGE_RPM = RPM * 0.75  # 2250 RPM
+STOP_RPM = 1.0  # coast-down ends below this speed
+CLUTCH_DEMO_Q = 4000  # Q whose equilibria straddle the clutch band: 2670 RPM free, 2190 loaded
+
+MIN_BLOCK = 256  # events per solve after a clutch switch
+MAX_BLOCK = 65536  # events per solve in steady running
+MAX_DECAY_PER_BLOCK = 200.0  # keeps the block's cumulative decay above ~1e-87
+
+
+def magnet_gaps(n_magnets=N_MAGNETS, golden_angle=GOLDEN_ANGLE):
+    """Angles (rad) between consecutive magnet passes over one rotation"""
+    return np.radians(magnet_layout(n_magnets, golden_angle=golden_angle).gaps)
+
+
+def rpm_to_energy(rpm, inertia=ROTOR_INERTIA):
+    omega = np.asarray(rpm) * 2 * np.pi / 60
+    return 0.5 * inertia * omega ** 2
+
+
+def energy_to_rpm(energy, inertia=ROTOR_INERTIA):
+    return np.sqrt(2 * np.maximum(energy, 0) / inertia) * 60 / (2 * np.pi)
+
+
+def simulate_rotor(duration=3600.0, initial_rpm=RPM, design=None, inertia=ROTOR_INERTIA,
+                   q_factor=Q_FACTOR, efficiency=COIL_EFFICIENCY, load_torque=LOAD_TORQUE,
+                   engage_rpm=CLUTCH_ENGAGE_RPM, disengage_rpm=CLUTCH_DISENGAGE_RPM,
+                   drive_time=None, n_magnets=N_MAGNETS, sample_interval=1.0):
+    """
+    Simulate the rotor pulse to pulse.
+
+    Every magnet pass is one event: the rotor coasts through the gap (drag
+    plus load torque if the clutch is engaged), then the coil adds
+    ``efficiency × design.energy_per_pulse`` of kinetic energy while the
+    drive is on. Blocks of events are solved at once; a block is cut short
+    where the clutch changes state, the rotor stalls or the run ends, so the
+    cost scales with the number of pulses, not with simulated time. The time
+    each gap takes is the trapezoid estimate 2·Δθ / (ω_start + ω_end), exact
+    for constant angular deceleration.
+
+    Parameters
+    ----------
+    duration : float
+        Simulated time in s
+    initial_rpm : float
+        Rotor speed at t = 0. A rotor at rest is parked with a magnet over
+        its coil, so the drive fires its first pulse at t = 0
+    design : CoilDesign
+        Coil/drive whose pulse energy is fired at each magnet (48V default)
+    q_factor : float
+        Mechanical Q; drag loses E/Q per radian
+    load_torque : float
+        Torque (N·m) taken by the load while the clutch is engaged
+    engage_rpm, disengage_rpm : float
+        Clutch hysteresis band
+    drive_time : float, optional
+        Coils stop firing after this time (s) and the rotor coasts down;
+        drives for the whole run by default
+    sample_interval : float
+        Spacing (s) of the recorded time series
+
+    Returns
+    -------
+    dict
+        Time series ``t``, ``rpm``, ``energy_in`` (coil energy delivered),
+        ``energy_out`` (work into the load) and ``energy_lost`` (drag), all
+        cumulative J, plus ``n_pulses``, ``n_engagements``, ``stalled`` and
+        ``t_end``.
+    """
+    if design is None:
+        design = CoilDesign()
+    if drive_time is None:
+        drive_time = duration
+    pulse_energy = efficiency * design.energy_per_pulse
+
+    gaps = magnet_gaps(n_magnets)
+    max_block = int(min(MAX_BLOCK, MAX_DECAY_PER_BLOCK * q_factor / gaps.max()))
+    tiled = np.tile(gaps, max_block // n_magnets + 2)
+    tiled_decay = np.exp(-tiled / q_factor)
+    E_engage = rpm_to_energy(engage_rpm, inertia)
+    E_disengage = rpm_to_energy(disengage_rpm, inertia)
+    E_stop = rpm_to_energy(STOP_RPM, inertia)
+
+    E = float(rpm_to_energy(initial_rpm, inertia))
+    E_start = E
+    t = 0.0
+    phase = 0  # index of the next gap within the rotation
+    engaged = initial_rpm >= engage_rpm
+    energy_in = energy_out = 0.0
+    n_pulses = n_engagements = 0
+    stalled = False
+    block = MIN_BLOCK
+
+    samples = {'t': [np.zeros(1)], 'E': [np.array([E])],
+               'energy_in': [np.zeros(1)], 'energy_out': [np.zeros(1)]}
+    next_sample = sample_interval
+
+    if E <= 0 and drive_time > 0 and duration > 0:
+        # Parked on a magnet: the first pulse fires at t = 0
+        E = energy_in = pulse_energy
+        n_pulses = 1
+
+    while t < duration:
+        driving = t < drive_time
+        gap = tiled[phase:phase + block]
+        a = tiled_decay[phase:phase + block]
+        load = load_torque if engaged else 0.0
+        kick = pulse_energy if driving else 0.0
+        c = -load * q_factor * (1 - a) + kick
+
+        # E_k = A_k (E_0 + Σ c_j / A_j), A_k = a_1 ⋯ a_k
+        A = np.cumprod(a)
+        E_after = A * (E + np.cumsum(c / A))
+        E_before = E_after - kick  # end of each gap, before the pulse
+        omega_start = np.sqrt(2 / inertia * np.maximum(np.concatenate(([E], E_after[:-1])), 0))
+        omega_end = np.sqrt(2 / inertia * np.maximum(E_before, 0))
+
+        # First event that ends this block early
+        stop = [block]
+        stall = np.flatnonzero(E_before <= 0)
+        if stall.size:
+            stop.append(stall[0])
+        if engaged:
+            switch = np.flatnonzero(E_after < E_disengage)
+        else:
+            switch = np.flatnonzero(E_after >= E_engage)
+        if switch.size:
+            stop.append(switch[0] + 1)
+        if not driving:
+            slow = np.flatnonzero(E_after < E_stop)
+            if slow.size:
+                stop.append(slow[0] + 1)
+        n = min(stop)
+
+        dt = 2 * gap[:n] / (omega_start[:n] + omega_end[:n])
+        t_events = t + np.cumsum(dt)
+        # Drive switch-off or end of run inside the block
+        limit = min(duration, drive_time) if driving else duration
+        over = np.flatnonzero(t_events >= limit)
+        if over.size and over[0] + 1 < n:
+            n = over[0] + 1
+            t_events = t_events[:n]
+
+        cum_in = energy_in + kick * np.arange(1, n + 1)
+        cum_out = energy_out + load * np.cumsum(gap[:n])
+
+        if stall.size and n == stall[0]:
+            # Rotor stops inside gap n: E(φ) = (E + T·Q)·e^(-φ/Q) - T·Q = 0
+            # (an undriven rotor starting at rest never reaches a magnet at all)
+            E_prev = E_after[n - 1] if n else E
+            w_prev = omega_start[n]
+            phi = q_factor * math.log1p(E_prev / (load * q_factor)) if E_prev > 0 else 0.0
+            t_stop = (t_events[-1] if n else t) + (2 * phi / w_prev if phi else 0.0)
+            t_events = np.append(t_events, t_stop)
+            E_series = np.append(E_after[:n], 0.0)
+            cum_in = np.append(cum_in, cum_in[-1] if n else energy_in)
+            cum_out = np.append(cum_out, (cum_out[-1] if n else energy_out) + load * phi)
+            stalled = True
+        else:
+            E_series = E_after[:n]
+
+        # Keep the first event of every new sample interval
+        idx = np.flatnonzero(t_events >= next_sample)
+        if idx.size:
+            bucket = np.floor(t_events[idx] / sample_interval)
+            keep = idx[np.flatnonzero(np.diff(bucket, prepend=-1))]
+            samples['t'].append(t_events[keep])
+            samples['E'].append(E_series[keep])
+            samples['energy_in'].append(cum_in[keep])
+            samples['energy_out'].append(cum_out[keep])
+            next_sample = (bucket[-1] + 1) * sample_interval
+
+        t = float(t_events[-1]) if t_events.size else t
+        E = float(E_series[-1]) if E_series.size else E
+        energy_in = float(cum_in[-1]) if cum_in.size else energy_in
+        energy_out = float(cum_out[-1]) if cum_out.size else energy_out
+        n_pulses += n if driving else 0
+        phase = (phase + n) % n_magnets
+
+        if stalled or (not driving and E < E_stop):
+            break
+        if switch.size and n == switch[0] + 1:
+            engaged = not engaged
+            n_engagements += engaged
+        # Grow the block while nothing interrupts it, restart small after a switch
+        block = min(max_block, 2 * block) if n == block else max(MIN_BLOCK, 2 * n)
+        block = min(block, max_block)
+
+    # Always end the series on the final state
+    samples['t'].append(np.array([t]))
+    samples['E'].append(np.array([E]))
+    samples['energy_in'].append(np.array([energy_in]))
+    samples['energy_out'].append(np.array([energy_out]))
+
+    series = {key: np.concatenate(value) for key, value in samples.items()}
+    E_series = series.pop('E')
+    series['rpm'] = energy_to_rpm(E_series, inertia)
+    series['energy_lost'] = E_start + series['energy_in'] - series['energy_out'] - E_series
+    series.update(n_pulses=n_pulses, n_engagements=n_engagements, stalled=stalled, t_end=t)
+    return series
+
+
+def equilibrium_rpm(design=None, inertia=ROTOR_INERTIA, q_factor=Q_FACTOR,
+                    efficiency=COIL_EFFICIENCY, load_torque=0.0, n_magnets=N_MAGNETS):
+    """Speed where coil energy per rotation balances drag and load (0 if none)"""
+    if design is None:
+        design = CoilDesign()
+    per_rotation = n_magnets * efficiency * design.energy_per_pulse - 2 * np.pi * load_torque
+    if per_rotation <= 0:
+        return 0.0
+    return float(energy_to_rpm(q_factor * per_rotation / (2 * np.pi), inertia))
+
+
+def print_dynamics_summary(result):
+    """Print the outcome of a rotor simulation"""
+    print(f"\n{'ROTOR DYNAMICS':^70}")
+    print("-" * 70)
+    print(f"Simulated time:     {result['t_end']:10.1f} s")
+    print(f"Coil pulses:        {result['n_pulses']:10,d}")
+    print(f"Clutch engagements: {result['n_engagements']:10,d}")
+    print(f"Final speed:        {result['rpm'][-1]:10.0f} RPM"
+          + ("  (stalled)" if result['stalled'] else ""))
+    print(f"Energy in:          {result['energy_in'][-1]:10.1f} J")
+    print(f"Energy out (load):  {result['energy_out'][-1]:10.1f} J")
+    print(f"Energy lost (drag): {result['energy_lost'][-1]:10.1f} J")
+    print(f"Recorded samples:   {len(result['t']):10,d}")
+
+
+if __name__ == "__main__":
+    import time
+
+    print(f"Equilibrium speed, no load: {equilibrium_rpm():.0f} RPM "
+          f"(Q = {Q_FACTOR}, {COIL_EFFICIENCY:.0%} pulse efficiency)")
+
+    start = time.perf_counter()
+    result = simulate_rotor(duration=3600.0, q_factor=10000)
+    elapsed = time.perf_counter() - start
+    print_dynamics_summary(result)
+    print(f"\n1 hour at Q = 10000 simulated in {elapsed:.2f} s")
+
+    result = simulate_rotor(duration=3600.0, initial_rpm=0.0, q_factor=CLUTCH_DEMO_Q)
+    print_dynamics_summary(result)
+    print(f"\nSpin-up from rest at Q = {CLUTCH_DEMO_Q}: clutch band "
+          f"{CLUTCH_DISENGAGE_RPM:.0f}-{CLUTCH_ENGAGE_RPM:.0f} RPM")
+
+    result = simulate_rotor(duration=3600.0, drive_time=0.0)
+    print_dynamics_summary(result)
+    print(f"\nCoast-down from {RPM} RPM at Q = {Q_FACTOR}")
@@ -0,0 +1,119 @@
+"""
+Rotor Geometry for Golden Ratio Motor
+Magnet layouts, Fibonacci spirals and the rotor/stator gap, computed once
+and shared by the visualization, template and simulation tools
+
+Every function is memoized with a bounded LRU cache and returns read-only
+arrays, so callers can share the cached result without copying and a sweep
+over thousands of layouts never recomputes the same one.
+"""
+
+import math
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from coil_design import PHI, GOLDEN_ANGLE, N_MAGNETS
+
+GOLDEN_ANGLE_EXACT = 360 * (1 - 1 / PHI)  # 137.5077...°, GOLDEN_ANGLE is the rounded value
+GEOMETRY_CACHE_SIZE = 1024  # layouts / curves kept per function
+
+
+class MagnetLayout(NamedTuple):
+    angles: np.ndarray  # degrees in [0, 360), placement order
+    radians: np.ndarray
+    x: np.ndarray  # centre at the given radius (or radii)
+    y: np.ndarray
+    polarity: np.ndarray  # +1 north out, -1 south out (alternating)
+    order: np.ndarray  # magnet indices sorted by angle
+    gaps: np.ndarray  # degrees from each magnet in ``order`` to the next
+
+
+def _frozen(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def magnet_layout(n_magnets=N_MAGNETS, radius=1.0, golden_angle=GOLDEN_ANGLE):
+    """
+    Magnets placed at k × golden angle, k = 0 … n_magnets-1.
+
+    Pass ``GOLDEN_ANGLE_EXACT`` for the irrational angle instead of the
+    rounded 137.5° every tool has used so far.
+    """
+    return layout_from_angles(np.arange(n_magnets) * golden_angle, radius)
+
+
+def layout_from_angles(angles, radius=1.0, polarity=None):
+    """
+    Layout for explicit magnet angles (degrees), e.g. an optimized one.
+
+    Not cached, since arrays are not hashable; ``radius`` may be one value
+    or one per magnet, and polarity alternates N-S unless given.
+    """
+    angles = np.asarray(angles, dtype=float) % 360
+    radians = np.radians(angles)
+    x = radius * np.cos(radians)
+    y = radius * np.sin(radians)
+    if polarity is None:
+        polarity = np.where(np.arange(angles.size) % 2 == 0, 1, -1)
+    polarity = np.array(polarity, dtype=int)
+    order = np.argsort(angles, kind='stable')
+    sorted_angles = angles[order]
+    gaps = np.diff(sorted_angles, append=sorted_angles[0] + 360)
+    return MagnetLayout(*_frozen(angles, radians, x, y, polarity, order, gaps))
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def phyllotaxis_layout(n_magnets, spacing=1.0, inner_radius=0.0, golden_angle=GOLDEN_ANGLE_EXACT):
+    """
+    Sunflower (Vogel) layout filling a disc: magnet k at k × golden angle
+    and radius sqrt(inner_radius² + spacing²·k), so every magnet gets the
+    same area π·spacing².
+
+    Defaults to the exact golden angle; the rounded 137.5° lines magnets
+    up in radial spokes once there are more than a few hundred.
+    """
+    k = np.arange(n_magnets)
+    return layout_from_angles(k * golden_angle, np.sqrt(inner_radius ** 2 + spacing ** 2 * k))
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def ring_layout(counts=(8, 13, 21), radii=(0.5, 0.75, 1.0), golden_angle=GOLDEN_ANGLE):
+    """Concentric rings, ring i holding counts[i] magnets at k × golden angle on radii[i]"""
+    angles = np.concatenate([np.arange(n) * golden_angle for n in counts])
+    return layout_from_angles(angles, np.repeat(radii, counts))
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def fibonacci_spiral(n_points=100, rotations=3, scale=1.0):
+    """Points (x, y, theta, r) along a Fibonacci/Golden spiral"""
+    theta = np.linspace(0, rotations * 2 * np.pi, n_points)
+    r = scale * np.exp(theta / (2 * np.pi / math.log(PHI)))
+    x = r * np.cos(theta)
+    y = r * np.sin(theta)
+    return _frozen(x, y, theta, r)
+
+
+@lru_cache(maxsize=GEOMETRY_CACHE_SIZE)
+def spiral_gap(n_points=200, rotations=2.5, rotor_scale=1.0, stator_scale=1.05):
+    """Rotor/stator spiral gap against rotation angle: (angles in degrees, gap)"""
+    _, _, theta, r_rotor = fibonacci_spiral(n_points, rotations, rotor_scale)
+    _, _, _, r_stator = fibonacci_spiral(n_points, rotations, stator_scale)
+    return _frozen(np.degrees(theta), np.abs(r_stator - r_rotor))
+
+
+_CACHED = (magnet_layout, phyllotaxis_layout, ring_layout, fibonacci_spiral, spiral_gap)
+
+
+def cache_info():
+    """Hit/miss statistics of each geometry cache"""
+    return {f.__name__: f.cache_info() for f in _CACHED}
+
+
+def clear_cache():
+    for f in _CACHED:
+        f.cache_clear()
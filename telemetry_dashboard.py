@@ -0,0 +1,500 @@
+"""
+Live Bench Dashboard for Golden Ratio Motor
+Real-time view of coil current waveforms, peak/average current trends and
+energy per pulse while the test bench runs, in the plot styles of the
+electrical_specs.py current-rise and pulse-timing panels
+
+Data comes from a pluggable source: any object whose ``read()`` returns
+the pulses that arrived since the last call as a dict of arrays,
+  't'          (pulses,)           pulse time in s
+  'peak', 'average'                current in A
+  'energy_mj'                      energy per pulse
+  'current'    (pulses, samples)   waveforms in A (optional)
+  'sample_t'   (samples,)          waveform sample times in s
+  'n_samples'  (pulses,)           valid samples per waveform
+or None when nothing is new. ``TelemetrySource`` follows the serial
+reports of test_bench.ino (live port or a ReplaySource), ``CaptureSource``
+plays raw waveforms from a CaptureStore and ``SyntheticSource`` generates
+bench-like pulses.
+
+Only the moving artists are redrawn each frame (blitting). The session
+trends go through min/max envelope buffers that halve their resolution
+when full, so hours of pulses are drawn from a few thousand points and
+memory stays fixed.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from bench_telemetry import PULSE_DELAY_MS, TelemetryIngester
+from capture_store import SAMPLE_INTERVAL_US, counts_to_current, synthetic_pulses
+from coil_design import CoilDesign
+from electrical_specs import (BUDGET_STYLE, FILL_ALPHA, PULSE_STYLE, RISE_STYLE,
+                              TARGET_STYLE, _fill_verts)
+from pulse_fit import BENCH_VOLTAGE
+
+ENVELOPE_BINS = 1024  # bins per trend buffer (even), about a panel's width in pixels
+PERSISTENCE = 200  # recent waveforms in the min/max waveform envelope
+MAX_PULSES_PER_FRAME = 20_000
+RATE_WINDOW = 60  # frames the ingest rate is averaged over
+SOURCE_QUEUE = 100_000  # pulses a live source holds between frames
+
+
+class EnvelopeBuffer:
+    """
+    Min/max envelope of a growing series in fixed memory.
+
+    Points are binned ``per_bin`` at a time; when all ``capacity`` bins
+    are used, neighbouring bins merge and ``per_bin`` doubles, so the
+    whole series stays visible at a resolution that coarsens with length.
+    """
+
+    def __init__(self, capacity=ENVELOPE_BINS):
+        self.capacity = capacity + capacity % 2
+        self.x_first = np.empty(self.capacity)
+        self.x_last = np.empty(self.capacity)
+        self.lo = np.empty(self.capacity)
+        self.hi = np.empty(self.capacity)
+        self.size = 0
+        self.per_bin = 1
+        self.fill = 0  # points in the last bin
+        self.count = 0
+
+    def extend(self, x, y):
+        """Append points (x increasing)"""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.count += len(x)
+        while len(x):
+            if self.size and self.fill < self.per_bin:
+                # Top up the open last bin
+                take = min(self.per_bin - self.fill, len(x))
+                j = self.size - 1
+                self.lo[j] = min(self.lo[j], y[:take].min())
+                self.hi[j] = max(self.hi[j], y[:take].max())
+                self.x_last[j] = x[take - 1]
+                self.fill += take
+            elif self.size == self.capacity:
+                self._halve()
+                continue
+            else:
+                n_bins = min(self.capacity - self.size, -(-len(x) // self.per_bin))
+                take = min(len(x), n_bins * self.per_bin)
+                starts = np.arange(0, take, self.per_bin)
+                new = slice(self.size, self.size + len(starts))
+                self.x_first[new] = x[starts]
+                self.x_last[new] = x[np.minimum(starts + self.per_bin, take) - 1]
+                self.lo[new] = np.minimum.reduceat(y[:take], starts)
+                self.hi[new] = np.maximum.reduceat(y[:take], starts)
+                self.size += len(starts)
+                self.fill = take - starts[-1]
+            x, y = x[take:], y[take:]
+
+    def _halve(self):
+        pairs = self.size // 2
+        a, b = slice(0, 2 * pairs, 2), slice(1, 2 * pairs, 2)
+        self.x_first[:pairs] = self.x_first[a]
+        self.x_last[:pairs] = self.x_last[b]
+        self.lo[:pairs] = np.minimum(self.lo[a], self.lo[b])
+        self.hi[:pairs] = np.maximum(self.hi[a], self.hi[b])
+        self.fill += self.per_bin
+        self.per_bin *= 2
+        self.size = pairs
+
+    def envelope(self):
+        """(x, y) zig-zag through every bin's min and max, drawn as one line"""
+        n = self.size
+        x = np.empty(2 * n)
+        y = np.empty(2 * n)
+        x[0::2], x[1::2] = self.x_first[:n], self.x_last[:n]
+        y[0::2], y[1::2] = self.lo[:n], self.hi[:n]
+        return x, y
+
+    def band(self):
+        """Polygon vertices of the area between each bin's max and zero"""
+        if not self.size:
+            return np.zeros((0, 2))
+        x, y = self.envelope()
+        return _fill_verts(x, np.repeat(self.hi[:self.size], 2))
+
+
+def _concat(batches):
+    """Merge a list of source dicts with the same keys"""
+    if not batches:
+        return None
+    if len(batches) == 1:
+        return batches[0]
+    return {key: (np.concatenate([b[key] for b in batches]) if key != 'sample_t'
+                  else batches[0][key]) for key in batches[0]}
+
+
+class SyntheticSource:
+    """
+    Bench-like RL pulses at ``pulse_rate`` per second of wall time (times
+    ``speed``), with the coil slowly warming up; for demos and benchmarks.
+    ``speed=None`` hands out ``batch`` pulses per read regardless of time.
+    """
+
+    def __init__(self, pulse_rate=2000, n_samples=60, speed=1.0, batch=4000, seed=0):
+        self.pulse_rate = pulse_rate
+        self.n_samples = n_samples
+        self.speed = speed
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
+        self.sample_t = np.arange(n_samples) * SAMPLE_INTERVAL_US * 1e-6
+        self.emitted = 0
+        self.start = time.perf_counter()
+
+    def read(self):
+        if self.speed is None:
+            n = self.batch
+        else:
+            due = int((time.perf_counter() - self.start) * self.speed * self.pulse_rate)
+            n = min(due - self.emitted, MAX_PULSES_PER_FRAME)
+        if n <= 0:
+            return None
+        t = (self.emitted + np.arange(n)) / self.pulse_rate
+        warming = 1 + 0.1 * (1 - np.exp(-t / 1800))  # +10% R over the first hours
+        counts = synthetic_pulses(n, self.n_samples, resistance=4.8,
+                                  seed=int(self.rng.integers(2 ** 32)))
+        current = counts_to_current(counts) / warming[:, None]
+        self.emitted += n
+        return _pulse_batch(t, current, self.sample_t, np.full(n, self.n_samples))
+
+
+def _pulse_batch(t, current, sample_t, n_samples, voltage=BENCH_VOLTAGE):
+    """Source dict of raw waveforms, with the firmware's peak/average/energy"""
+    valid = np.arange(current.shape[1]) < n_samples[:, None]
+    average = np.where(valid, current, 0).sum(axis=1) / np.maximum(n_samples, 1)
+    width_ms = n_samples * SAMPLE_INTERVAL_US / 1000
+    return {
+        't': t,
+        'peak': np.where(valid, current, 0).max(axis=1),
+        'average': average,
+        'energy_mj': voltage * average * width_ms,
+        'current': current,
+        'sample_t': sample_t,
+        'n_samples': n_samples,
+    }
+
+
+class CaptureSource:
+    """
+    Raw waveforms from a CaptureStore (optionally one session / coil),
+    played at ``pulse_rate`` per second or, with ``pulse_rate=None``,
+    ``batch`` pulses per read.
+    """
+
+    def __init__(self, store, pulse_rate=None, batch=4000, voltage=BENCH_VOLTAGE, **select):
+        self.runs = store.select(**select) if select else list(store.chunks())
+        self.pulse_rate = pulse_rate
+        self.batch = batch
+        self.voltage = voltage
+        self.run = self.row = 0
+        self.t0 = None
+        self.emitted = 0
+        self.start = time.perf_counter()
+
+    def read(self):
+        if self.pulse_rate is None:
+            wanted = self.batch
+        else:
+            due = int((time.perf_counter() - self.start) * self.pulse_rate)
+            wanted = min(due - self.emitted, MAX_PULSES_PER_FRAME)
+        batches = []
+        while wanted > 0 and self.run < len(self.runs):
+            run = self.runs[self.run]
+            part = {name: column[self.row:self.row + wanted] for name, column in run.items()}
+            n = len(part['pulse'])
+            if part['start_us'].any():
+                if self.t0 is None:
+                    self.t0 = int(part['start_us'][0])
+                t = (part['start_us'] - self.t0) * 1e-6
+            else:
+                # No start times recorded: pulse numbers at the firmware's cadence
+                t = part['pulse'] * (PULSE_DELAY_MS / 1000)
+            batches.append(_pulse_batch(
+                t, counts_to_current(part['counts']),
+                part['t_us'][0] * 1e-6, part['n_samples'].astype(int), self.voltage))
+            self.row += n
+            wanted -= n
+            self.emitted += n
+            if self.row >= len(run['pulse']):
+                self.run, self.row = self.run + 1, 0
+        return _concat(batches)
+
+
+class TelemetrySource:
+    """
+    Pulse reports of test_bench.ino from a serial port (or a ReplaySource
+    pty), ingested by bench_telemetry on a background thread. The firmware
+    reports no waveforms, so only the trends are fed.
+    """
+
+    def __init__(self, port, **ingester_args):
+        self.pending = deque(maxlen=SOURCE_QUEUE)
+        self.ingester = TelemetryIngester(on_record=self.pending.append, **ingester_args)
+        self.t0 = None
+        self.thread = threading.Thread(
+            target=lambda: asyncio.run(self.ingester.run_port(port)), daemon=True)
+        self.thread.start()
+
+    def read(self):
+        records = []
+        while self.pending:
+            records.append(self.pending.popleft())
+        if not records:
+            return None
+        if self.t0 is None:
+            self.t0 = records[0].received
+        return {
+            't': np.array([r.received - self.t0 for r in records]),
+            'peak': np.array([r.peak_current for r in records]),
+            'average': np.array([r.average_current for r in records]),
+            'energy_mj': np.array([r.energy_mj for r in records]),
+        }
+
+
+class TelemetryDashboard:
+    """
+    Three-panel live bench view built once and updated by blitting.
+
+    Parameters
+    ----------
+    source : object
+        Data source with a ``read()`` method (see the module docstring)
+    design : CoilDesign, optional
+        Sets the 90% current line and the rise budget of the waveform
+        panel; the bench design (24V) by default
+    headless : bool
+        Draw on an Agg canvas without pyplot (benchmarks, tests)
+    """
+
+    def __init__(self, source, design=None, headless=False, envelope_bins=ENVELOPE_BINS,
+                 persistence=PERSISTENCE):
+        if headless:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=(14, 9))
+            FigureCanvasAgg(fig)
+        else:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(14, 9))
+        if design is None:
+            design = CoilDesign(voltage=BENCH_VOLTAGE)
+        self.fig = fig
+        self.source = source
+        fig.suptitle('Test Bench Telemetry', fontsize=16, fontweight='bold')
+        grid = fig.add_gridspec(2, 2)
+
+        # Waveforms: latest pulse over the envelope of the recent ones
+        ax = self.ax_wave = fig.add_subplot(grid[:, 0])
+        self.wave_fill = ax.fill_between([0, 1], 0, [0, 0], alpha=FILL_ALPHA,
+                                         label=f'Last {persistence} pulses (min/max)')
+        self.wave_line, = ax.plot([], [], **RISE_STYLE, label='Latest pulse')
+        ax.axhline(design.current * 0.9, **TARGET_STYLE, label='90% Current')
+        ax.axvline(design.rise_time_budget, **BUDGET_STYLE,
+                   label=f'Rise Budget ({design.rise_time_budget:.2f}ms)')
+        ax.set_xlabel('Time (ms)')
+        ax.set_ylabel('Current (A)')
+        ax.set_title('Coil Current Waveforms')
+        ax.set_xlim(0, 0.65)
+        ax.set_ylim(0, design.current * 1.4)
+        ax.legend(loc='lower right')
+        ax.grid(True, alpha=0.3)
+
+        # Peak / average current over the session
+        ax = self.ax_current = fig.add_subplot(grid[0, 1])
+        self.peak_line, = ax.plot([], [], **RISE_STYLE, label='Peak')
+        self.average_line, = ax.plot([], [], color='steelblue', linewidth=1, label='Average')
+        ax.axhline(design.current * 0.9, **TARGET_STYLE)
+        ax.set_ylabel('Current (A)')
+        ax.set_title('Peak / Average Current')
+        ax.set_xlim(0, 60)
+        ax.set_ylim(0, design.current * 1.4)
+        ax.legend(loc='lower right')
+        ax.grid(True, alpha=0.3)
+
+        # Energy per pulse, in the pulse-timing style
+        ax = self.ax_energy = fig.add_subplot(grid[1, 1], sharex=self.ax_current)
+        self.energy_line, = ax.plot([], [], **PULSE_STYLE)
+        self.energy_fill = ax.fill_between([0, 1], 0, [0, 0], alpha=FILL_ALPHA,
+                                           color=PULSE_STYLE['color'])
+        ax.set_xlabel('Session time (s)')
+        ax.set_ylabel('Energy (mJ)')
+        ax.set_title('Energy per Pulse')
+        ax.set_ylim(0, 100)
+        ax.grid(True, alpha=0.3)
+
+        self.readout = self.ax_wave.text(
+            0.02, 0.98, '', transform=self.ax_wave.transAxes, va='top', family='monospace',
+            fontsize=9, bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+        fig.tight_layout()
+
+        self.trends = {key: EnvelopeBuffer(envelope_bins)
+                       for key in ('peak', 'average', 'energy_mj')}
+        self.waves = None  # (persistence, samples) ring of recent waveforms
+        self.persistence = persistence
+        self.wave_row = 0
+        self.n_pulses = self.n_samples = 0
+        self.t_last = 0.0
+        self.history = deque(maxlen=RATE_WINDOW)  # (wall time, samples seen)
+        self.needs_redraw = True  # axis limits changed: full draw instead of blit
+        self.artists = [self.wave_fill, self.wave_line, self.peak_line, self.average_line,
+                        self.energy_line, self.energy_fill, self.readout]
+        for artist in self.artists:
+            artist.set_animated(True)
+
+    def ingest(self, batch):
+        """Fold a source batch into the trend buffers and waveform ring"""
+        self.n_pulses += len(batch['t'])
+        self.t_last = float(batch['t'][-1])
+        for key, buffer in self.trends.items():
+            buffer.extend(batch['t'], batch[key])
+        current = batch.get('current')
+        if current is None:
+            return
+        self.n_samples += int(np.sum(batch['n_samples']))
+        recent = current[-self.persistence:]
+        if self.waves is None or self.waves.shape[1] != current.shape[1]:
+            self.waves = np.full((self.persistence, current.shape[1]), np.nan)
+            self.sample_ms = batch['sample_t'] * 1000
+            self.wave_row = 0
+        rows = (self.wave_row + np.arange(len(recent))) % self.persistence
+        self.waves[rows] = recent
+        self.wave_row = (rows[-1] + 1) % self.persistence
+        self.latest = recent[-1, :int(batch['n_samples'][-1])].copy()  # let the batch go
+
+    def _rescale(self):
+        """Grow the session time axis and current limits in steps, flagging a full redraw"""
+        x_max = self.ax_current.get_xlim()[1]
+        if self.t_last > x_max:
+            while x_max < self.t_last:
+                x_max *= 2
+            self.ax_current.set_xlim(0, x_max)
+            self.needs_redraw = True
+        for ax, buffer in ((self.ax_current, self.trends['peak']),
+                           (self.ax_energy, self.trends['energy_mj'])):
+            top = buffer.hi[:buffer.size].max() if buffer.size else 0
+            if top > ax.get_ylim()[1]:
+                ax.set_ylim(0, top * 1.25)
+                self.needs_redraw = True
+
+    def update(self, frame=None):
+        """Pull new data from the source and refresh every animated artist"""
+        batch = self.source.read()
+        if batch is not None and len(batch['t']):
+            self.ingest(batch)
+            self._rescale()
+
+        if self.waves is not None:
+            lo = np.nanmin(self.waves, axis=0)
+            hi = np.nanmax(self.waves, axis=0)
+            self.wave_fill.set_verts([np.concatenate([np.column_stack([self.sample_ms, hi]),
+                                                      np.column_stack([self.sample_ms, lo])[::-1]])])
+            self.wave_line.set_data(self.sample_ms[:len(self.latest)], self.latest)
+        self.peak_line.set_data(*self.trends['peak'].envelope())
+        self.average_line.set_data(*self.trends['average'].envelope())
+        self.energy_line.set_data(*self.trends['energy_mj'].envelope())
+        self.energy_fill.set_verts([self.trends['energy_mj'].band()])
+
+        now = time.perf_counter()
+        self.history.append((now, self.n_samples, self.n_pulses))
+        (t0, s0, p0), (t1, s1, p1) = self.history[0], self.history[-1]
+        span = t1 - t0
+        fps = (len(self.history) - 1) / span if span > 0 else 0.0
+        self.readout.set_text(
+            f"{self.n_pulses:,} pulses  {self.t_last:,.0f} s\n"
+            f"{(s1 - s0) / span if span > 0 else 0:,.0f} samples/s  "
+            f"{(p1 - p0) / span if span > 0 else 0:,.0f} pulses/s\n"
+            f"{fps:.0f} fps  {self.trends['peak'].size:,} trend bins "
+            f"(x{self.trends['peak'].per_bin})")
+        return self.artists
+
+    def draw_frame(self):
+        """
+        Headless frame: full draw when the axes changed, otherwise restore
+        the cached background and draw only the animated artists.
+        """
+        artists = self.update()
+        canvas = self.fig.canvas
+        if self.needs_redraw:
+            canvas.draw()
+            self.background = canvas.copy_from_bbox(self.fig.bbox)
+            self.needs_redraw = False
+        canvas.restore_region(self.background)
+        for artist in artists:
+            self.fig.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+
+    def animate(self, interval=33):
+        """Live blitted animation (keep a reference to the returned object)"""
+        from matplotlib.animation import FuncAnimation
+
+        def frame(i):
+            artists = self.update(i)
+            if self.needs_redraw:
+                self.needs_redraw = False
+                self.fig.canvas.draw_idle()  # new limits: rebuild the blit background
+            return artists
+
+        return FuncAnimation(self.fig, frame, interval=interval, blit=True,
+                             cache_frame_data=False)
+
+
+def run_dashboard(source, design=None):
+    """Open the live dashboard window on ``source`` and block until it is closed"""
+    import matplotlib.pyplot as plt
+
+    dashboard = TelemetryDashboard(source, design)
+    anim = dashboard.animate()
+    plt.show()
+    return anim
+
+
+if __name__ == "__main__":
+    import sys
+    import tracemalloc
+
+    if len(sys.argv) > 1:
+        # A serial port (e.g. /dev/ttyUSB0) or a CaptureStore directory
+        import os
+        from capture_store import CaptureStore
+
+        target = sys.argv[1]
+        if os.path.isdir(target):
+            run_dashboard(CaptureSource(CaptureStore(target), pulse_rate=2000))
+        else:
+            run_dashboard(TelemetrySource(target))
+        sys.exit()
+
+    # Headless benchmark: 2,000 pulses (120k samples) per frame
+    source = SyntheticSource(pulse_rate=2000, speed=None, batch=2000)
+    dashboard = TelemetryDashboard(source, headless=True)
+    n_frames = 300
+    start = time.perf_counter()
+    for i in range(n_frames):
+        dashboard.draw_frame()
+    elapsed = time.perf_counter() - start
+    print(f"{n_frames} frames, {dashboard.n_pulses:,} pulses in {elapsed:.1f} s: "
+          f"{n_frames / elapsed:.1f} fps, {dashboard.n_samples / elapsed:,.0f} samples/s")
+
+    # Eight hours of trend data at 2 kHz, an hour at a time
+    tracemalloc.start()
+    rng = np.random.default_rng(1)
+    per_hour = 2000 * 3600
+    for hour in range(8):
+        t = dashboard.t_last + (np.arange(per_hour) + 1) / 2000
+        peak = 4.9 + 0.05 * rng.standard_normal(per_hour)
+        dashboard.ingest({'t': t, 'peak': peak, 'average': 0.7 * peak,
+                          'energy_mj': 0.06 * peak})
+        del t, peak
+        dashboard._rescale()
+        dashboard.draw_frame()
+        current = tracemalloc.get_traced_memory()[0]
+        print(f"  {hour + 1} h, {dashboard.n_pulses:>11,} pulses: {current / 1e6:5.1f} MB traced, "
+              f"{dashboard.trends['peak'].size} bins of {dashboard.trends['peak'].per_bin:,} pulses")
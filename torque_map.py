@@ -0,0 +1,255 @@
+"""
+Torque Lookup Table for Golden Ratio Motor
+Rotor torque as a function of rotor angle and coil current, computed once
+from the magnet layout, cached on disk and interpolated in simulation loops
+
+Model (one stator coil at angle 0, core pointing at the rotor centre):
+  - every rotor magnet is a radial point dipole, poles alternating N-S
+  - the energised core is a radial dipole whose flux saturates as
+    B = B_sat · tanh(μ₀μᵣNI / (l·B_sat))
+  - the unpowered core is pulled towards each magnet (cogging), with energy
+    -χ·V·|B_magnet|² / 2μ₀ at the core tip
+Torque is -dU/dθ of the total interaction energy. Coils at other angles
+use the same table shifted by their angle (see ``TorqueMap.total``).
+"""
+
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from coil_design import GOLDEN_ANGLE, N_MAGNETS, MU_0, TARGET_CURRENT, CoilDesign
+from rotor_geometry import magnet_layout
+
+MAGNET_RADIUS_MM = 85  # magnet circle on the rotor plate
+MAGNET_SIZE_MM = (25, 10, 5)  # N52 block, magnetised through the 5 mm thickness
+MAGNET_REMANENCE = 1.43  # T (N52)
+AIR_GAP_MM = 4  # core tip to magnet face (3-5 mm in the build guide)
+CORE_SATURATION = 0.4  # T (MnZn ferrite)
+CORE_SUSCEPTIBILITY = 3.0  # effective χ of an open rod core (shape-limited)
+
+N_ANGLES = 3600  # 0.1° steps over one rotation
+N_CURRENTS = 101
+MAX_CURRENT = 2 * TARGET_CURRENT  # A
+CACHE_DIR = os.environ.get(
+    'TORQUE_MAP_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+TABLE_VERSION = 1  # bump when the model changes so old tables are not reused
+
+
+def _dipole_field(moment, offset, softening):
+    """Field (T) of dipoles with ``moment`` at ``offset`` from the source, vectors on axis -1"""
+    r2 = np.sum(offset ** 2, axis=-1, keepdims=True) + softening ** 2
+    r_hat = offset / np.sqrt(r2)
+    m_r = np.sum(moment * r_hat, axis=-1, keepdims=True)
+    return MU_0 / (4 * np.pi) * (3 * m_r * r_hat - moment) / r2 ** 1.5
+
+
+def default_geometry(design=None, **overrides):
+    """Geometry and grid parameters that define one torque table"""
+    if design is None:
+        design = CoilDesign()
+    geometry = {
+        'magnet_radius_mm': MAGNET_RADIUS_MM,
+        'golden_angle': GOLDEN_ANGLE,
+        'n_magnets': N_MAGNETS,
+        'magnet_size_mm': list(MAGNET_SIZE_MM),
+        'remanence': MAGNET_REMANENCE,
+        'air_gap_mm': AIR_GAP_MM,
+        'core_area_cm2': design.core_area_cm2,
+        'core_length_cm': design.core_length_cm,
+        'mu_r': design.mu_r,
+        'n_turns': max(math.floor(design.N_turns), 1),
+        'core_saturation': CORE_SATURATION,
+        'core_susceptibility': CORE_SUSCEPTIBILITY,
+        'n_angles': N_ANGLES,
+        'n_currents': N_CURRENTS,
+        'max_current': MAX_CURRENT,
+    }
+    unknown = set(overrides) - set(geometry)
+    if unknown:
+        raise TypeError(f"unknown geometry parameters: {sorted(unknown)}")
+    geometry.update(overrides)
+    if 'magnet_size_mm' in overrides:
+        geometry['magnet_size_mm'] = list(overrides['magnet_size_mm'])
+    return geometry
+
+
+def geometry_key(geometry):
+    """Stable hash naming the cached table for ``geometry``"""
+    payload = json.dumps({'version': TABLE_VERSION, **geometry}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def coil_moment(current, geometry):
+    """Magnetic moment (A·m²) of the energised core, with saturation"""
+    length = geometry['core_length_cm'] * 1e-2
+    volume = geometry['core_area_cm2'] * 1e-4 * length
+    b_sat = geometry['core_saturation']
+    b_linear = MU_0 * geometry['mu_r'] * geometry['n_turns'] * np.asarray(current) / length
+    return b_sat * np.tanh(b_linear / b_sat) * volume / MU_0
+
+
+def magnet_energy(theta, geometry, magnet_angles=None, polarity=None):
+    """
+    Interaction energy terms at rotor angles ``theta`` (rad).
+
+    Returns ``(per_moment, cogging)``: the coil-magnet energy per A·m² of
+    coil moment and the current-independent core-magnet energy, both J.
+    ``magnet_angles`` (rad) and ``polarity`` default to the golden-angle
+    layout with alternating poles; a single magnet gives its own profile.
+    """
+    if magnet_angles is None:
+        layout = magnet_layout(geometry['n_magnets'], golden_angle=geometry['golden_angle'])
+        magnet_angles = layout.radians
+        polarity = layout.polarity if polarity is None else polarity
+    magnet_angles = np.asarray(magnet_angles, dtype=float)
+    if polarity is None:
+        polarity = np.where(np.arange(magnet_angles.size) % 2 == 0, 1.0, -1.0)
+
+    length_mm, width_mm, thickness_mm = geometry['magnet_size_mm']
+    volume = length_mm * width_mm * thickness_mm * 1e-9
+    m_magnet = geometry['remanence'] * volume / MU_0
+    softening = 0.5 * max(length_mm, width_mm) * 1e-3  # finite magnet size
+
+    r_magnet = geometry['magnet_radius_mm'] * 1e-3
+    r_tip = r_magnet + (thickness_mm / 2 + geometry['air_gap_mm']) * 1e-3
+    r_coil = r_tip + geometry['core_length_cm'] * 1e-2 / 2
+
+    # (angles, magnets, xy)
+    phi = np.asarray(theta, dtype=float)[..., None] + magnet_angles
+    radial = np.stack([np.cos(phi), np.sin(phi)], axis=-1)
+    moments = m_magnet * polarity[:, None] * radial
+    positions = r_magnet * radial
+
+    unit_coil = np.array([1.0, 0.0])
+    field_at_coil = _dipole_field(moments, np.array([r_coil, 0.0]) - positions, softening)
+    per_moment = -np.sum(field_at_coil @ unit_coil, axis=-1)
+
+    field_at_tip = _dipole_field(moments, np.array([r_tip, 0.0]) - positions, softening)
+    b_tip = field_at_tip.sum(axis=-2)
+    core_volume = geometry['core_area_cm2'] * 1e-4 * geometry['core_length_cm'] * 1e-2
+    cogging = -geometry['core_susceptibility'] * core_volume * np.sum(b_tip ** 2, axis=-1) / (2 * MU_0)
+    return per_moment, cogging
+
+
+def torque_profile(theta, geometry, magnet_angles=None, polarity=None, step=1e-5):
+    """
+    Torque terms (N·m) at rotor angles ``theta``: ``(per_moment, cogging)``.
+
+    Central differences of ``magnet_energy``; total torque at a current I
+    is ``per_moment * coil_moment(I) + cogging``.
+    """
+    theta = np.asarray(theta, dtype=float)
+    plus = magnet_energy(theta + step, geometry, magnet_angles, polarity)
+    minus = magnet_energy(theta - step, geometry, magnet_angles, polarity)
+    return tuple(-(p - m) / (2 * step) for p, m in zip(plus, minus))
+
+
+def single_magnet_profile(geometry=None, n_angles=None):
+    """
+    Torque profile of one magnet passing one coil.
+
+    Returns ``(angles, per_moment, cogging)`` over a full rotation, the
+    building block layouts other than the golden-angle array are scored from.
+    """
+    if geometry is None:
+        geometry = default_geometry()
+    n_angles = n_angles or geometry['n_angles']
+    angles = np.arange(n_angles) * (2 * np.pi / n_angles)
+    return (angles,) + torque_profile(angles, geometry, magnet_angles=[0.0], polarity=np.ones(1))
+
+
+def compute_table(geometry):
+    """Dense (n_angles, n_currents) torque table in N·m"""
+    angles = np.arange(geometry['n_angles']) * (2 * np.pi / geometry['n_angles'])
+    currents = np.linspace(0, geometry['max_current'], geometry['n_currents'])
+    per_moment, cogging = torque_profile(angles, geometry)
+    return per_moment[:, None] * coil_moment(currents, geometry) + cogging[:, None]
+
+
+def load_table(geometry, cache_dir=CACHE_DIR):
+    """
+    Memory-mapped torque table for ``geometry``, computed on first use.
+
+    Tables are written to a temporary file and renamed into place, so
+    processes building the same table at once never see a partial file and
+    all of them end up sharing one read-only mapping.
+    """
+    path = os.path.join(cache_dir, f"torque_{geometry_key(geometry)}.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        table = compute_table(geometry)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode='r')
+
+
+class TorqueMap:
+    """
+    Bilinear torque lookup over rotor angle (periodic) and coil current.
+
+    Parameters
+    ----------
+    geometry : dict, optional
+        From ``default_geometry``; the 48V design and build-guide rotor
+        by default
+    cache_dir : str
+        Directory holding the cached tables
+    """
+
+    def __init__(self, geometry=None, cache_dir=CACHE_DIR):
+        self.geometry = geometry if geometry is not None else default_geometry()
+        self.table = load_table(self.geometry, cache_dir)
+        self.n_angles, self.n_currents = self.table.shape
+        self.angle_step = 2 * np.pi / self.n_angles
+        self.current_step = self.geometry['max_current'] / (self.n_currents - 1)
+        self.coil_angles = magnet_layout(self.geometry['n_magnets'],
+                                         golden_angle=self.geometry['golden_angle']).radians
+
+    def __call__(self, theta, current):
+        """Torque (N·m) from one coil at angle 0; inputs broadcast together"""
+        u = np.mod(theta, 2 * np.pi) / self.angle_step
+        i0 = np.floor(u).astype(np.intp)
+        fu = u - i0
+        i0 = i0 % self.n_angles
+        i1 = np.where(i0 + 1 == self.n_angles, 0, i0 + 1)
+
+        v = np.clip(np.asarray(current, dtype=float) / self.current_step, 0, self.n_currents - 1)
+        j0 = np.minimum(v.astype(np.intp), self.n_currents - 2)
+        fv = v - j0
+
+        t = self.table
+        return ((t[i0, j0] * (1 - fv) + t[i0, j0 + 1] * fv) * (1 - fu)
+                + (t[i1, j0] * (1 - fv) + t[i1, j0 + 1] * fv) * fu)
+
+    def total(self, theta, currents):
+        """
+        Torque from every stator coil, coil k sitting at k × golden angle.
+
+        ``currents`` has the coils on its last axis; ``theta`` broadcasts
+        against the remaining axes.
+        """
+        theta = np.asarray(theta, dtype=float)[..., None] - self.coil_angles
+        return self(theta, currents).sum(axis=-1)
+
+
+if __name__ == "__main__":
+    import time
+
+    geometry = default_geometry()
+    start = time.perf_counter()
+    torque = TorqueMap(geometry)
+    elapsed = time.perf_counter() - start
+    print(f"Torque table {torque.table.shape} ({geometry_key(geometry)}) ready in {elapsed:.3f} s")
+
+    theta = np.random.default_rng(0).uniform(0, 2 * np.pi, 10**6)
+    start = time.perf_counter()
+    values = torque(theta, TARGET_CURRENT)
+    elapsed = time.perf_counter() - start
+    print(f"10^6 lookups in {elapsed*1000:.1f} ms")
+    print(f"Peak torque per coil at {TARGET_CURRENT} A: {np.abs(values).max():.3f} N·m, "
+          f"peak cogging: {np.abs(torque.table[:, 0]).max():.3f} N·m")
@@ -3,45 +3,78 @@ Golden Ratio Motor Visualization
 Demonstrates the "chasing" spiral concept with magnetic field interactions
 """
 
+from collections import deque
+from time import perf_counter
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+from matplotlib.collections import EllipseCollection, LineCollection
 from matplotlib.patches import Circle
 import matplotlib.patches as mpatches
 
-# Golden Ratio
-PHI = (1 + np.sqrt(5)) / 2
-GOLDEN_ANGLE = 137.5  # degrees
+from coil_design import PHI, GOLDEN_ANGLE
+from instrumentation import count, span, traced
+from rotor_geometry import fibonacci_spiral, magnet_layout, spiral_gap
+
+# Animation
+FRAMES_PER_ROTATION = 60  # the animated rotor turns once every 60 frames
+MAGNET_RADIUS = 5.0
 
-def fibonacci_spiral(n_points=100, rotations=3, scale=1.0):
-    """Generate points along a Fibonacci/Golden spiral"""
-    theta = np.linspace(0, rotations * 2 * np.pi, n_points)
-    r = scale * np.exp(theta / (2 * np.pi / np.log(PHI)))
-    x = r * np.cos(theta)
-    y = r * np.sin(theta)
-    return x, y, theta, r
+def flux_pattern(time, rpm=3000, n_magnets=13):
+    """Simulated flux output at the given times, all magnets in one broadcast step"""
+    time = np.asarray(time, dtype=float)
+    frequency = rpm / 60  # Hz
+    clutch_freq = frequency / n_magnets
+    clutch_period = 1 / clutch_freq
+    
+    # One Gaussian pulse per magnet at its phase within the clutch period
+    pulse_width = 0.1 / clutch_freq
+    pulse_phase = (np.arange(n_magnets) / clutch_freq) % clutch_period
+    offset = (time % clutch_period)[..., None] - pulse_phase
+    inside = np.abs(offset) < pulse_width
+    pulse = np.zeros_like(offset)
+    pulse[inside] = np.exp(-offset[inside]**2 / (2 * (pulse_width/3)**2))
+    flux_pulse = pulse.sum(axis=-1)
+    
+    # Smooth baseline from the rotation itself
+    baseline = 0.3 + 0.1 * np.sin(2 * np.pi * frequency * time)
+    return baseline + flux_pulse
 
-def create_static_visualization():
+def stream_flux_pattern(duration, sample_rate, chunk_size=65536, rpm=3000, n_magnets=13):
+    """
+    Yield the flux waveform as (time, flux) chunks of at most chunk_size samples
+    
+    Memory use depends only on chunk_size, so long captures at high sample
+    rates (e.g. 10 minutes at 100 kHz) can be streamed into FFT or plotting
+    stages without ever holding the whole waveform.
+    """
+    n_samples = int(round(duration * sample_rate))
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        time = np.arange(start, stop) / sample_rate
+        yield time, flux_pattern(time, rpm=rpm, n_magnets=n_magnets)
+
+@traced('visualize.static')
+def create_static_visualization(n_magnets=13, rpm=3000):
     """Create static visualization of the dual spiral system"""
-    fig, axes = plt.subplots(2, 2, figsize=(14, 12))
+    with span('visualize.subplots'):
+        fig, axes = plt.subplots(2, 2, figsize=(14, 12))
     fig.suptitle('Golden Ratio Motor Concept', fontsize=16, fontweight='bold')
     
     # 1. Dual Spiral Configuration (Rotor vs Stator)
     ax1 = axes[0, 0]
-    x1, y1, theta1, r1 = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.0)
-    x2, y2, theta2, r2 = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.05)
+    x1, y1, _, _ = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.0)
+    x2, y2, _, _ = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.05)
     
     ax1.plot(x1, y1, 'b-', linewidth=2, label='Rotor Spiral', alpha=0.7)
     ax1.plot(x2, y2, 'r-', linewidth=2, label='Stator Spiral', alpha=0.7)
     
-    # Add magnet positions using Fibonacci spacing
-    n_magnets = 13  # Fibonacci number
-    magnet_angles = np.array([i * GOLDEN_ANGLE for i in range(n_magnets)]) * np.pi / 180
+    # Add magnet positions using Fibonacci spacing (13, a Fibonacci number, by default)
     magnet_radius = 5.0
+    layout = magnet_layout(n_magnets, magnet_radius)
     
-    for i, angle in enumerate(magnet_angles):
-        x_mag = magnet_radius * np.cos(angle)
-        y_mag = magnet_radius * np.sin(angle)
+    for i, (x_mag, y_mag) in enumerate(zip(layout.x, layout.y)):
         circle = Circle((x_mag, y_mag), 0.3, color='blue' if i % 2 == 0 else 'red', 
                        alpha=0.8, edgecolor='black', linewidth=2)
         ax1.add_patch(circle)
@@ -55,8 +88,7 @@ def create_static_visualization():
     
     # 2. Variable Gap Analysis
     ax2 = axes[0, 1]
-    gap = np.abs(r2 - r1)
-    angles_deg = theta1 * 180 / np.pi
+    angles_deg, gap = spiral_gap(n_points=200, rotations=2.5)
     
     ax2.plot(angles_deg, gap, 'g-', linewidth=2)
     ax2.fill_between(angles_deg, gap, alpha=0.3, color='green')
@@ -73,10 +105,7 @@ def create_static_visualization():
                    linewidth=2, linestyle='--', label='Rotor Circle')
     ax3.add_patch(circle)
     
-    for i, angle in enumerate(magnet_angles):
-        x_mag = magnet_radius * np.cos(angle)
-        y_mag = magnet_radius * np.sin(angle)
-        
+    for i, (x_mag, y_mag) in enumerate(zip(layout.x, layout.y)):
         # Magnet
         mag_circle = Circle((x_mag, y_mag), 0.4, 
                            color='red' if i % 2 == 0 else 'blue',
@@ -103,23 +132,11 @@ def create_static_visualization():
     
     # Simulate the "breathing" pulse pattern
     # Using a combination of rotation and clutch engagement
-    rpm = 3000
     frequency = rpm / 60  # Hz
     clutch_freq = frequency / n_magnets
     
-    # Create pulse train
-    rotation_phase = 2 * np.pi * frequency * time
-    flux_pulse = np.zeros_like(time)
-    
-    for i in range(n_magnets):
-        pulse_time = i / clutch_freq
-        pulse_width = 0.1 / clutch_freq
-        mask = np.abs(time % (1/clutch_freq) - pulse_time % (1/clutch_freq)) < pulse_width
-        flux_pulse += mask * np.exp(-((time % (1/clutch_freq) - pulse_time % (1/clutch_freq))**2) / (2 * (pulse_width/3)**2))
-    
-    # Add smooth baseline
-    baseline = 0.3 + 0.1 * np.sin(rotation_phase)
-    flux_output = baseline + flux_pulse
+    with span('visualize.flux_pattern', samples=len(time)):
+        flux_output = flux_pattern(time, rpm=rpm, n_magnets=n_magnets)
     
     ax4.plot(time, flux_output, 'purple', linewidth=2, label='Flux Output')
     ax4.fill_between(time, flux_output, alpha=0.3, color='purple')
@@ -129,92 +146,176 @@ def create_static_visualization():
     ax4.grid(True, alpha=0.3)
     ax4.legend()
     
-    plt.tight_layout()
+    with span('visualize.tight_layout'):
+        plt.tight_layout()
     return fig
 
-def create_animation():
-    """Create animated visualization of the rotating system"""
-    fig, ax = plt.subplots(figsize=(10, 10))
-    ax.set_xlim(-10, 10)
-    ax.set_ylim(-10, 10)
-    ax.set_aspect('equal')
-    ax.grid(True, alpha=0.3)
-    
-    # Static stator spiral
-    x_stator, y_stator, _, _ = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.05)
-    stator_line, = ax.plot(x_stator, y_stator, 'r-', linewidth=2, 
-                           label='Stator (Fixed)', alpha=0.5)
-    
-    # Rotor spiral (will rotate)
-    x_rotor, y_rotor, _, _ = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.0)
-    rotor_line, = ax.plot([], [], 'b-', linewidth=2, label='Rotor (Rotating)', alpha=0.7)
-    
-    # Magnets
-    n_magnets = 13
-    magnet_angles = np.array([i * GOLDEN_ANGLE for i in range(n_magnets)]) * np.pi / 180
-    magnet_radius = 5.0
-    magnet_patches = []
-    
-    for i in range(n_magnets):
-        circle = Circle((0, 0), 0.4, color='blue' if i % 2 == 0 else 'red',
-                       alpha=0.8, edgecolor='black', linewidth=2)
-        ax.add_patch(circle)
-        magnet_patches.append(circle)
-    
-    # Flux lines (will update)
-    flux_lines = []
-    for i in range(5):
-        line, = ax.plot([], [], 'g-', linewidth=1, alpha=0.3)
-        flux_lines.append(line)
-    
-    title = ax.text(0.5, 1.05, '', transform=ax.transAxes, 
-                   ha='center', fontsize=14, fontweight='bold')
-    
-    ax.legend(loc='upper right')
-    
-    def init():
-        rotor_line.set_data([], [])
-        for line in flux_lines:
-            line.set_data([], [])
-        return [rotor_line] + flux_lines + magnet_patches
-    
-    def animate(frame):
-        # Rotation angle
-        angle = frame * 2 * np.pi / 60  # Complete rotation every 60 frames
+class RotorAnimation:
+    """
+    Collection-based renderer for the rotating rotor.
+    
+    The rotor moves the same way every rotation, so the positions of the
+    rotor spiral, every magnet and the flux lines are computed for one
+    rotation up front with a single broadcast rotation. A frame is then three
+    array lookups: the magnets are one EllipseCollection (a single
+    set_offsets call however many there are) and the flux lines one
+    LineCollection. Works on an interactive pyplot figure or, with
+    ``headless=True``, on a bare Agg figure for offline export.
+    """
+    
+    @traced('animation.setup')
+    def __init__(self, n_magnets=13, rpm=3000, n_flux_lines=5, magnet_size=None,
+                 frames_per_rotation=FRAMES_PER_ROTATION, headless=False):
+        if headless:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.fig = Figure(figsize=(10, 10))
+            FigureCanvasAgg(self.fig)
+            ax = self.fig.add_subplot()
+        else:
+            self.fig, ax = plt.subplots(figsize=(10, 10))
+        self.ax = ax
+        self.rpm = rpm
+        self.frames_per_rotation = frames_per_rotation
+        ax.set_xlim(-10, 10)
+        ax.set_ylim(-10, 10)
+        ax.set_aspect('equal')
+        ax.grid(True, alpha=0.3)
+        ax.set_title('Golden Ratio Motor Rotation', fontsize=14, fontweight='bold')
         
-        # Rotate rotor spiral
-        cos_a, sin_a = np.cos(angle), np.sin(angle)
-        x_rot = x_rotor * cos_a - y_rotor * sin_a
-        y_rot = x_rotor * sin_a + y_rotor * cos_a
-        rotor_line.set_data(x_rot, y_rot)
+        # Precompute one full rotation: (frames, points) complex positions
+        rotation = np.exp(2j * np.pi * np.arange(frames_per_rotation) / frames_per_rotation)
+        x_rotor, y_rotor, _, _ = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.0)
+        layout = magnet_layout(n_magnets, MAGNET_RADIUS)
+        magnets = layout.x + 1j * layout.y
+        flux = magnets[:n_flux_lines, None] * np.array([1, (MAGNET_RADIUS + 2) / MAGNET_RADIUS])
         
-        # Update magnet positions
-        for i, circle in enumerate(magnet_patches):
-            mag_angle = magnet_angles[i] + angle
-            x_mag = magnet_radius * np.cos(mag_angle)
-            y_mag = magnet_radius * np.sin(mag_angle)
-            circle.center = (x_mag, y_mag)
+        def xy(z):
+            return np.stack([z.real, z.imag], axis=-1)
         
-        # Update flux lines (emanating from magnets)
-        for i, line in enumerate(flux_lines):
-            if i < len(magnet_patches):
-                mag_angle = magnet_angles[i] + angle
-                x_start = magnet_radius * np.cos(mag_angle)
-                y_start = magnet_radius * np.sin(mag_angle)
-                x_end = (magnet_radius + 2) * np.cos(mag_angle)
-                y_end = (magnet_radius + 2) * np.sin(mag_angle)
-                line.set_data([x_start, x_end], [y_start, y_end])
+        self._rotor = xy(rotation[:, None] * (x_rotor + 1j * y_rotor))
+        self._magnets = xy(rotation[:, None] * magnets)
+        self._flux = xy(rotation[:, None, None] * flux)
         
-        # Update title with RPM
-        rpm = (frame % 60) / 60 * 3000
-        title.set_text(f'Golden Ratio Motor Rotation\nSimulated RPM: {int(rpm)}')
+        # Static stator spiral
+        x_stator, y_stator, _, _ = fibonacci_spiral(n_points=200, rotations=2.5, scale=1.05)
+        ax.plot(x_stator, y_stator, 'r-', linewidth=2, label='Stator (Fixed)', alpha=0.5)
         
-        return [rotor_line, title] + flux_lines + magnet_patches
-    
-    anim = FuncAnimation(fig, animate, init_func=init, frames=240, 
-                        interval=50, blit=True, repeat=True)
-    
-    return fig, anim
+        self.rotor_line, = ax.plot(*self._rotor[0].T, 'b-', linewidth=2,
+                                   label='Rotor (Rotating)', alpha=0.7)
+        self.flux_lines = LineCollection(self._flux[0], colors='g', linewidths=1, alpha=0.3)
+        ax.add_collection(self.flux_lines)
+        colors = np.where(layout.polarity > 0, 'blue', 'red')
+        if magnet_size is None:
+            # Large rotors get smaller magnets so they still fit around the circle
+            magnet_size = min(0.8, 2 * np.pi * MAGNET_RADIUS / n_magnets)
+        self.magnets = EllipseCollection(
+            magnet_size, magnet_size, 0, units='xy', offsets=self._magnets[0],
+            offset_transform=ax.transData, facecolors=colors, edgecolors='black',
+            linewidths=2 if n_magnets < 100 else 0, alpha=0.8)
+        ax.add_collection(self.magnets)
+        
+        # Kept inside the axes so blitting redraws it
+        self.readout = ax.text(0.02, 0.97, '', transform=ax.transAxes, va='top',
+                               fontsize=11, family='monospace')
+        ax.legend(loc='upper right')
+        
+        self._frame_times = deque(maxlen=60)
+        self.achieved_fps = 0.0
+        self.artists = [self.rotor_line, self.flux_lines, self.magnets, self.readout]
+    
+    @traced('animation.frame')
+    def update(self, frame):
+        """Move every artist to ``frame``; returns the changed artists"""
+        count('animation.frames')
+        k = frame % self.frames_per_rotation
+        self.rotor_line.set_data(self._rotor[k, :, 0], self._rotor[k, :, 1])
+        self.magnets.set_offsets(self._magnets[k])
+        self.flux_lines.set_segments(self._flux[k])
+        
+        # Achieved frame rate over the last second or so of frames
+        now = perf_counter()
+        self._frame_times.append(now)
+        if len(self._frame_times) > 1:
+            window = self._frame_times[-1] - self._frame_times[0]
+            self.achieved_fps = (len(self._frame_times) - 1) / window if window > 0 else 0.0
+        self.readout.set_text(f'Simulated RPM: {self.rpm:.0f}\n'
+                              f'Rendering:     {self.achieved_fps:5.1f} fps')
+        return self.artists
+    
+    def animate(self, frames=240, fps=60):
+        """Attach a blitted FuncAnimation running at the requested frame rate"""
+        return FuncAnimation(self.fig, self.update, frames=frames, interval=1000 / fps,
+                             blit=True, repeat=True)
+
+def create_animation(n_magnets=13, frames=240, fps=60, rpm=3000):
+    """Create animated visualization of the rotating system"""
+    renderer = RotorAnimation(n_magnets=n_magnets, rpm=rpm)
+    anim = renderer.animate(frames=frames, fps=fps)
+    return renderer.fig, anim
+
+def export_animation(path, frames=FRAMES_PER_ROTATION * 10, fps=60, dpi=100, n_magnets=13,
+                     rpm=3000):
+    """
+    Render the animation headlessly to an MP4 or GIF file.
+    
+    The static background (stator, grid, legend) is drawn once; each frame
+    restores it, draws only the moving artists into the Agg buffer and hands
+    the raw RGBA bytes to the encoder. With ffmpeg installed frames are piped
+    straight to it, so thousands of frames need no more memory than one.
+    Without ffmpeg, GIFs fall back to Pillow, which holds every (palettised)
+    frame until the file is written. Returns the frame count and the
+    achieved render rate.
+    """
+    import shutil
+    import subprocess
+    
+    import matplotlib
+    
+    renderer = RotorAnimation(n_magnets=n_magnets, rpm=rpm, headless=True)
+    fig, canvas = renderer.fig, renderer.fig.canvas
+    fig.set_dpi(dpi)
+    for artist in renderer.artists:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    width, height = canvas.get_width_height()
+    
+    def frame_buffers():
+        for frame in range(frames):
+            with span('animation.render'):
+                canvas.restore_region(background)
+                for artist in renderer.update(frame):
+                    fig.draw_artist(artist)
+            yield canvas.buffer_rgba()
+    
+    ffmpeg = shutil.which(matplotlib.rcParams['animation.ffmpeg_path'])
+    start = perf_counter()
+    if ffmpeg:
+        command = [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                   '-s', f'{width}x{height}', '-r', str(fps), '-i', '-']
+        if not str(path).lower().endswith('.gif'):
+            command += ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p']
+        with subprocess.Popen(command + [str(path)], stdin=subprocess.PIPE) as encoder:
+            for buffer in frame_buffers():
+                encoder.stdin.write(buffer)
+            encoder.stdin.close()
+        if encoder.returncode:
+            raise RuntimeError(f"ffmpeg failed writing {path}")
+    elif str(path).lower().endswith('.gif'):
+        from PIL import Image
+        images = []
+        for buffer in frame_buffers():
+            image = Image.frombuffer('RGBA', (width, height), buffer, 'raw', 'RGBA', 0, 1)
+            image = image.convert('RGB')
+            palette = images[0] if images else None
+            images.append(image.quantize(palette=palette) if palette else image.quantize())
+        images[0].save(path, save_all=True, append_images=images[1:],
+                       duration=round(1000 / fps), loop=0)
+    else:
+        raise RuntimeError(f"writing {path} needs ffmpeg; install it or export a .gif")
+    elapsed = perf_counter() - start
+    return {'frames': frames, 'seconds': elapsed, 'fps': frames / elapsed}
 
 def print_specifications():
     """Print calculated specifications"""
@@ -252,15 +353,19 @@ def print_specifications():
     print("\n" + "=" * 60)
 
 if __name__ == "__main__":
+    import sys
+    
     print_specifications()
     
     # Create static visualization
     print("\nGenerating static visualization...")
     fig_static = create_static_visualization()
     
-    # Ask user for animation
+    # Ask user for animation (skipped when run from scripts / batch jobs)
     print("\nStatic visualization complete.")
-    show_animation = input("Generate animation? (y/n): ").lower().strip()
+    show_animation = ''
+    if sys.stdin.isatty():
+        show_animation = input("Generate animation? (y/n): ").lower().strip()
     
     if show_animation == 'y':
         print("Generating animation...")